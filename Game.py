@@ -1,28 +1,70 @@
 #  IMPORTS
 
-import serial              # Serial communication with camera firmware
 import time                # Timing, delays, scheduling
-import tkinter as tk       # GUI / game display
-import cv2                 # point transformation
-import numpy as np         # Numerical calculations
+import importlib           # Timed / lazy imports
+
+startup_t0 = time.perf_counter()
+import_times = {}          # module → seconds spent importing it (see `startup`)
+startup_stats = {}         # "prompt" → seconds from module load to first prompt
+
+def timed_import(name):
+    # Imports `name` and records how long it took
+    t0 = time.perf_counter()
+    module = importlib.import_module(name)
+    import_times[name] = time.perf_counter() - t0
+    return module
+
+serial = timed_import("serial")         # Serial communication with camera firmware
+tk = timed_import("tkinter")            # GUI / game display
+np = timed_import("numpy")              # Numerical calculations
+cv2 = None                              # point transformation (loaded lazily, optional)
+PIL = None                              # text sprites (loaded lazily, optional)
 import math                # Scoring distances
 import random              # Randomized target movement
 import os                  # File-path validation
+import sys                 # Loaded optional modules
+import json                # Stored calibration
+import itertools           # RANSAC minimal samples
+import threading           # Background serial reader
+import queue               # Hand-off of serial events to the Tk loop
+import sqlite3             # Leaderboard store errors
+from collections import deque, OrderedDict  # Rolling latency window, sprite LRU
+link = timed_import("link")             # Wire format shared with the camera (shots, commands)
+scores = timed_import("scores")         # Indexed leaderboard store
+gameclock = timed_import("gameclock")   # Monotonic scheduler for game timers
+targets = timed_import("targets")       # Simultaneous targets + grid hit index
+lanes = timed_import("lanes")           # Several cameras / screens in one process
+engine = timed_import("engine")         # Game rules without a window (this file draws them)
 
 #  FILE & SYSTEM CONFIGURATION
 
 serial_port = "COM7"        # Default COM port for camera device
 baud_rate = 9600            # Baud rate for serial communication
-
-# Paths for logs, ROI coords, and leaderboard
-protocol_path    = r"E:\protocol.txt"
+frame_interval = 16         # ms per display frame (events are applied in batches)
+command_timeout = 1.0       # s to wait for the camera to acknowledge a command
+ack_poll = 10               # ms between looks for the ack of a command sent during a game
+ingest_process = False      # True = a separate process owns the camera link (ingest.py)
+ingest_slots = 4096         # Records in its shared-memory ring
+record_path = None          # Camera bytes are recorded to this file while set (replay.py)
+replay_source = None        # (file, speed): a recording played instead of the camera (replay.py)
+
+# Paths for ROI coords and leaderboard
 coords_path      = r"E:\coords.txt"
-leaderboard_path = r"D:\FJN_2025-26\Project_Han_Solo\leaderboard.txt"
+leaderboard_path = r"D:\FJN_2025-26\Project_Han_Solo\leaderboard.txt"   # old text leaderboard (imported once)
+scores_path      = r"D:\FJN_2025-26\Project_Han_Solo\leaderboard.db"
+calib_path       = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibration.json")
+masks_path       = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Masks")   # score images for mode 8
 
 #  CANVAS SETUP (monitor resolution)
 
 canvas_width  = 1600
 canvas_height = 1200
+lane_screen_offset = canvas_width   # x (px) between lane windows: one monitor per lane, side by side
+
+#  CAMERA SETUP (detection frame, QQVGA)
+
+cam_width  = 160
+cam_height = 120
 
 #  GAME CONFIGURATION
 
@@ -39,7 +81,30 @@ versatz = 20        # Trapezoid side offset
 leaderboard_size = 10     # Show top X scores
 game_mode = 1             # Default game mode (1=Easy)
 
+# Mode timing (ms), also used by simulate.py
+hard_hide_time = 1500             # Mode 3: target hidden per appearance
+hard_move_interval = 3000         # Mode 3: one appearance (hidden + shown)
+medium_hide_range = (700, 1500)   # Mode 2: hidden time, drawn once per game
+medium_show_range = (700, 1500)   # Mode 2: shown time (+ medium_show_extra)
+medium_show_extra = 500
+hide_grace = 0.1          # s after hiding during which a shot still counts
+
+# Scrolling leaderboard view (`board` / `attract`)
+view_rows = 9             # Rows visible at once
+view_row_height = 100     # px per row
+view_top = 220            # y of the first row
+view_page_size = 50       # Rows fetched from the score store per page
+view_pages_cached = 3     # Pages kept in memory while scrolling
+attract_speed = 80        # px/s auto-scroll on the attract screen
+attract_rows = 100        # Rows shown per mode before the next mode
+attract_pause = 3000      # ms pause at the top / bottom of each mode
+attract_enabled = False   # Attract screen after the leaderboard between players
+
 hold = False              # Auto-player lock
+score_store = None        # scores.ScoreStore, opened on first use
+last_rank = None          # Rank of the last saved score in its mode
+board_view = None         # State of the open scrolling leaderboard view
+attract_session = 0       # Bumped to stop a running attract loop
 
 #  TARGET CONFIGURATION
 
@@ -47,18 +112,124 @@ target_rings = 5
 ring_step = 75            # Pixel width per scoring ring
 
 target_visible = True
-target_hide_time = 1000   # For moving modes
-move_interval   = 2000    # Delay between moves
+board_ring = None         # Canvas id of the outer ring of the built target group
+board_pos = None          # Centre the target group is currently drawn at
+
+#  TEXT SPRITES (outlined labels rendered once with Pillow)
+
+use_sprites = True        # False = always draw labels as Tk text items
+sprite_cache_size = 64    # Max. cached label images (LRU)
+sprite_fonts = ["arialbd.ttf", "Arial Bold.ttf", "DejaVuSans-Bold.ttf", "LiberationSans-Bold.ttf"]
+sprite_cache = OrderedDict()  # (text, size, fill, outline, offset) → PhotoImage
+sprite_stats = {"hits": 0, "misses": 0, "evictions": 0}
+pil_checked = False       # Lazy Pillow import attempted
+sprite_font_files = {}    # size → ImageFont (None = no usable font)
+
+#  RENDER BACKEND
+
+render_backend = "canvas" # "canvas" = Tk items, "composite" = layered off-screen frame (NumPy + Pillow)
+compositor = None         # compositor.Compositor while the composite backend is active
+layer_cache = {}          # layer name → Pillow RGBA image (static layers are drawn once)
+batt_state = []           # Fill per battery segment, None = used (composite backend)
+
+#  CANVAS ITEM POOL (markers and texts are recycled instead of re-created)
+
+pool_cap = 512            # Hard cap on pooled canvas items (shown + idle)
+item_pool = {"oval": [], "text": []}  # kind → hidden item ids ready for reuse
+pool_live = OrderedDict() # shown pooled item id → kind (oldest first)
+pool_stats = {"created": 0, "reused": 0, "recycled": 0, "deleted": 0}
+
+
+#  GLIDING TARGET (mode 4)
+
+tick_rate = 60            # Fixed animation time step (ticks per second)
+glide_speed = 250         # px/s along the path
+glide_duration = 30000    # ms per game (ends earlier once `rounds` shots are taken)
+tick_stats = {"ticks": 0, "late_sum": 0.0, "late_max": 0.0, "catchup_max": 0}
+tick_late = deque(maxlen=1000)    # Recent tick lateness vs. the fixed schedule (s)
+
+
+#  ENDURANCE MODE (mode 6)
+
+endurance_time = 60000    # ms per game (ends earlier when the ammo runs out)
+endurance_shots = 5000    # Ammo per game; not limited by the battery segments
+
+#  MULTI-TARGET MODE (mode 7)
+
+multi_count = 6           # Targets on screen at once
+multi_time = 45000        # ms per game (ends earlier once `rounds` shots are taken)
+multi_lifetime = (2500, 6000)   # ms a target stays up unless it is shot (random per target)
+multi_kinds = [           # (ring width px, points outer → inner); smaller targets pay more
+    (30, (20, 40, 60, 80, 100)),
+    (30, (50, 100, 150)),
+    (25, (150, 300)),
+]
+multi_cell = 100          # Cell size (px) of the hit-test grid
+
+#  MASK TARGETS (mode 8)
+
+mask_name = None          # Mask played in mode 8 (None = first one in masks_path)
+mask_set = None           # name → masks.Mask, compiled on first use
 
 #  GLOBAL VARS / STATE
 
 root = None               # Tkinter root window
 canvas = None             # Tkinter canvas for game display
-ser = None                # Serial port object
-
-round_count = 0           # How many shots taken
-mrc = 0                   # Battery UI index for marking missed shots
-rbs = 0                   # Remove Battery segment 
+tk_master = None          # First Tk window; the windows of further lanes are its Toplevels
+lane_set = None           # lanes.LaneSet once a second lane is added (None = one lane)
+lanes_after = None        # Tk callback id of the pending serve_lanes (all lanes)
+serving = None            # (rounds, Name, session) the lane's events are applied to, with lanes
+ser = None                # Serial port object (owned by the reader thread)
+
+# Serial reader thread
+reader_thread = None      # Background thread draining `ser`
+reader_stop = None        # threading.Event that stops the reader
+events = queue.Queue()    # Parsed serial events → Tk loop
+link_decoder = None       # Frame decoder of the current session
+ingest = None             # ingest.IngestProcess while the link runs in its own process
+game_session = 0          # Bumped per game; stale event loops stop themselves
+
+# Command channel (host → camera)
+next_request = 0          # Last used request id
+pending_acks = {}         # request id → [threading.Event, ack status]
+write_lock = threading.Lock()
+
+# Ingest statistics (see `perf` command)
+ingest_stats = {
+    "events": 0,          # Events handled by the Tk loop
+    "depth": 0,           # Queue depth at the last drain
+    "max_depth": 0,       # Deepest queue seen at a drain
+    "latency_sum": 0.0,   # Sum of reader → Tk latencies (s)
+    "latency_max": 0.0,   # Worst reader → Tk latency (s)
+}
+ingest_latency = deque(maxlen=1000)   # Recent per-event latencies (s)
+cam_offsets = deque(maxlen=64)        # Host minus camera clock of recent shots (s)
+
+# Frame batching statistics (see `perf` command)
+redraw_pending = False    # Canvas changed since the last repaint
+frame_stats = {
+    "frames": 0,          # Frames that applied at least one event
+    "events": 0,          # Events applied in those frames
+    "max_events": 0,      # Largest batch seen in one frame
+    "redraws": 0,         # Coalesced repaints
+    "redraw_sum": 0.0,    # Total repaint time (s)
+    "redraw_max": 0.0,    # Slowest repaint (s)
+}
+backend_stats = {         # backend → [repaints, total s, max s] (compare with `perf`)
+    "canvas": [0, 0.0, 0.0],
+    "composite": [0, 0.0, 0.0],
+}
+
+# Game clock (all game timers, see `perf`)
+game_clock = gameclock.GameClock()
+clock_after = None        # Tk callback id of the pending clock tick
+clock_armed = None        # Due time that callback was armed for
+
+# The game itself (rules and state live in engine.py, this file is its view)
+game = None               # engine.Engine of the current / last game
+game_step = None          # Game clock id of the engine's next step
+game_step_due = None      # When that step is due
+countdown = False         # READY? / START! on screen: events wait in the queue
 
 # Calibration & transformation
 blob = []                 # Detected calibration blobs from camera
@@ -68,6 +239,19 @@ transform_type = None     # “Perspective” (usually)
 corr_l_x = 0              # Correction factors (legacy)
 corr_l_y = 0
 roi = None                # Region of interest returned by camera
+lut = None                # Camera pixel → screen lookup table (cam_height+1, cam_width+1, 2)
+lut_rows = None           # Same LUT as nested lists (fast scalar access)
+lut_matrix = None         # Matrix the LUT was baked from
+lut_interpolate = True    # Bilinear sub-pixel lookup for non-integer coords
+use_cv2 = True            # Use OpenCV when installed, else the NumPy solver
+ransac_threshold = 40.0   # px on screen (~3 camera px); blobs further off are outliers
+calib_max_error = 25.0    # px RMS; worse calibrations are not stored / reused
+calib_max_age = 12 * 3600 # s; older stored calibrations count as stale
+calib_version = 1         # Format of calib_path
+calib_error = None        # RMS reprojection error of the current matrix (px)
+calib_residuals = []      # Per-blob reprojection error (px, None = missing blob)
+calib_time = None         # When the current matrix was computed (epoch s)
+cv2_checked = False       # Lazy cv2 import attempted
 
 # Admin mode
 adminmode = False
@@ -77,25 +261,17 @@ player = 1
 START = True
 hit = False
 first = True     # For auto-start function
-free = True      # Controls hit registration in moving modes
 diff = 0         # Unused?
 
 # Scoring system
 points = [20, 40, 60, 80, 100]   # Outer → inner
-score = 0
-
-shotsx = []      # X coords of hits for display
-shotsy = []      # Y coords of hits for display
-shots = 0        # Number of valid hits
 
 # Initial target position (center screen)
 target_center = (canvas_width//2, canvas_height//2 - 50)
 temp_center = (0,0)
 
-running = False     # Game running or not
+running = False     # Game running or not (follows the engine's start / end)
 step = 20           # Unused?
-last_hide_time = 0  # Timestamp for hiding target
-missed_rounds = 0   # Missed shots in gamemode 3
 
 # Precompute battery UI size
 length = int((length_x - (2 * distanz)) / rounds - distanz)
@@ -114,85 +290,87 @@ def calibration(cmd):
 
     """
 
-    global blob, ser, corr_l_x, corr_l_y, roi
+    global blob, corr_l_x, corr_l_y, roi, game_session
     blob = []   # Reset detected blobs list
 
-    # Reset / reopen serial port
-    if ser and ser.is_open:
-        ser.close()
-    time.sleep(0.5)
+    # Serial link must be up
+    if not link_open():
+        return
 
-    # Log calibration start into protocol file
-    with open(protocol_path, "a") as proto_file:
-        proto_file.write("\nend")
+    # Stop a running game / detection, then start calibration
+    game_session += 1
+    drain_events()
+    send_command("end")
 
     try:
-        # Attempt to open serial communication
-        ser = serial.Serial(serial_port, baud_rate, timeout=1)
-        print(f"\nConnected to {serial_port} at {baud_rate} baud.")
-
-        with open(protocol_path, "a") as proto_file:
-            proto_file.write("\n" + cmd)
-
-        # Wait for camera to acknowledge calibration start
-        line = ser.readline()
-        msg = line.decode('utf-8').strip()
-        if msg == "Starting calibration phase":
-            print(msg)
+        if send_command(cmd) != link.ACK_OK:
+            print("Camera did not start calibration.")
+            return
 
         # Main loop: read blobs until firmware sends "File written."
         while True:
-            line = ser.readline()
-            if line:
-                msg = line.decode('utf-8').strip()
+            try:
+                pump_ingest()
+                kind, stamp, *data = events.get(timeout=0.1)
+            except queue.Empty:
+                # Keep UI responsive
+                if root:
+                    root.update()
+                continue
 
-                # Parse camera blobd
-                if "Blob" in msg and ":" in msg:
-                    try:
-                        # Expected format: "Blob: x=123, y=456"
-                        parts = msg.split(":")[1].strip().split(",")
-                        x_val = int(parts[0].split("=")[1])
-                        y_val = int(parts[1].split("=")[1])
-
-                        blob.append({'x': x_val, 'y': y_val})
-
-                        # Keep only the last 6 points (camera may overshoot)
-                        if len(blob) > 6:
-                            blob = blob[-6:]
-                    except Exception as e:
-                        print("Parsing blob error:", e)
-
-                # Parse ROI
-                if "ROI" in msg:
-                    # Expected: "ROI: (x1, y1, x2, y2)"
-                    roi_str = msg.split(":")[1].strip()
-                    roi = eval(roi_str)
-
-                    # Normalize camera coords → screen coords multipliers
-                    corr_l_x = (canvas_width - 20 - radius) / (roi[2] - roi[0])
-                    corr_l_y = (canvas_height - 20 - radius) / (roi[3] - roi[1])
-
-                # Finish calibration
-                if msg == "File written.":
-                    # Sort blobs into TL/TM/TR + BL/BM/BR
-                    blob[:] = sort_blobs_by_position(blob)
-                    print("Calibration complete.")
-                    ser.close()
-                    return
-
-                # If camera script failed
-                if "Error running calib.py" in msg:
-                    ser.close()
-                    return
-
-            # Keep UI responsive
-            if root:
-                root.update()
-            time.sleep(0.1)
+            if kind == "error":
+                print("Calibration serial error:", data[0])
+                stop_reader()
+                return
+
+            if kind != "text":
+                continue
+            msg = data[0]
+
+            # Camera acknowledges calibration start
+            if msg.startswith("Starting calibration phase"):
+                print(msg)
+
+            # Parse camera blobd
+            if "Blob" in msg and ":" in msg:
+                try:
+                    # Expected format: "Blob: x=123, y=456"
+                    parts = msg.split(":")[1].strip().split(",")
+                    x_val = int(parts[0].split("=")[1])
+                    y_val = int(parts[1].split("=")[1])
+
+                    blob.append({'x': x_val, 'y': y_val})
+
+                    # Keep only the last 6 points (camera may overshoot)
+                    if len(blob) > 6:
+                        blob = blob[-6:]
+                except Exception as e:
+                    print("Parsing blob error:", e)
+
+            # Parse ROI
+            if "ROI" in msg:
+                # Expected: "ROI: (x1, y1, x2, y2)"
+                roi_str = msg.split(":")[1].strip()
+                roi = eval(roi_str)
+
+                # Normalize camera coords → screen coords multipliers
+                corr_l_x = (canvas_width - 20 - radius) / (roi[2] - roi[0])
+                corr_l_y = (canvas_height - 20 - radius) / (roi[3] - roi[1])
+
+            # Finish calibration
+            if msg == "File written.":
+                # Sort blobs into TL/TM/TR + BL/BM/BR
+                blob[:] = sort_blobs_by_position(blob)
+                print("Calibration complete.")
+                return
+
+            # If camera script failed
+            if "Error running calib.py" in msg:
+                return
 
     except Exception as e:
         print("Calibration serial error:", e)
-        ser.close()
+        stop_reader()
         return
 
 
@@ -204,19 +382,13 @@ def correction(radius):
     from camera coordinates to screen coordinates based on the
     6 calibration blobs.
 
-    """
-
-    global blob
-
-    # Filter out missing blobs
-    valid_blobs = [b for b in blob if b is not None]
+    The fit is RANSAC based: blobs that do not agree with the
+    rest (reflections, a misdetected circle) are left out, and the
+    reprojection error of every blob is reported.
 
-    if len(valid_blobs) < 4:
-        print("Not enough blobs for correction (need at least 4).")
-        return None, None
+    """
 
-    # Camera detection positions
-    camera_pts = np.float32([[b['x'], b['y']] for b in valid_blobs])
+    global blob, calib_error, calib_residuals, calib_time
 
     # Corresponding exact screen positions of calibration circles
     screen_pts = np.float32([
@@ -228,268 +400,1530 @@ def correction(radius):
         [canvas_width - 20 - radius, canvas_height - 100 - radius]# Bottom-right
     ])
 
-    # Compute transformation
-    if len(valid_blobs) >= 4:
-        matrix, _ = cv2.findHomography(camera_pts, screen_pts[:len(valid_blobs)])
-        transform_type = "Perspective"
+    # Pair every detected blob with its circle (missing blobs are None)
+    slots = [i for i, b in enumerate(blob) if b is not None]
+
+    if len(slots) < 4:
+        print("Not enough blobs for correction (need at least 4).")
+        return None, None
+
+    # Camera detection positions
+    camera_pts = np.float32([[blob[i]['x'], blob[i]['y']] for i in slots])
+
+    # Compute transformation
+    matrix, residuals, inliers = fit_homography_ransac(camera_pts, screen_pts[slots])
+    if matrix is None:
+        print("Could not compute a transformation from these blobs.")
+        return None, None
+    transform_type = "Perspective"
+
+    # Quality report
+    names = ["Top-Left", "Top-Mid", "Top-Right", "Bottom-Left", "Bottom-Mid", "Bottom-Right"]
+    calib_residuals = [None] * len(screen_pts)
+    print("\nReprojection error per blob:")
+    for k, i in enumerate(slots):
+        calib_residuals[i] = float(residuals[k])
+        flag = "" if inliers[k] else "   ← outlier, ignored"
+        print(f"  {names[i]:<13}: {residuals[k]:7.2f} px{flag}")
+
+    calib_error = float(np.sqrt(np.mean(residuals[inliers] ** 2)))
+    calib_time = time.time()
+    print(f"RMS error: {calib_error:.2f} px ({int(inliers.sum())}/{len(slots)} blobs used)")
+    if calib_error > calib_max_error:
+        print(f"WARNING: error above {calib_max_error} px, check the camera and run calib again.")
+
+    # Bake the homography for per-shot lookups
+    build_lut(matrix)
+
+    return matrix, transform_type
+
+
+def fit_homography_ransac(camera_pts, screen_pts):
+    """
+    RANSAC homography fit for the handful of calibration blobs.
+    With at most 6 points every 4-point minimal sample is tried
+    (15 at most), so the result is deterministic. The sample with
+    the most inliers (ties: lowest error) is refitted on its inliers.
+
+    Returns (matrix, per-point residuals in px, inlier mask).
+
+    """
+
+    n = len(camera_pts)
+    best = None
+
+    for sample in itertools.combinations(range(n), 4):
+        sample = list(sample)
+        m = find_homography(camera_pts[sample], screen_pts[sample])
+        if m is None:
+            continue
+        res = reprojection_errors(m, camera_pts, screen_pts)
+        inliers = res < ransac_threshold
+        score = (int(inliers.sum()), -float(np.mean(res[inliers] ** 2)) if inliers.any() else 0.0)
+        if best is None or score > best[0]:
+            best = (score, inliers)
+
+    if best is None or best[0][0] < 4:
+        return None, None, None
+
+    inliers = best[1]
+    matrix = find_homography(camera_pts[inliers], screen_pts[inliers])
+    if matrix is None:
+        return None, None, None
+    return matrix, reprojection_errors(matrix, camera_pts, screen_pts), inliers
+
+
+def reprojection_errors(matrix, camera_pts, screen_pts):
+    # Distance (px) between projected camera points and their screen targets
+    proj = project(matrix, camera_pts[:, 0].astype(np.float64), camera_pts[:, 1].astype(np.float64))
+    return np.hypot(proj[:, 0] - screen_pts[:, 0], proj[:, 1] - screen_pts[:, 1])
+
+
+#  STORED CALIBRATION
+
+def save_calibration():
+    """
+    Writes the current homography together with the blob set,
+    ROI, error report and the resolutions it was computed for
+    to calib_path, so the next session can skip `calib`.
+
+    """
+
+    if matrix is None:
+        return
+    if calib_error is not None and calib_error > calib_max_error:
+        print("Calibration not saved (error too large).")
+        return
+
+    data = {
+        "version": calib_version,
+        "time": calib_time or time.time(),
+        "matrix": np.asarray(matrix, dtype=np.float64).tolist(),
+        "transform_type": transform_type,
+        "blobs": blob,
+        "roi": list(roi) if roi else None,
+        "error": calib_error,
+        "residuals": calib_residuals,
+        "camera": [cam_width, cam_height],
+        "canvas": [canvas_width, canvas_height],
+        "radius": radius,
+    }
+    try:
+        tmp = calib_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, calib_path)
+        print(f"Calibration saved to {calib_path}")
+    except OSError as e:
+        print("Could not save calibration:", e)
+
+
+def load_calibration():
+    """
+    Loads the stored calibration at startup. It is rejected when it
+    was made for another camera/canvas resolution or circle radius,
+    when its error is too large, or when it is older than
+    calib_max_age (the setup has probably been moved since).
+
+    Returns True when the stored calibration is now in use.
+
+    """
+
+    global matrix, transform_type, blob, roi, calib_error, calib_residuals, calib_time
+
+    try:
+        with open(calib_path, "r") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError) as e:
+        print("Stored calibration unreadable:", e)
+        return False
+
+    age = time.time() - data.get("time", 0)
+    error = data.get("error")
+
+    if data.get("version") != calib_version:
+        reason = "unknown format"
+    elif data.get("camera") != [cam_width, cam_height]:
+        reason = f"camera resolution {data.get('camera')}"
+    elif data.get("canvas") != [canvas_width, canvas_height]:
+        reason = f"canvas resolution {data.get('canvas')}"
+    elif data.get("radius") != radius:
+        reason = f"circle radius {data.get('radius')}"
+    elif error is None or error > calib_max_error:
+        reason = f"reprojection error {error} px"
+    elif age > calib_max_age:
+        reason = f"stale ({age / 3600:.1f} h old)"
+    else:
+        reason = None
+
+    if reason:
+        print(f"Stored calibration rejected: {reason}. Run calib.")
+        return False
+
+    matrix = np.array(data["matrix"], dtype=np.float64)
+    transform_type = data["transform_type"]
+    blob = data["blobs"]
+    roi = tuple(data["roi"]) if data.get("roi") else None
+    calib_error = error
+    calib_residuals = data.get("residuals", [])
+    calib_time = data["time"]
+    build_lut(matrix)
+
+    print(f"Loaded calibration from {calib_path} "
+          f"({age / 60:.0f} min old, {error:.2f} px RMS).")
+    return True
+
+
+#  HOMOGRAPHY (OpenCV optional)
+
+def load_cv2():
+    """
+    Imports OpenCV on first use (it dominates cold start otherwise).
+    Returns the module, or None when it is missing or disabled.
+
+    """
+
+    global cv2, cv2_checked
+
+    if not use_cv2:
+        return None
+    if not cv2_checked:
+        cv2_checked = True
+        try:
+            cv2 = timed_import("cv2")
+        except ImportError:
+            print("OpenCV not installed, using the NumPy homography solver.")
+    return cv2
+
+
+def find_homography(src, dst):
+    # 3x3 camera → screen homography from point pairs (least squares)
+    cv = load_cv2()
+    if cv is not None:
+        matrix, _ = cv.findHomography(np.float32(src), np.float32(dst))
+        return matrix
+    return find_homography_np(src, dst)
+
+
+def find_homography_np(src, dst, iterations=10):
+    """
+    Pure NumPy homography: normalized DLT for the initial estimate,
+    then Gauss-Newton on the reprojection error (what cv2.findHomography
+    does with method 0), so both give matching matrices.
+
+    """
+
+    src = np.asarray(src, dtype=np.float64)
+    dst = np.asarray(dst, dtype=np.float64)
+    if len(src) < 4:
+        return None
+
+    def normalize(p):
+        # Centre on the centroid, mean distance √2 (Hartley)
+        c = p.mean(axis=0)
+        d = np.sqrt(((p - c) ** 2).sum(axis=1)).mean() or 1.0
+        k = math.sqrt(2) / d
+        return (p - c) * k, np.array([[k, 0, -k * c[0]], [0, k, -k * c[1]], [0, 0, 1]])
+
+    ns, t_src = normalize(src)
+    nd, t_dst = normalize(dst)
+
+    x, y = ns[:, 0], ns[:, 1]
+    u, v = nd[:, 0], nd[:, 1]
+    zero, one = np.zeros_like(x), np.ones_like(x)
+    a = np.concatenate((
+        np.stack((-x, -y, -one, zero, zero, zero, u * x, u * y, u), axis=1),
+        np.stack((zero, zero, zero, -x, -y, -one, v * x, v * y, v), axis=1),
+    ))
+    h = np.linalg.svd(a)[2][-1].reshape(3, 3)
+    h = np.linalg.inv(t_dst) @ h @ t_src
+    if abs(h[2, 2]) < 1e-12:
+        return None
+    h /= h[2, 2]
+
+    # Refine: minimise the pixel reprojection error
+    x, y = src[:, 0], src[:, 1]
+    for _ in range(iterations):
+        w = h[2, 0] * x + h[2, 1] * y + 1
+        pu = (h[0, 0] * x + h[0, 1] * y + h[0, 2]) / w
+        pv = (h[1, 0] * x + h[1, 1] * y + h[1, 2]) / w
+        res = np.concatenate((pu - dst[:, 0], pv - dst[:, 1]))
+        zero = np.zeros_like(x)
+        jac = np.concatenate((
+            np.stack((x / w, y / w, 1 / w, zero, zero, zero, -pu * x / w, -pu * y / w), axis=1),
+            np.stack((zero, zero, zero, x / w, y / w, 1 / w, -pv * x / w, -pv * y / w), axis=1),
+        ))
+        delta = np.linalg.lstsq(jac, -res, rcond=None)[0]
+        h = h + np.append(delta, 0).reshape(3, 3)
+        if np.abs(delta).max() < 1e-10:
+            break
+
+    return h
+
+
+def build_lut(matrix):
+    """
+    Projects every camera pixel (0..cam_width × 0..cam_height, edges
+    included for interpolation) through the homography once, so that
+    correcting a shot is an array index instead of a cv2 call.
+
+    """
+
+    global lut, lut_rows, lut_matrix
+
+    gy, gx = np.mgrid[0:cam_height + 1, 0:cam_width + 1].astype(np.float64)
+    lut = project(matrix, gx, gy).astype(np.float32)
+    lut_rows = lut.tolist()
+    lut_matrix = matrix
+
+
+def project(matrix, xs, ys):
+    # Applies a 3x3 homography to coordinate arrays → (..., 2)
+    m = np.asarray(matrix, dtype=np.float64)
+    w = m[2, 0] * xs + m[2, 1] * ys + m[2, 2]
+    return np.stack((
+        (m[0, 0] * xs + m[0, 1] * ys + m[0, 2]) / w,
+        (m[1, 0] * xs + m[1, 1] * ys + m[1, 2]) / w,
+    ), axis=-1)
+
+
+#  BLOB SORTING 
+
+def sort_blobs_by_position(blobs):
+    """
+    Sorts the detected calibration blobs into a consistent order:
+        0 = Top-left
+        1 = Top-middle
+        2 = Top-right
+        3 = Bottom-left
+        4 = Bottom-middle
+        5 = Bottom-right
+
+    Sorting is performed by first splitting into top/bottom rows
+    based on Y values, then left→right by X values.
+
+    """
+
+    if not blobs:
+        return [None] * 6
+
+    # Sort by vertical (y)
+    sorted_by_y = sorted(blobs, key=lambda b: b['y'])
+    half = len(sorted_by_y) // 2
+
+    top = sorted(sorted_by_y[:half], key=lambda b: b['x'])
+    bottom = sorted(sorted_by_y[half:], key=lambda b: b['x'])
+
+    # Prepare ordered list
+    ordered = [None] * 6
+
+    # Assign sorted blobs to positions
+    if len(top) >= 1: ordered[0] = top[0]  # TL
+    if len(top) >= 2: ordered[1] = top[1]  # TM
+    if len(top) >= 3: ordered[2] = top[2]  # TR
+
+    if len(bottom) >= 1: ordered[3] = bottom[0]  # BL
+    if len(bottom) >= 2: ordered[4] = bottom[1]  # BM
+    if len(bottom) >= 3: ordered[5] = bottom[2]  # BR
+
+    return ordered
+
+
+#  ROUND START
+
+def round_start(rounds,cmd,Name):
+    """
+    Prepares and starts a game session.
+
+    Steps:
+    1. Opens the serial link (if needed) and drops stale events
+    2. Sets up a new game (engine) with the current settings
+    3. Draws game monitor UI (target + battery)
+    4. Sends the start command and starts the event loop that waits for hits
+
+    """
+
+    global canvas,game_mode,game_session,countdown
+
+    if matrix is not None:   # Calibration must be done
+        if not link_open():
+            return
+
+        # Ensure the game starts fresh
+        game_session += 1
+        stop_attract()
+        game_clock.cancel_group("game")     # leftovers of the last game (results screen, countdown, ...)
+        countdown = False
+        drain_events()
+        new_game()
+
+        # Draw game UI
+        game_monitor(canvas)
+
+        # Tell the camera to start detecting
+        send_command(cmd, wait=False)
+
+        # Begin serial reading for hits/detections
+        read_serial(rounds, Name, game_session)
+    else:
+        print("run calibration first")
+
+
+#  COORD CORRECTION
+
+def correct_coords(x_cam, y_cam, matrix, transform_type):
+    # Camera → screen for one shot; LUT lookup when it was baked from `matrix`
+    if lut is not None and matrix is lut_matrix and transform_type == "Perspective":
+        if 0 <= x_cam <= cam_width and 0 <= y_cam <= cam_height:
+            if isinstance(x_cam, int) and isinstance(y_cam, int):
+                return lut_rows[y_cam][x_cam]
+            if lut_interpolate:
+                # Scalar bilinear in plain floats (numpy overhead dominates here)
+                x0 = min(int(x_cam), cam_width - 1)
+                y0 = min(int(y_cam), cam_height - 1)
+                fx, fy = x_cam - x0, y_cam - y0
+                row0, row1 = lut_rows[y0], lut_rows[y0 + 1]
+                (ax, ay), (bx, by) = row0[x0], row0[x0 + 1]
+                (cx, cy), (dx, dy) = row1[x0], row1[x0 + 1]
+                return (
+                    (ax + (bx - ax) * fx) * (1 - fy) + (cx + (dx - cx) * fx) * fy,
+                    (ay + (by - ay) * fx) * (1 - fy) + (cy + (dy - cy) * fx) * fy,
+                )
+            return lut_rows[int(round(y_cam))][int(round(x_cam))]
+
+    if transform_type not in ("Affine", "Perspective"):
+        raise ValueError("Unknown transform type")
+
+    cv = load_cv2()
+    if cv is None:
+        m = np.asarray(matrix, dtype=np.float64)
+        if transform_type == "Affine":
+            return m[:, :2] @ (x_cam, y_cam) + m[:, 2]
+        return project(m, float(x_cam), float(y_cam))
+
+    pt = np.array([[[x_cam, y_cam]]], dtype=np.float32)
+    if transform_type == "Affine":
+        pt_corr = cv.transform(pt, matrix)
+    else:
+        pt_corr = cv.perspectiveTransform(pt, matrix)
+    return pt_corr[0][0]
+
+
+def lut_bilinear(xs, ys):
+    # Sub-pixel LUT lookup; xs/ys are arrays (or scalars) inside the camera frame
+    x0 = np.minimum(np.floor(xs).astype(np.intp), cam_width - 1)
+    y0 = np.minimum(np.floor(ys).astype(np.intp), cam_height - 1)
+    fx = (xs - x0)[..., None]
+    fy = (ys - y0)[..., None]
+
+    top = lut[y0, x0] * (1 - fx) + lut[y0, x0 + 1] * fx
+    bottom = lut[y0 + 1, x0] * (1 - fx) + lut[y0 + 1, x0 + 1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def correct_coords_batch(xs, ys, matrix=None):
+    """
+    Vectorized camera → screen transform for many shots at once
+    (replayed or buffered hits). Returns two float arrays.
+
+    Points inside the camera frame go through the LUT, anything
+    else (or everything, without a LUT) through the homography.
+    `matrix` defaults to the one of the last correction().
+
+    """
+
+    if matrix is None:
+        matrix = lut_matrix     # matrix of the last calibration
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+
+    if lut is None or matrix is not lut_matrix:
+        out = project(matrix, xs, ys)
+        return out[..., 0], out[..., 1]
+
+    out = np.empty(xs.shape + (2,), dtype=np.float64)
+    inside = (xs >= 0) & (xs <= cam_width) & (ys >= 0) & (ys <= cam_height)
+
+    xi, yi = xs[inside], ys[inside]
+    if lut_interpolate:
+        out[inside] = lut_bilinear(xi, yi)
+    else:
+        out[inside] = lut[np.rint(yi).astype(np.intp), np.rint(xi).astype(np.intp)]
+
+    if not inside.all():
+        out[~inside] = project(matrix, xs[~inside], ys[~inside])
+
+    return out[..., 0], out[..., 1]
+
+
+#  SERIAL READER THREAD
+
+def parse_line(treffer, stamp):
+    """
+    Turns one decoded camera line into an event tuple
+    (kind, stamp, *data) for the Tk loop:
+
+        ("start", stamp)         ← "differencing..."
+        ("shot",  stamp, x, y)   ← "X:123 # Y:456" (shot frames add
+                                   the shot time on the host clock)
+        ("text",  stamp, msg)    ← anything else (blobs, ROI, debug)
+        ("error", stamp, msg)    ← unparsable shot line
+
+    """
+
+    if "differencing" in treffer:
+        return ("start", stamp)
+
+    if "#" in treffer and "X" in treffer and "Y" in treffer:
+        try:
+            parts = treffer.split("#")
+            hit_x = int(parts[0].split(":")[1])
+            hit_y = int(parts[1].split(":")[1])
+            return ("shot", stamp, hit_x, hit_y)
+        except (IndexError, ValueError) as e:
+            return ("error", stamp, f"Parsing error: {e}")
+
+    return ("text", stamp, treffer)
+
+
+def serial_reader(port, stop, events, acks, offsets, decoder):
+    """
+    Body of the reader thread. Owns `port` until `stop` is set,
+    drains everything the camera sent and queues one parsed event
+    per shot frame / text line onto `events`, stamped with the time
+    it came off the wire. Everything it touches is passed in, so the
+    readers of several lanes never share state.
+
+    Binary shot frames (see link.py) are used once the camera
+    announces them; plain "X: # Y:" text lines remain supported.
+
+    """
+
+    while not stop.is_set():
+        try:
+            data = port.read(port.in_waiting or 1)
+        except (serial.SerialException, OSError, TypeError) as e:
+            # TypeError: port closed underneath us
+            if not stop.is_set():
+                events.put(("error", time.perf_counter(), f"Serial error: {e}"))
+            break
+
+        if not data:
+            continue
+
+        stamp = time.perf_counter()
+        crc_errors = decoder.crc_errors
+        decoder.feed(data)
+
+        for kind, payload in decoder.parse():
+            if kind == link.FRAME_SHOT:
+                seq, cam_ms, hit_x, hit_y, pixels, roundness = link.decode_shot(payload)
+                missing = decoder.check_seq(seq)
+                if missing:
+                    events.put(("error", stamp, f"Dropped {missing} shot(s) before #{seq}"))
+                events.put(("shot", stamp, hit_x, hit_y, shot_time(cam_ms, stamp, offsets)))
+
+            elif kind == link.FRAME_ACK:
+                req_id, status = link.decode_ack(payload)
+                waiter = acks.get(req_id)
+                if waiter:
+                    waiter[1] = status
+                    waiter[0].set()
+
+            elif kind == link.FRAME_TEXT:
+                treffer = payload.decode("utf-8", "replace")
+                version = link.parse_hello(treffer)
+                if version is not None:
+                    events.put(("text", stamp, check_hello(port, version)))
+                else:
+                    events.put(parse_line(treffer, stamp))
+
+        if decoder.crc_errors != crc_errors:
+            events.put(("error", stamp,
+                        f"Corrupted shot frame(s): {decoder.crc_errors - crc_errors}"))
+
+
+def shot_time(cam_ms, stamp, offsets):
+    """
+    Maps the camera timestamp of a shot onto the host clock
+    (perf_counter). The smallest recent host − camera offset in
+    `offsets` is the transfer with the least delay, so it is used as
+    the clock offset.
+
+    """
+
+    offset = stamp - cam_ms / 1000
+    if offsets and abs(offset - min(offsets)) > 1.0:
+        offsets.clear()             # camera restarted or its clock wrapped
+    offsets.append(offset)
+    return cam_ms / 1000 + min(offsets)
+
+
+def check_hello(port, version):
+    # The camera's hello: same protocol version? (the baud rate stays baud_rate)
+    if version != link.PROTO_VERSION:
+        return f"Camera speaks protocol v{version}, expected v{link.PROTO_VERSION}"
+    return f"Binary protocol v{version} at {port.baudrate} baud"
+
+
+#  COMMAND CHANNEL
+
+def link_open():
+    """
+    Opens the serial link to the camera and starts the reader thread,
+    unless it is already running. The link stays open between games;
+    commands and shots share it.
+
+    """
+
+    global ser, ingest
+
+    if reader_alive():
+        return True
+    stop_reader()   # clean up after a dead reader
+
+    if replay_source is not None:
+        try:
+            ser = timed_import("replay").ReplayPort(*replay_source)
+        except (OSError, ValueError) as e:
+            print("Error opening recording:", e)
+            return False
+        speed = replay_source[1]
+        print(f"\nReplaying {replay_source[0]}", f"at {speed:g}×" if speed else "as fast as possible")
+        start_reader()
+        return True
+
+    if ingest_process and record_path is None:
+        ingest = timed_import("ingest").IngestProcess(serial_port, baud_rate, pending_acks, ingest_slots,
+                                                      matrix, transform_type)
+        print(f"\nIngest process on {serial_port} at {baud_rate} baud.")
+        return True
+
+    try:
+        ser = serial.Serial(serial_port, baud_rate, timeout=0.1)
+    except (serial.SerialException, ValueError) as e:
+        print("Error opening serial port:", e)
+        return False
+
+    print(f"\nConnected to {serial_port} at {baud_rate} baud.")
+    if record_path is not None:
+        # The reader owns the port, so it is recorded without the ingest process
+        ser = timed_import("replay").RecordingPort(ser, record_path)
+        print("Recording to", record_path)
+    start_reader()
+    return True
+
+
+def send_command(cmd, timeout=None, wait=True):
+    """
+    Sends one command frame to the camera and waits for its ack.
+    Returns the ack status (link.ACK_OK, ...) or None on timeout.
+    With wait=False it returns None right away and the Tk loop looks
+    for the ack every `ack_poll` ms instead (games: no lane waits on
+    a camera).
+
+    """
+
+    global next_request
+
+    if not link_open():
+        return None
+
+    with write_lock:
+        next_request = (next_request + 1) & 0xFFFF
+        req_id = next_request
+        waiter = pending_acks[req_id] = [threading.Event(), None]
+        try:
+            if ingest is not None:
+                ingest.send(link.encode_command(req_id, cmd))
+            else:
+                ser.write(link.encode_command(req_id, cmd))
+        except (serial.SerialException, OSError) as e:
+            pending_acks.pop(req_id, None)
+            print("Serial error:", e)
+            return None
+
+    timeout = command_timeout if timeout is None else timeout
+    if not wait and root is not None:
+        poll_ack(cmd, req_id, waiter, time.perf_counter() + timeout)
+        return None
+    waiter[0].wait(timeout)
+    return ack_status(cmd, req_id, waiter)
+
+
+def poll_ack(cmd, req_id, waiter, deadline):
+    # Tk callback: looks for the ack of a command sent with wait=False
+    if not waiter[0].is_set() and time.perf_counter() < deadline:
+        root.after(ack_poll, lambda: poll_ack(cmd, req_id, waiter, deadline))
+        return
+    ack_status(cmd, req_id, waiter)
+
+
+def ack_status(cmd, req_id, waiter):
+    # Status of a command once its wait is over (None = no ack)
+    pending_acks.pop(req_id, None)
+
+    if not waiter[0].is_set():
+        print(f"No ack from camera for '{cmd}' (#{req_id}).")
+        return None
+    if waiter[1] != link.ACK_OK:
+        print(f"Camera refused '{cmd}': {link.ACK_NAMES.get(waiter[1], waiter[1])}")
+    return waiter[1]
+
+
+def pump_ingest():
+    # Moves new records from the ingest process's ring into `events`
+    if ingest is None:
+        return
+    if ingest.matrix is not matrix:
+        ingest.set_matrix(matrix, transform_type)     # new calibration
+    for event in ingest.poll():
+        events.put(event)
+
+
+def drain_events():
+    # Drops events left over from an earlier game or calibration
+    pump_ingest()
+    while True:
+        try:
+            events.get_nowait()
+        except queue.Empty:
+            return
+
+
+def start_reader():
+    # Starts the reader thread on the currently open `ser`
+    global reader_thread, reader_stop, link_decoder
+
+    reader_stop = threading.Event()
+    link_decoder = link.FrameDecoder()
+    reader_thread = threading.Thread(
+        target=serial_reader, args=(ser, reader_stop, events, pending_acks, cam_offsets, link_decoder),
+        name="serial-reader", daemon=True
+    )
+    reader_thread.start()
+
+
+def stop_reader():
+    # Stops the reader thread and closes the serial port it owns
+    # (or the ingest process that owns it)
+    global reader_thread, reader_stop, ingest
+
+    if ingest is not None:
+        ingest.stop()
+        ingest = None
+
+    if reader_stop is not None:
+        reader_stop.set()
+    if reader_thread is not None and reader_thread is not threading.current_thread():
+        reader_thread.join(timeout=1)
+    reader_thread = None
+    reader_stop = None
+
+    if ser and ser.is_open:
+        ser.close()
+
+
+def reader_alive():
+    if ingest is not None:
+        return ingest.alive()
+    return reader_thread is not None and reader_thread.is_alive()
+
+
+def record_ingest(stamp):
+    # Bookkeeping for the `perf` command
+    latency = time.perf_counter() - stamp
+    ingest_stats["events"] += 1
+    ingest_stats["latency_sum"] += latency
+    ingest_stats["latency_max"] = max(ingest_stats["latency_max"], latency)
+    ingest_latency.append(latency)
+
+
+def print_perf():
+    """
+    Prints queue depth and per-event ingest latency
+    (time between a line arriving on the serial port and the
+    Tk loop acting on it).
+
+    """
+
+    n = ingest_stats["events"]
+    print("\nSerial ingest:")
+    print(f"  reader        : {'running' if reader_alive() else 'stopped'}"
+          f"{' (ingest process)' if ingest is not None else ''}")
+    print(f"  events        : {n}")
+    print(f"  queue depth   : {events.qsize()} now, "
+          f"{ingest_stats['depth']} at last drain, {ingest_stats['max_depth']} max")
+
+    if n:
+        recent = sorted(ingest_latency)
+        p50 = recent[len(recent) // 2]
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))]
+        print(f"  latency (ms)  : avg {1000 * ingest_stats['latency_sum'] / n:.2f}, "
+              f"p50 {1000 * p50:.2f}, p95 {1000 * p95:.2f}, "
+              f"max {1000 * ingest_stats['latency_max']:.2f}")
+
+    if ingest is not None:
+        print(f"  ring          : {ingest.ring.unread()} unread / {ingest.ring.slots}, "
+              f"{ingest.ring.dropped} dropped")
+
+    if link_decoder is not None:
+        print("\nLink:")
+        print(f"  frames        : {link_decoder.frames}")
+        print(f"  crc errors    : {link_decoder.crc_errors}")
+        print(f"  dropped shots : {link_decoder.dropped}")
+        if link_decoder.bad_version:
+            print(f"  bad version   : {link_decoder.bad_version}")
+
+    if sprite_stats["hits"] or sprite_stats["misses"]:
+        print("\nText sprites:")
+        print(f"  cached        : {len(sprite_cache)} / {sprite_cache_size}")
+        print(f"  hits / misses : {sprite_stats['hits']} / {sprite_stats['misses']}, "
+              f"{sprite_stats['evictions']} evicted")
+
+    frames = frame_stats["frames"]
+    redraws = frame_stats["redraws"]
+    print("\nFrame batching:")
+    print(f"  frames        : {frames}")
+    if frames:
+        print(f"  events/frame  : avg {frame_stats['events'] / frames:.2f}, "
+              f"max {frame_stats['max_events']}")
+    print(f"  redraws       : {redraws}")
+    if redraws:
+        print(f"  redraw (ms)   : avg {1000 * frame_stats['redraw_sum'] / redraws:.2f}, "
+              f"max {1000 * frame_stats['redraw_max']:.2f}")
+
+    if tick_stats["ticks"]:
+        recent = sorted(tick_late)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))]
+        print("\nTick driver (glide):")
+        print(f"  ticks         : {tick_stats['ticks']} at {tick_rate} Hz")
+        print(f"  late (ms)     : avg {1000 * tick_stats['late_sum'] / tick_stats['ticks']:.2f}, "
+              f"p95 {1000 * p95:.2f}, max {1000 * tick_stats['late_max']:.2f}")
+        print(f"  catch-up      : up to {tick_stats['catchup_max']} step(s) per frame")
+
+    if game_clock.latency:
+        print("\nGame clock (timer lateness):")
+        for line in game_clock.report():
+            print("  " + line)
+
+    print(f"\nRender backend: {render_backend}")
+    for name, (count, total, worst) in backend_stats.items():
+        if count:
+            print(f"  {name:<13} : {count} repaints, avg {1000 * total / count:.2f} ms, "
+                  f"max {1000 * worst:.2f} ms")
+    if compositor is not None and compositor.stats["frames"]:
+        s = compositor.stats
+        n = s["frames"]
+        print(f"  compose (ms)  : avg {1000 * s['compose'] / n:.2f}, "
+              f"blit avg {1000 * s['blit'] / n:.2f}, max frame {1000 * s['max']:.2f}")
+        print(f"  dirty area    : avg {s['pixels'] / n / 1000:.1f} kpx per frame")
+
+
+def print_startup():
+    """
+    Prints how long each imported module took to load and how
+    long it took until the first `Enter command:` prompt.
+
+    """
+
+    print("\nStartup:")
+    for name, seconds in sorted(import_times.items(), key=lambda kv: -kv[1]):
+        lazy = " (lazy)" if name == "cv2" else ""
+        print(f"  import {name:<10}: {1000 * seconds:8.1f} ms{lazy}")
+    if cv2 is None:
+        print(f"  import {'cv2':<10}:  not loaded")
+    if "prompt" in startup_stats:
+        print(f"  to prompt        : {1000 * startup_stats['prompt']:8.1f} ms")
+
+
+#  FRAME BATCHING
+
+def request_redraw():
+    # Marks the canvas dirty; repeated calls within a frame share one repaint
+    global redraw_pending
+
+    if redraw_pending or root is None:
+        return
+    redraw_pending = True
+    root.after_idle(flush_redraw)
+
+
+def flush_redraw():
+    # Repaints the canvas once if anything changed since the last repaint
+    global redraw_pending
+
+    if not redraw_pending:
+        return
+    redraw_pending = False
+
+    t0 = time.perf_counter()
+    if use_composite():
+        compositor.render()
+    root.update_idletasks()
+    elapsed = time.perf_counter() - t0
+
+    frame_stats["redraws"] += 1
+    frame_stats["redraw_sum"] += elapsed
+    frame_stats["redraw_max"] = max(frame_stats["redraw_max"], elapsed)
+
+    stats = backend_stats[render_backend]
+    stats[0] += 1
+    stats[1] += elapsed
+    stats[2] = max(stats[2], elapsed)
+
+
+#  GAME CLOCK
+
+def game_timer(delay_ms, fn, name, anchor=None, interval_ms=None):
+    """
+    Schedules `fn` on the game clock `delay_ms` after `anchor`
+    (default: now; pass game_clock.due to stay on the grid of the
+    timer that is running), repeating every `interval_ms` if given.
+    All game timers are cancelled when the next game starts.
+
+    """
+
+    tid = game_clock.schedule(delay_ms / 1000, fn, name, group="game", anchor=anchor,
+                              interval=None if interval_ms is None else interval_ms / 1000)
+    arm_clock()
+    return tid
+
+
+def arm_clock():
+    # Keeps exactly one Tk callback pending, for the earliest timer
+    global clock_after, clock_armed
+
+    due = game_clock.next_due()
+    if due is None or root is None:
+        return
+    if clock_after is not None:
+        if clock_armed <= due:
+            return
+        root.after_cancel(clock_after)
+    delay = max(0, math.ceil((due - time.perf_counter()) * 1000))
+    clock_after = root.after(delay, clock_tick)
+    clock_armed = due
+
+
+def clock_tick():
+    # The single Tk callback that drives every game timer
+    global clock_after
+
+    clock_after = None
+    game_clock.run_due()
+    arm_clock()
+
+
+#  SERIAL EVENT LOOP
+
+def read_serial(rounds, Name, session):
+    """
+    Main loop that consumes serial events on the Tk thread.
+    The reader thread does the actual port I/O; once per display
+    frame (`frame_interval` ms) this function applies every queued
+    event as one batch and then repaints the canvas once.
+
+    Camera sends:
+        "differencing..." → start game
+        shot frame / "X:123 # Y:456" → shot detected
+        other debug text → printed
+
+    Based on game mode:
+        Mode 1 = fixed target
+        Mode 2 = hide + teleport target
+        Mode 3 = timed appearance + strict scoring
+
+    The loop ends when its game `session` is over. With lanes one
+    callback (serve_lanes) polls every lane instead.
+
+    """
+
+    global serving
+
+    if lane_set is not None:
+        serving = (rounds, Name, session)
+        arm_lanes()
+        return
+    if apply_events(rounds, Name, session):
+        root.after(frame_interval, lambda: read_serial(rounds, Name, session))
+
+
+def apply_events(rounds, Name, session):
+    # One frame of read_serial; False once its loop is over
+
+    # Game over or replaced by a newer one
+    if session != game_session:
+        return False
+
+    pump_ingest()
+
+    # Nothing left to consume
+    if not reader_alive() and events.empty():
+        print("Serial port not open.")
+        return False
+
+    depth = events.qsize()
+    ingest_stats["depth"] = depth
+    ingest_stats["max_depth"] = max(ingest_stats["max_depth"], depth)
+
+    applied = 0
+    for _ in range(depth):
+        if countdown:
+            break                   # shots wait for the game to start
+        try:
+            event = events.get_nowait()
+        except queue.Empty:
+            break
+        handle_event(event, rounds, Name)
+        applied += 1
+
+    # One repaint for the whole batch
+    if applied:
+        frame_stats["frames"] += 1
+        frame_stats["events"] += applied
+        frame_stats["max_events"] = max(frame_stats["max_events"], applied)
+        flush_redraw()
+
+    # Continue polling (unless the game just ended)
+    return session == game_session and (reader_alive() or not events.empty())
+
+
+def arm_lanes():
+    # Keeps the one serve_lanes callback pending while a lane is serving
+    global lanes_after
+    if lanes_after is None:
+        lanes_after = tk_master.after(frame_interval, serve_lanes)
+
+
+def serve_lanes():
+    """
+    The frame callback of all lanes. Only lanes with something to do
+    (queued events, an ingest ring to drain, a finished game or reader)
+    are swapped in, oldest queued event first, each once per frame and
+    straight from one to the next: an idle lane costs no switch, so a
+    shot's latency does not grow with the number of lanes.
+
+    """
+
+    global lanes_after
+    lanes_after = None
+
+    # A lane whose reader stopped was stopped by its own code (reader_thread
+    # is None then) or queued an "error"; a game that ended ended its loop
+    value = lane_set.value
+    ready, busy = [], False
+    for lane in lane_set.lanes:
+        if value(lane, "serving") is None:
+            continue
+        busy = True
+        queued = value(lane, "events").queue
+        if queued:
+            ready.append((queued[0][1], lane.number, lane))
+        elif value(lane, "ingest") is not None or value(lane, "reader_thread") is None:
+            ready.append((0.0, lane.number, lane))
+    ready.sort()
+
+    lane_set.each([lane for *_, lane in ready], serve_lane)
+    if busy:
+        arm_lanes()
+
+
+def serve_lane():
+    # serve_lanes in one lane: a frame of its read_serial loop
+    global serving
+    if serving is not None and not apply_events(*serving):
+        serving = None
+
+
+def start_countdown(Name):
+    """
+    READY? for 3 s, START! for 1 s, then the game starts. Both steps
+    are game clock timers, so the other lanes keep running; the events
+    of this lane wait in its queue until the game has started.
+
+    """
+
+    global countdown
+    countdown = True
+    outlined_text(target_center[0], target_center[1], "READY?", 160,
+                  fill="black", outline="cyan", offset=2, tags="READY")
+    request_redraw()
+
+    def start_shown():
+        canvas.delete("READY")
+        outlined_text(target_center[0], target_center[1], "START!", 160,
+                      fill="black", outline="cyan", offset=2, tags="START")
+        request_redraw()
+        game_timer(1000, start_game, "countdown", anchor=game_clock.due)
+
+    def start_game():
+        global countdown
+        countdown = False
+        canvas.delete("START")
+
+        # Start game loop
+        if game_mode == 3:
+            print("Started Hard-difficulty\n")
+        elif game_mode == 2:
+            print("Started Medium-difficulty\n")
+        elif game_mode == 4:
+            print("Started Glide-mode\n")
+        elif game_mode == 6:
+            print("Started Endurance-mode\n")
+        elif game_mode == 7:
+            print("Started Multi-target-mode\n")
+        elif game_mode == 8:
+            print(f"Started Mask-mode ({current_mask().name})\n")
+        else:
+            print("Started Easy-difficulty\n")
+        show_game(game.start(time.perf_counter()), Name)
+
+    game_timer(3000, start_shown, "countdown")
+
+
+def handle_event(event, rounds, Name):
+    # Applies one event from the reader thread to the game
+
+    global canvas, matrix, transform_type
+
+    kind, stamp, *data = event
+    record_ingest(stamp)
+
+    # Start Sequence
+    if kind == "start":
+        start_countdown(Name)
+
+    # Shots detected: "X:### # Y:###" ("hit" = already mapped to the screen by the ingest process)
+    elif kind in ("shot", "hit"):
+        hit_x, hit_y = data[:2]
+        shot_at = data[2] if len(data) > 2 else stamp
+
+        # Transformation from camera → screen coordinates
+        if kind == "hit" or (matrix is not None and transform_type is not None):
+            if kind == "hit":
+                x_corr, y_corr = hit_x, hit_y
+            else:
+                x_corr, y_corr = correct_coords(hit_x, hit_y, matrix, transform_type)
+
+            # Scoring, ammo and the end of the game are up to the engine
+            if canvas and game is not None:
+                show_game(game.shot(time.perf_counter(), x_corr, y_corr, shot_at), Name)
+        else:
+            print("Transform not computed yet. Run calibration first.")
+
+    # Broken shot line or dead port
+    elif kind == "error":
+        print(data[0])
+        if data[0].startswith("Serial error"):
+            stop_reader()
+
+    # Camera sent unrelated text
     else:
-        print("Unexpected number of blobs.")
-        return None, None
+        print(data[0])
 
-    return matrix, transform_type
+#  TEXT SPRITES
 
+def load_pil():
+    # Imports Pillow on first use; None when it is missing
+    global PIL, pil_checked
 
-#  BLOB SORTING 
+    if not pil_checked:
+        pil_checked = True
+        try:
+            timed_import("PIL.Image")
+            timed_import("PIL.ImageDraw")
+            timed_import("PIL.ImageFont")
+            timed_import("PIL.ImageTk")
+            PIL = sys.modules["PIL"]
+        except ImportError:
+            print("Pillow not installed, labels are drawn as Tk text.")
+    return PIL
+
+
+def sprite_font(size):
+    # Bold TrueType font for a Tk point size (None if no font file is found)
+    if size not in sprite_font_files:
+        px = max(1, round(size * canvas.winfo_fpixels("1p")))
+        font = None
+        for name in sprite_fonts:
+            try:
+                font = PIL.ImageFont.truetype(name, px)
+                break
+            except OSError:
+                continue
+        sprite_font_files[size] = font
+    return sprite_font_files[size]
 
-def sort_blobs_by_position(blobs):
-    """
-    Sorts the detected calibration blobs into a consistent order:
-        0 = Top-left
-        1 = Top-middle
-        2 = Top-right
-        3 = Bottom-left
-        4 = Bottom-middle
-        5 = Bottom-right
 
-    Sorting is performed by first splitting into top/bottom rows
-    based on Y values, then left→right by X values.
+def text_sprite(text, size, fill, outline=None, offset=1):
+    """
+    Returns a cached PhotoImage of `text` drawn like the game's
+    outlined labels (four copies in `outline` shifted by `offset`
+    under one copy in `fill`), or None when sprites are unavailable.
 
     """
 
-    if not blobs:
-        return [None] * 6
+    if not use_sprites:
+        return None
+
+    key = (text, size, fill, outline, offset)
+    sprite = sprite_cache.get(key)
+    if sprite is not None:
+        sprite_cache.move_to_end(key)
+        sprite_stats["hits"] += 1
+        return sprite
+
+    img = render_label(text, size, fill, outline, offset)
+    if img is None:
+        return None
+    sprite_stats["misses"] += 1
+
+    sprite = PIL.ImageTk.PhotoImage(img, master=canvas)
+    sprite_cache[key] = sprite
+    evict_sprites()
+    return sprite
+
+
+def render_label(text, size, fill, outline=None, offset=1):
+    # Pillow RGBA image of an outlined label (None without Pillow / font)
+    if load_pil() is None:
+        return None
+    font = sprite_font(size)
+    if font is None:
+        return None
+
+    # Same box Tk centres text in: advance width × (ascent + descent)
+    ascent, descent = font.getmetrics()
+    pad = offset if outline else 0
+    width = int(math.ceil(font.getlength(text))) + 2 * pad
+    height = ascent + descent + 2 * pad
+
+    img = PIL.Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = PIL.ImageDraw.Draw(img)
+    if outline:
+        for dx, dy in [(-offset,0), (offset,0), (0,-offset), (0,offset)]:
+            draw.text((pad + dx, pad + dy), text, font=font, fill=tk_rgb(outline))
+    draw.text((pad, pad), text, font=font, fill=tk_rgb(fill))
+    return img
+
+
+def evict_sprites():
+    # Drops least recently used sprites that no canvas item shows any more
+    if len(sprite_cache) <= sprite_cache_size:
+        return
+    for key in list(sprite_cache):
+        if len(sprite_cache) <= sprite_cache_size:
+            break
+        if not canvas.tk.getboolean(canvas.tk.call("image", "inuse", str(sprite_cache[key]))):
+            del sprite_cache[key]
+            sprite_stats["evictions"] += 1
 
-    # Sort by vertical (y)
-    sorted_by_y = sorted(blobs, key=lambda b: b['y'])
-    half = len(sorted_by_y) // 2
 
-    top = sorted(sorted_by_y[:half], key=lambda b: b['x'])
-    bottom = sorted(sorted_by_y[half:], key=lambda b: b['x'])
+def tk_rgb(color):
+    # Any Tk colour name → (r, g, b) for Pillow
+    r, g, b = canvas.winfo_rgb(color)
+    return (r >> 8, g >> 8, b >> 8)
 
-    # Prepare ordered list
-    ordered = [None] * 6
 
-    # Assign sorted blobs to positions
-    if len(top) >= 1: ordered[0] = top[0]  # TL
-    if len(top) >= 2: ordered[1] = top[1]  # TM
-    if len(top) >= 3: ordered[2] = top[2]  # TR
+def outlined_text(x, y, text, size, fill, outline=None, offset=1, tags=None):
+    """
+    Draws a (optionally outlined) bold Arial label centred on (x, y).
+    Uses one image item from the sprite cache; without Pillow it falls
+    back to the five create_text calls. Returns the id of the top item.
 
-    if len(bottom) >= 1: ordered[3] = bottom[0]  # BL
-    if len(bottom) >= 2: ordered[4] = bottom[1]  # BM
-    if len(bottom) >= 3: ordered[5] = bottom[2]  # BR
+    """
 
-    return ordered
+    text = str(text)
+    sprite = text_sprite(text, size, fill, outline, offset)
+    if sprite is not None:
+        return canvas.create_image(x, y, image=sprite, tags=tags)
 
+    font = ("Arial", size, "bold")
+    if outline:
+        for dx, dy in [(-offset,0), (offset,0), (0,-offset), (0,offset)]:
+            canvas.create_text(x + dx, y + dy, text=text, fill=outline, font=font, tags=tags)
+    return canvas.create_text(x, y, text=text, fill=fill, font=font, tags=tags)
 
-#  ROUND START
 
-def round_start(rounds,cmd,Name):
-    """
-    Prepares and starts a game session.
+#  COMPOSITE BACKEND (static layers composited off-screen, one blit per frame)
 
-    Steps:
-    1. Resets `round_count`
-    2. Reopens serial port
-    3. Draws game monitor UI (target + battery)
-    4. Starts serial reading loop that waits for hits
+def use_composite():
+    # True while the game screens are drawn by the compositor
+    return render_backend == "composite" and compositor is not None
 
-    """
 
-    global ser, round_count,canvas,game_mode
-    round_count = 0
+def set_backend(name):
+    # Switches the render backend ("canvas" or "composite")
+    global render_backend
 
-    # Ensure serial starts fresh
-    if ser and ser.is_open:
-        ser.close()
-    time.sleep(0.5)
+    if name not in ("canvas", "composite"):
+        print("Usage: backend <canvas|composite>")
+        return
+    if running:
+        print("Cannot switch the backend during a game.")
+        return
+    if name == "composite" and load_pil() is None:
+        print("Composite backend needs Pillow, staying on:", render_backend)
+        return
 
-    if matrix is not None:   # Calibration must be done
-        try:
-            ser = serial.Serial(serial_port, baud_rate, timeout=0.1)
-            print(f"\nConnected to {serial_port} at {baud_rate} baud.")
+    render_backend = name
+    start_backend()
+    print("Render backend:", render_backend)
 
-            # Draw game UI
-            game_monitor(canvas)
 
-            # Begin serial reading for hits/detections
-            read_serial(rounds, Name)
-        
-        except Exception as e:
-            print("Error opening serial port:", e)
+def start_backend():
+    # (Re)creates the compositor for the current canvas
+    global compositor
 
-                # Log into protocol
-        with open(protocol_path, "a") as proto_file:
-            proto_file.write("\n" + cmd)
-    else:
-        print("run calibration first")
+    if compositor is not None:
+        try:
+            compositor.destroy()
+        except tk.TclError:
+            pass                 # window already closed
+        compositor = None
 
+    if render_backend == "composite" and canvas is not None and load_pil() is not None:
+        Compositor = timed_import("compositor").Compositor
+        compositor = Compositor(canvas, canvas_width, canvas_height, tk_rgb(canvas["bg"]))
+        request_redraw()
 
-#  COORD CORRECTION
 
-def correct_coords(x_cam, y_cam, matrix, transform_type):
-    pt = np.array([[[x_cam, y_cam]]], dtype=np.float32)
-    if transform_type == "Affine":
-        pt_corr = cv2.transform(pt, matrix)
-    elif transform_type == "Perspective":
-        pt_corr = cv2.perspectiveTransform(pt, matrix)
-    else:
-        raise ValueError("Unknown transform type")
-    return pt_corr[0][0]
+def clear_layers():
+    # Screen change: drops every layer and marker of the compositor
+    if use_composite():
+        compositor.clear()
+        request_redraw()
 
 
-#  SERIAL READER
+def place_layer(name, x, y):
+    # Moves a layer so that its centre lies on (x, y)
+    layer = compositor.layers[name]
+    compositor.move_layer(name, x - layer.w // 2, y - layer.h // 2)
 
-def read_serial(rounds, Name):
-    """
-    Main loop that listens to serial input from camera.
 
-    Camera sends:
-        "differencing..." → start game
-        "X:123 # Y:456"    → shot detected
-        other debug text → printed
+def paste_label(img, x, y, text, size, fill, outline=None, offset=1):
+    # Pillow counterpart of outlined_text: label centred on (x, y) in `img`
+    label = render_label(str(text), size, fill, outline, offset)
+    if label is not None:
+        img.alpha_composite(label, (int(x - label.width / 2), int(y - label.height / 2)))
 
-    Based on game mode:
-        Mode 1 = fixed target
-        Mode 2 = hide + teleport target
-        Mode 3 = timed appearance + strict scoring
 
+def target_layer():
+    # Rings + labels of the target, centred in a square image (drawn once)
+    if game_mode == 8 and current_mask() is not None:
+        return mask_image()
+    if "target" not in layer_cache:
+        outer = target_rings * ring_step
+        c = outer + 2
+        img = PIL.Image.new("RGBA", (2 * c, 2 * c), (0, 0, 0, 0))
+        draw = PIL.ImageDraw.Draw(img)
+
+        for i in range(target_rings):
+            radius1 = (target_rings - i) * ring_step
+            draw.ellipse((c - radius1, c - radius1, c + radius1, c + radius1),
+                         fill=tk_rgb("black"), outline=tk_rgb("cyan"), width=3)
+        for i in range(target_rings - 1):
+            radius1 = (target_rings - i) * ring_step
+            radius2 = (target_rings - (i + 1)) * ring_step
+            label_y = radius2 + (radius1 - radius2) / 2
+            paste_label(img, c, c + label_y, points[i], 50, fill="black", outline="cyan")
+            paste_label(img, c, c - label_y, points[i], 50, fill="black", outline="cyan")
+        paste_label(img, c, c, "100", 50, fill="black", outline="cyan")
+
+        layer_cache["target"] = img
+    return layer_cache["target"]
+
+
+def battery_layer():
+    # Ammo counter with the segments in `batt_state` (redrawn when one changes)
+    img = PIL.Image.new("RGBA", (length_x + 1, length_y + 1), (0, 0, 0, 0))
+    draw = PIL.ImageDraw.Draw(img)
+    ox, oy = startpoint
+
+    draw.rectangle((0, 0, length_x, length_y), fill=tk_rgb("lawngreen"), outline=tk_rgb("black"))
+    draw.rectangle((distanz, distanz, length_x - distanz, length_y - distanz),
+                   fill=tk_rgb("black"), outline=tk_rgb("black"))
+    for fill, trapezoid in zip(batt_state, battery_segments()):
+        if fill is not None:
+            draw.polygon([v - (ox if k % 2 == 0 else oy) for k, v in enumerate(trapezoid)],
+                         fill=tk_rgb(fill))
+    return img
+
+
+def emblem_layer():
+    # The J.F emblem of Emblem() (drawn once)
+    if "emblem" not in layer_cache:
+        img = PIL.Image.new("RGBA", (12 * 16, 12 * 16), (0, 0, 0, 0))
+        draw = PIL.ImageDraw.Draw(img)
+        for polygon, fill in emblem_polygons((0, 0)):
+            draw.polygon(polygon, fill=tk_rgb(fill))
+        layer_cache["emblem"] = img
+    return layer_cache["emblem"]
+
+
+#  CANVAS ITEM POOL
+
+def pool_item(kind, coords, tags, **options):
     """
+    Shows an oval / text item ("oval" or "text") at `coords`.
+    Reuses a released item of the same kind when there is one; at
+    `pool_cap` pooled items the oldest shown one is recycled, so the
+    number of pooled canvas items never exceeds the cap.
 
-    global ser, canvas, round_count, matrix, transform_type
-    global game_mode, running, target_hide_time, move_interval
-    global shots, free, rbs, missed_rounds
+    """
 
-    # No serial port available
-    if ser is None or not ser.is_open:
-        print("Serial port not open.")
-        return
+    idle = item_pool[kind]
+    while idle:
+        item = idle.pop()
+        if canvas.type(item) is not None:       # skip items deleted behind our back
+            canvas.coords(item, *coords)
+            canvas.itemconfigure(item, state="normal", tags=tags, **options)
+            canvas.tag_raise(item)
+            pool_stats["reused"] += 1
+            pool_live[item] = kind
+            return item
+
+    if len(pool_live) + len(item_pool["oval"]) + len(item_pool["text"]) >= pool_cap:
+        other = item_pool["text" if kind == "oval" else "oval"]
+        if other:
+            canvas.delete(other.pop())
+            pool_stats["deleted"] += 1
+        else:
+            for item, k in pool_live.items():
+                if k == kind:
+                    del pool_live[item]
+                    canvas.coords(item, *coords)
+                    canvas.itemconfigure(item, state="normal", tags=tags, **options)
+                    canvas.tag_raise(item)
+                    pool_stats["recycled"] += 1
+                    pool_live[item] = kind
+                    return item
+
+    create = canvas.create_oval if kind == "oval" else canvas.create_text
+    item = create(*coords, tags=tags, **options)
+    pool_stats["created"] += 1
+    pool_live[item] = kind
+    return item
+
+
+def clear_items(*tags):
+    # Replaces canvas.delete(*tags): pooled items are hidden for reuse,
+    # everything else (rings, sprites, battery, ...) is deleted
+    for tag in tags:
+        for item in canvas.find_withtag(tag):
+            kind = pool_live.pop(item, None)
+            if kind is None:
+                canvas.delete(item)
+            else:
+                canvas.itemconfigure(item, state="hidden", tags="pooled")
+                item_pool[kind].append(item)
 
-    try:
 
-        # Read serial line
-
-        line = ser.readline()
-        if line:
-            treffer = line.decode('utf-8').strip()
-
-            # Start Sequence
-            if "differencing" in treffer:
-                for dx, dy in [(-2,0), (2,0), (0,-2), (0,2)]:
-                    canvas.create_text(
-                        target_center[0] + dx, target_center[1] + dy,
-                        text="READY?", fill="cyan",
-                        font=("Arial", 160, "bold"), tags="READY"
-                    )
-                canvas.create_text(
-                    target_center[0], target_center[1],
-                    text="READY?", fill="black",
-                    font=("Arial", 160, "bold"), tags="READY"
-                )
-                root.update()
-                time.sleep(3)
-
-                canvas.delete("READY")
-
-                for dx, dy in [(-2,0), (2,0), (0,-2), (0,2)]:
-                    canvas.create_text(
-                        target_center[0] + dx, target_center[1] + dy,
-                        text="START!", fill="cyan",
-                        font=("Arial", 160, "bold"), tags="START"
-                    )
-                canvas.create_text(
-                    target_center[0], target_center[1],
-                    text="START!", fill="black",
-                    font=("Arial", 160, "bold"), tags="START"
-                )
+def reset_pool():
+    # Forgets all pooled items (new canvas)
+    pool_live.clear()
+    for idle in item_pool.values():
+        idle.clear()
 
-                root.update()
-                time.sleep(1)
-                canvas.delete("START")
 
-                # Start game loop
-                running = True
+def process_rss():
+    # Resident memory of this process in bytes (None when unknown)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
 
-                # mode 3 = hard mode (timed, moving target)
-                if game_mode == 3:
-                    print("Started Hard-difficulty\n")
-                    target_hide_time = 1500
-                    move_interval = 3000
-                    auto_move_target(Name)
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
 
-                # mode 2 = Medium (random hide/move)
-                elif game_mode == 2:
-                    print("Started Medium-difficulty\n")
-                    target_hide_time = random.randint(700,1500)
-                    move_interval = target_hide_time + random.randint(700,1500) + 500
-                    auto_move_target(Name)
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize",
+                    "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                    "PagefileUsage", "PeakPagefileUsage")]
 
-                # mode 1 = Easy (fixed target)
-                else:
-                    print("Started Easy-difficulty\n")
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
 
-            # Shots detected: "X:### # Y:###" 
-            elif "X" in treffer and "Y" in treffer:
-                try:
-                    parts = treffer.split("#")
-                    hit_x = int(parts[0].split(":")[1])
-                    hit_y = int(parts[1].split(":")[1])
-
-                    # Mode 3 uses "free" to prevent double-scoring
-                    if not free or game_mode != 3:
-                        round_count += 1
-
-                    # Transformation from camera → screen coordinates
-                    if matrix is not None and transform_type is not None:
-                        x_corr, y_corr = correct_coords(hit_x, hit_y, matrix, transform_type)
-
-                        # Do not exceed max rounds
-                        if canvas and missed_rounds + shots < rounds + 1:
-                            game_hit(canvas, x_corr, y_corr)
-                            free = False
-
-                            # Remove next battery segment (visual ammo)
-                            canvas.delete(f"batt{rounds - rbs + 1}")
-                            root.update()
-                    else:
-                        print("Transform not computed yet. Run calibration first.")
 
-                except Exception as e:
-                    print("Parsing error:", e)
+def print_stats():
+    """
+    Prints how many canvas items are alive, the state of the item
+    pool and the resident memory of the process (for long events).
 
-            # Camera sent unrelated text
-            else:
-                print(treffer)
+    """
+
+    print("\nCanvas:")
+    if canvas is None:
+        print("  no monitor open")
+    else:
+        print(f"  live items    : {len(canvas.find_all())}")
+        print(f"  pooled        : {len(pool_live)} shown, "
+              f"{len(item_pool['oval']) + len(item_pool['text'])} idle (cap {pool_cap})")
+        print(f"  created       : {pool_stats['created']}, reused {pool_stats['reused']}, "
+              f"recycled {pool_stats['recycled']}, deleted {pool_stats['deleted']}")
+        print(f"  text sprites  : {len(sprite_cache)} / {sprite_cache_size}")
 
-        # Continue polling
-        root.after(100, lambda: read_serial(rounds, Name))
+    rss = process_rss()
+    print("\nProcess:")
+    print(f"  RSS           : {'unknown' if rss is None else f'{rss / 2**20:.1f} MiB'}")
 
-    except serial.SerialException as e:
-        print("Serial error:", e)
-        if ser and ser.is_open:
-            ser.close()
 
 # ------------------- GUI -------------------
 def monitor_create():
     # Creates the Canvas on which ever other screen is build 
     # (if this function is run twice only the newer one will run the screens)
-    global root, canvas
+    global root, canvas, clock_after
 
-    root = tk.Tk()
-    root.title("Laser-Game")
+    root = new_window()
+    clock_after = None        # a pending tick belonged to the old window
+    root.title("Laser-Game" if lane_set is None else f"Laser-Game - Lane {lane_set.active.number}")
     canvas = tk.Canvas(root, width=canvas_width, height=canvas_height, bg="black")
     canvas.pack()
+    reset_pool()
+    start_backend()
+    bind_board_keys()
     
     root.update()
     print("Monitor window created.")
     Credits()
     return root, canvas
 
+def new_window():
+    # One lane: a new Tk root per monitor. With lanes the first window is
+    # the Tk root, the others are its Toplevels, and each window runs its
+    # callbacks in its own lane.
+    global tk_master, lanes_after
+
+    if lane_set is None:
+        tk_master = tk.Tk()
+        return tk_master
+
+    try:
+        window = tk.Toplevel(tk_master)
+    except (tk.TclError, AttributeError):      # no master yet, or it was closed
+        window = tk_master = tk.Tk()
+        lanes_after = None                      # went with the old master
+    n = lane_set.active.number
+    window.geometry(f"{canvas_width}x{canvas_height}+{(n - 1) * lane_screen_offset}+0")
+    return lanes.LaneWindow(lane_set, lane_set.active, window)
+
 def monitor_setup(canvas, width, height, radius):
     # runs the screen for the calibration
     try:
-        canvas.delete("target","START","batt")
-        for i in range(rounds+1):
-            canvas.delete(f"batt{i}")
+        clear_items("target","START","batt","miss")
+        clear_layers()
     except:
         pass 
     """Draw 6 calibration circles"""
@@ -505,67 +1939,116 @@ def monitor_setup(canvas, width, height, radius):
 
 def game_monitor(canvas):
     # runs the screen for the for the game 
-    global score   
+    clear_items("board", "miss", "batt")   # fresh target, no markers / ammo from the last game
+    clear_layers()
     draw_target(*target_center) 
     batterie(canvas)
 
 def draw_target(x, y):
-    # Creates the target
+    # Shows the target at (x, y). The item group ("board") is built once,
+    # afterwards showing it only moves / unhides the existing items.
     global target_visible, canvas, target_center
-    canvas.delete("target")
     if not target_visible:
+        hide_board()
         print("nicht sichtbar")
         return
 
+    if use_composite():
+        if not compositor.has_layer("target"):
+            compositor.set_layer("target", target_layer(), 0, 0, z=1)
+        place_layer("target", x, y)
+        compositor.show_layer("target")
+        request_redraw()
+    elif not board_exists():
+        build_board(x, y)
+    else:
+        move_board(x, y)
+        canvas.itemconfigure("board", state="normal")
+        canvas.tag_raise("board")
+
+def hide_board():
+    # Hides the target group (markers included) without deleting it
+    if use_composite():
+        compositor.show_layer("target", False)
+    else:
+        canvas.itemconfigure("board", state="hidden")
+
+def board_exists():
+    # False when the group was never built or got deleted with a screen change
+    return board_ring is not None and canvas.type(board_ring) is not None
+
+def move_board(x, y):
+    # Moves the whole target group (rings, labels, hit markers) in one call
+    global board_pos
+    if board_pos != (x, y):
+        canvas.move("board", x - board_pos[0], y - board_pos[1])
+        board_pos = (x, y)
+
+def build_board(x, y):
+    # Creates the target items once; hit markers are added by show_game
+    global board_ring, board_pos
+    tags = ("target", "board")
+    board_ring = None
+
+    if game_mode == 8 and current_mask() is not None:
+        board_ring = canvas.create_image(x, y, image=mask_photo(), tags=tags)
+        board_pos = (x, y)
+        return
+
     for i in range(target_rings):
         if i != target_rings - 1:
             radius1 = (target_rings - i) * ring_step
             radius2 = (target_rings-(i+1)) * ring_step
             color = "black"
-            canvas.create_oval(
+            ring = canvas.create_oval(
                 x - radius1, y - radius1,
                 x + radius1, y + radius1,
-                fill=color, outline="cyan", width=3, tags="target"
+                fill=color, outline="cyan", width=3, tags=tags
             
             )
-            for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-                canvas.create_text(target_center[0]+dx, target_center[1]+(radius2+(radius1-radius2)/2)+dy, text=points[i], fill="cyan", font=("Arial", 50, "bold"),tags="target")
-            canvas.create_text(target_center[0], target_center[1]+(radius2+(radius1-radius2)/2), text=points[i], fill="black", font=("Arial", 50, "bold"), tags="target")
-
-            for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-                canvas.create_text(target_center[0]+dx, target_center[1]-(radius2+(radius1-radius2)/2)+dy, text=points[i], fill="cyan", font=("Arial", 50, "bold"),tags="target")
-
-            canvas.create_text(target_center[0], target_center[1]-(radius2+(radius1-radius2)/2), text=points[i], fill="black", font=("Arial", 50, "bold"), tags="target")
+            if board_ring is None:
+                board_ring = ring
+            label_y = radius2+(radius1-radius2)/2
+            outlined_text(x, y+label_y, points[i], 50, fill="black", outline="cyan", tags=tags)
+            outlined_text(x, y-label_y, points[i], 50, fill="black", outline="cyan", tags=tags)
         else:    
             radius1 = (target_rings - i) * ring_step
             color = "black"
-            canvas.create_oval(
+            ring = canvas.create_oval(
                 x - radius1, y - radius1,
                 x + radius1, y + radius1,
-                fill=color, outline="cyan", width=3, tags="target"
+                fill=color, outline="cyan", width=3, tags=tags
             
             )
-    for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-        canvas.create_text(target_center[0]+dx, target_center[1]+dy, text="100", fill="cyan", font=("Arial", 50, "bold"),tags="target")
-    canvas.create_text(target_center[0], target_center[1], text="100", fill="black", font=("Arial", 50, "bold"), tags="target")
-
-    if game_mode==3 or game_mode==2:
-        for i in range(len(shotsx)):
-            if shotsx[i] and shotsy[i]:
-                canvas.create_oval(
-                shotsx[i] - 10, shotsy[i] - 10,
-                shotsx[i] + 10, shotsy[i] + 10,
-                fill="chartreuse2", outline="chartreuse2", tags="target"
-            )
+            if board_ring is None:
+                board_ring = ring
+    outlined_text(x, y, "100", 50, fill="black", outline="cyan", tags=tags)
+
+    board_pos = (x, y)
 
 def batterie(canvas):
     # Functions as an Ammonition counter 
+    if game_mode == 6:
+        ammo_counter()
+        return
+
+    if use_composite():
+        batt_state[:] = ["lawngreen"] * rounds
+        compositor.set_layer("battery", battery_layer(), *startpoint)
+        request_redraw()
+        return
+
     canvas.create_rectangle(startpoint[0], startpoint[1], endpoint[0], endpoint[1],
                             fill="lawngreen", tags="batt")
     canvas.create_rectangle(startpoint[0] + distanz, startpoint[1] + distanz,
                             endpoint[0] - distanz, endpoint[1] - distanz,
                             fill="black", tags="batt")
 
+    for g, trapezoid in enumerate(battery_segments()):
+        canvas.create_polygon(trapezoid, fill="lawngreen", tags=("batt", f"batt{g+1}"))
+
+def battery_segments():
+    # Polygon of every ammo segment, left to right
     points = []
     for g in range(rounds):
         x_offset = startpoint[0] + distanz * 2 + g * (length + distanz)
@@ -595,150 +2078,428 @@ def batterie(canvas):
             ]
 
         points.append(trapezoid)
-        canvas.create_polygon(trapezoid, fill="lawngreen", tags=f"batt{g+1}")
+    return points
+
+def battery_segment(n, fill=None):
+    # Segment n (1 = leftmost) gets `fill`; None removes it
+    if use_composite():
+        if 1 <= n <= len(batt_state):
+            batt_state[n - 1] = fill
+            compositor.set_layer("battery", battery_layer(), *startpoint)
+            request_redraw()
+    elif fill is None:
+        canvas.delete(f"batt{n}")
+    else:
+        canvas.itemconfig(f"batt{n}", fill=fill)
 
 
-#  HIT PROCESSING
+def shot_limit(rounds):
+    # Shots per game: one per battery segment, or the endurance ammo
+    return endurance_shots if game_mode == 6 else rounds
 
-def game_hit(canvas, x, y):
-    """
-    Called whenever a shot is detected.
+def ammo_bar(left):
+    # Bar of the ammo counter for `left` shots, relative to `startpoint`
+    x0, y0 = distanz * 2, distanz * 2
+    x1, y1 = length_x - distanz * 2, length_y - distanz * 2
+    return x0, y0, x0 + (x1 - x0) * left / endurance_shots, y1
 
-    Computes:
-        - distance to target center
-        - score based on ring hit
-        - missed handling
-        - hit marker on screen
+def ammo_counter():
+    # Mode 6: one bar + number instead of a segment per shot
+    if use_composite():
+        compositor.set_layer("battery", ammo_layer(endurance_shots), *startpoint)
+        request_redraw()
+        return
 
-    """
+    ox, oy = startpoint
+    x0, y0, x1, y1 = ammo_bar(endurance_shots)
+    canvas.create_rectangle(startpoint[0], startpoint[1], endpoint[0], endpoint[1],
+                            fill="lawngreen", tags="batt")
+    canvas.create_rectangle(startpoint[0] + distanz, startpoint[1] + distanz,
+                            endpoint[0] - distanz, endpoint[1] - distanz,
+                            fill="black", tags="batt")
+    canvas.create_rectangle(ox + x0, oy + y0, ox + x1, oy + y1, fill="lawngreen", width=0,
+                            tags=("batt", "ammo_bar"))
+    canvas.create_text(ox + length_x / 2, oy + length_y / 2, text=endurance_shots, fill="white",
+                       font=("Arial", 60, "bold"), tags=("batt", "ammo_text"))
+
+def ammo_layer(left):
+    # Composite counterpart of ammo_counter / update_ammo
+    img = PIL.Image.new("RGBA", (length_x + 1, length_y + 1), (0, 0, 0, 0))
+    draw = PIL.ImageDraw.Draw(img)
+    draw.rectangle((0, 0, length_x, length_y), fill=tk_rgb("lawngreen"), outline=tk_rgb("black"))
+    draw.rectangle((distanz, distanz, length_x - distanz, length_y - distanz),
+                   fill=tk_rgb("black"), outline=tk_rgb("black"))
+    if left > 0:
+        draw.rectangle(ammo_bar(left), fill=tk_rgb("lawngreen"))
+    paste_label(img, length_x / 2, length_y / 2, left, 60, "white", "black", 2)
+    return img
+
+def update_ammo(left):
+    # Shrinks the bar / counts down; same cost for the 10th and the 5000th shot
+    if use_composite():
+        compositor.set_layer("battery", ammo_layer(left), *startpoint)
+        return
+    ox, oy = startpoint
+    x0, y0, x1, y1 = ammo_bar(left)
+    canvas.coords("ammo_bar", ox + x0, oy + y0, ox + x1, oy + y1)
+    canvas.itemconfigure("ammo_text", text=left)
+
+
+#  GAME VIEW
+#
+#  The rules of every mode live in engine.py. A game is one
+#  engine.Engine: shots and the camera's start go in, and the events
+#  that come out are drawn here. The engine's own timers (appearances,
+#  glide frames, game time, target lifetimes) are driven by a single
+#  game clock timer kept armed for its next due time.
+
+def game_rules():
+    # Rules of the next game from the current settings
+    return engine.Rules(
+        mode=game_mode, rounds=rounds, ring_step=ring_step, points=tuple(points),
+        width=canvas_width, height=canvas_height, center=(canvas_width//2, canvas_height//2 - 50),
+        battery_height=length_y, hide_grace=hide_grace,
+        hard_hide_time=hard_hide_time, hard_move_interval=hard_move_interval,
+        medium_hide_range=medium_hide_range, medium_show_range=medium_show_range,
+        medium_show_extra=medium_show_extra,
+        tick_rate=tick_rate, glide_speed=glide_speed, glide_duration=glide_duration,
+        endurance_time=endurance_time, endurance_shots=endurance_shots,
+        multi_count=multi_count, multi_time=multi_time, multi_lifetime=multi_lifetime,
+        multi_kinds=multi_kinds, multi_cell=multi_cell,
+        mask=current_mask() if game_mode == 8 else None,
+    )
+
+def new_game():
+    # Sets up the engine of the next game; its target starts in the centre
+    global game, game_step, game_step_due, target_center, target_visible
+    game = engine.Engine(game_rules(), now=time.perf_counter())
+    game_step = game_step_due = None
+    target_center = game.center
+    target_visible = True
 
-    global score, shotsx, shotsy, target_center
-    global target_visible, step, last_hide_time
-    global missed_rounds, shots, rbs
+def show_game(events, Name):
+    """
+    Draws the events of one engine call (see engine.py):
+        - target shown / hidden / moved (hit markers move with it)
+        - hit and miss markers
+        - battery segments / ammo counter
+        - targets of mode 7 coming up and going down
+        - game over: camera stopped, results after a delay
 
-    # Distance from target center
-    r = math.hypot(x - target_center[0], y - target_center[1])
-    rbs += 1
+    """
 
-    # Miss conditions
-    if r >= ring_step * 5 or (not target_visible and (time.time() - last_hide_time) > 0.1):
-        # Draw miss mark
-        canvas.create_oval(x-10, y-10, x+10, y+10,
-                           fill="chartreuse2", outline="chartreuse2", tags="miss")
-        score += 0
-        missed_rounds += 1
+    global running, game_session
+
+    for kind, *data in events:
+        if kind == "start":
+            running = True
+            if data[0] == 7:
+                hide_board()                # the single target gives way to the field
+        elif kind == "move":
+            move_target(*data)
+        elif kind == "show":
+            show_target()
+        elif kind == "hide":
+            hide_target()
+        elif kind == "hit":
+            x, y, pts, marker = data
+            if marker is not None:
+                # Part of the target group: hides / moves together with it
+                hit_marker(target_center[0] + marker[0], target_center[1] + marker[1], True)
+        elif kind in ("miss", "mark"):
+            hit_marker(*data)
+        elif kind == "ammo":
+            if game.rules.mode == 6:
+                update_ammo(data[1])
+            else:
+                battery_segment(rounds - data[0] + 1)     # Remove next battery segment (visual ammo)
+        elif kind == "missed":
+            battery_segment(data[0], "gray")
+        elif kind == "spawn":
+            draw_multi_target(data[0])
+        elif kind == "remove":
+            erase_multi_target(data[0])
+        elif kind == "end":
+            if game.rules.mode == 3:
+                print("All rounds complete (Hard+ mode).")
+            elif game.rules.mode == 4:
+                print("Glide time is up.")
+            running = False
+            game_session += 1
+            send_command("end", wait=False)
+            game_end(canvas, Name)
+
+    if events:
+        request_redraw()
+    arm_game(Name)
+
+def arm_game(Name):
+    # Keeps one game clock timer pending for the engine's next due time
+    global game_step, game_step_due
+    due = game.next_due() if game is not None else None
+    if game_step is not None and due == game_step_due:
+        return
+    game_clock.cancel(game_step)
+    game_step, game_step_due = None, due
+    if due is not None:
+        game_step = game_timer(0, lambda: step_game(Name), "game", anchor=due)
+
+def step_game(Name):
+    # Game clock callback: the engine catches up to now (timers, glide path)
+    global game_step
+    game_step = None
+    if game is None:
         return
 
-    # hit conditions
-    shots += 1
-
-    # Scoring by ring distances
-    if r <= ring_step:
-        score += points[4]
-    elif r <= ring_step * 2:
-        score += points[3]
-    elif r <= ring_step * 3:
-        score += points[2]
-    elif r <= ring_step * 4:
-        score += points[1]
-    elif r <= ring_step * 5:
-        score += points[0]
-
-    # If target is hidden , do not draw hit point
-    if (time.time() - last_hide_time) < 0.1:
-        pass
+    now = time.perf_counter()
+    late = now - game_step_due
+    events = game.advance(now)
+
+    # The engine runs its timers on virtual time (never late there):
+    # how late each one really ran goes into the `perf` table by name
+    for name, due in game.timers_run:
+        game_clock.record(name, now - due)
+    show_game(events, Name)
+
+    if game.steps:
+        # A frame of the gliding target (fixed steps caught up to now)
+        tick_stats["ticks"] += 1
+        tick_stats["late_sum"] += max(0.0, late)
+        tick_stats["late_max"] = max(tick_stats["late_max"], late)
+        tick_stats["catchup_max"] = max(tick_stats["catchup_max"], game.steps)
+        tick_late.append(max(0.0, late))
+
+def hit_marker(x, y, on_target=False):
+    # Marker of one shot; on_target = part of the target group (moves / hides with it)
+    if use_composite():
+        compositor.add_marker(x, y, 10, tk_rgb("chartreuse2"), layer="target" if on_target else None)
     else:
-        canvas.create_oval(x-10, y-10, x+10, y+10,
-                           fill="chartreuse2", outline="chartreuse2", tags="target")
-
-    # Save hit for redraw in moving-target modes
-    shotsx.append(x)
-    shotsy.append(y)
-
-#  Battery — mark missed shots (mode 3)
-def mark_missed_battery():
+        pool_item("oval", (x-10, y-10, x+10, y+10), ("target", "board") if on_target else "miss",
+                  fill="chartreuse2", outline="chartreuse2")
 
-    global missed_rounds, rounds, canvas, mrc
+def ring_score(r):
+    # Points for a shot at distance r from the centre (0 outside the target)
+    return engine.ring_score(r, ring_step, points)
 
-    missed_rounds += 1
+def ring_scores(r):
+    # Vectorised ring_score for an array of distances
+    return engine.ring_scores(r, ring_step, points)
 
-    if missed_rounds <= rounds:
-        tag = f"batt{mrc}"
-        canvas.itemconfig(tag, fill="gray")  # turn segment gray
-        mrc += 1
 
+#  TARGET DISPLAY
 
-#  TARGET MOVEMENT 
-
-def tp_target():
-    # Teleports the target for gamemode 2 & 3
-    global target_center, canvas, shotsx,shotsy
-    margin = ring_step * target_rings
-    new_x = random.randint(60+margin, canvas_width - 60 - margin)
-    new_y = random.randint(60+margin, canvas_height - 140 - margin)
-    dx = new_x - target_center[0]
-    dy = new_y - target_center[1]
-    for i in range(len(shotsx)):
-        shotsx[i]=shotsx[i]+dx
-        shotsy[i]=shotsy[i]+dy
-    canvas.move("target", dx, dy)
-    target_center = (new_x, new_y)
+def move_target(x, y):
+    # Moves the target group (markers included) to (x, y)
+    global target_center
+    if use_composite():
+        if compositor.has_layer("target"):
+            place_layer("target", x, y)
+    elif board_exists():
+        move_board(x, y)
+    target_center = (x, y)
 
 def hide_target():
-    global target_visible, last_hide_time, round_count, game_mode, running, missed_rounds
+    global target_visible
     target_visible = False
-    last_hide_time = time.time()  # record when it was hidden
-
-    if game_mode == 3 and running:
-        round_count += 1
-        def check_missed():
-            # Only mark missed if no shot occurred for this round
-            if len(shotsx) < round_count and (len(shotsx) + missed_rounds) < round_count:
-                mark_missed_battery()
-
-        root.after(200, check_missed)  # 200 ms = 0.2 seconds
-
-    canvas.delete("target")
-    root.update()
-
+    hide_board()
+    request_redraw()
 
 def show_target():
-    global target_visible, free,target_center
+    global target_visible
     target_visible = True
-    free = True
     draw_target(*target_center)
 
-def hide_and_move_target():
-    hide_target()
-    root.after(target_hide_time, move_and_show_target)
 
-def move_and_show_target():
-    global round_count, rounds
-    if round_count<= rounds:
-        tp_target()
-    show_target()
+#  MULTIPLE TARGETS (mode 7)
+
+def draw_multi_target(t):
+    if use_composite():
+        name = f"mt{t.id}"
+        compositor.set_layer(name, multi_layer(t.ring_step, t.points), 0, 0, z=1)
+        place_layer(name, t.x, t.y)
+        return
 
+    tags = ("multi", f"mt{t.id}")
+    for i in range(len(t.points)):
+        radius = (len(t.points) - i) * t.ring_step
+        canvas.create_oval(t.x - radius, t.y - radius, t.x + radius, t.y + radius,
+                           fill="black", outline="cyan", width=3, tags=tags)
+    outlined_text(t.x, t.y, t.points[-1], max(14, t.ring_step * 2 // 3),
+                  fill="black", outline="cyan", tags=tags)
+
+def erase_multi_target(t):
+    if use_composite():
+        compositor.remove_layer(f"mt{t.id}")
+    else:
+        clear_items(f"mt{t.id}")
+
+def multi_layer(ring_step, pts):
+    # Composite image of one target kind (cached per kind)
+    key = ("multi", ring_step, tuple(pts))
+    if key not in layer_cache:
+        c = ring_step * len(pts) + 2
+        img = PIL.Image.new("RGBA", (2 * c, 2 * c), (0, 0, 0, 0))
+        draw = PIL.ImageDraw.Draw(img)
+        for i in range(len(pts)):
+            radius = (len(pts) - i) * ring_step
+            draw.ellipse((c - radius, c - radius, c + radius, c + radius),
+                         fill=tk_rgb("black"), outline=tk_rgb("cyan"), width=3)
+        paste_label(img, c, c, pts[-1], max(14, ring_step * 2 // 3), fill="black", outline="cyan")
+        layer_cache[key] = img
+    return layer_cache[key]
+
+#  MASK TARGETS (mode 8)
+
+def load_mask_set():
+    # Compiles the masks in masks_path once; the ring target is always there as "rings"
+    global mask_set
+    if mask_set is None:
+        if load_pil() is None:
+            return {}
+        masks = timed_import("masks")
+        mask_set = {}
+        if os.path.isdir(masks_path):
+            mask_set.update(masks.load_masks(masks_path))
+        else:
+            print(f"No mask directory at {masks_path}, only 'rings' available.")
+        mask_set["rings"] = masks.ring_mask(ring_step, points)
+    return mask_set
+
+def current_mask():
+    # Mask scored in mode 8 (None without Pillow)
+    found = load_mask_set()
+    if mask_name in found:
+        return found[mask_name]
+    return next(iter(found.values()), None)
+
+def mask_image():
+    # Pillow picture of the current mask (rendered once per mask)
+    key = ("mask", current_mask().name)
+    if key not in layer_cache:
+        layer_cache[key] = PIL.Image.fromarray(current_mask().image(), "RGBA")
+    return layer_cache[key]
+
+def mask_photo():
+    key = ("mask photo", current_mask().name)
+    if key not in layer_cache:
+        layer_cache[key] = PIL.ImageTk.PhotoImage(mask_image(), master=canvas)
+    return layer_cache[key]
+
+
+#  LANES (several cameras / screens from one process, see lanes.py)
+
+# Globals every lane has its own copy of; everything else (configuration,
+# score store, sprite / layer caches) is shared by all lanes
+LANE_STATE = (
+    "root", "canvas", "ser", "serial_port", "calib_path",
+    "reader_thread", "reader_stop", "events", "link_decoder", "ingest", "game_session",
+    "record_path", "replay_source",
+    "next_request", "pending_acks", "write_lock",
+    "ingest_stats", "ingest_latency", "cam_offsets",
+    "redraw_pending", "frame_stats", "backend_stats",
+    "game_clock", "clock_after", "clock_armed", "game", "game_step", "game_step_due", "countdown", "serving",
+    "START", "hold",
+    "blob", "matrix", "transform_type", "corr_l_x", "corr_l_y", "roi",
+    "lut", "lut_rows", "lut_matrix", "calib_error", "calib_residuals", "calib_time",
+    "game_mode", "target_center", "temp_center", "running", "target_visible",
+    "board_ring", "board_pos", "render_backend", "compositor", "batt_state",
+    "item_pool", "pool_live", "pool_stats",
+    "tick_stats", "tick_late",
+    "board_view", "attract_session", "last_rank",
+)
+
+def new_lane_state(number, port):
+    # Fresh values of the LANE_STATE globals for lane `number` on `port`
+    zeroed = lambda stats: {k: type(v)() for k, v in stats.items()}
+    return {
+        "root": None, "canvas": None, "ser": None, "serial_port": port,
+        "calib_path": os.path.join(os.path.dirname(os.path.abspath(__file__)), f"calibration-lane{number}.json"),
+        "reader_thread": None, "reader_stop": None, "events": queue.Queue(),
+        "link_decoder": None, "ingest": None, "game_session": 0,
+        "record_path": None, "replay_source": None,
+        "next_request": 0, "pending_acks": {}, "write_lock": threading.Lock(),
+        "ingest_stats": zeroed(ingest_stats), "ingest_latency": deque(maxlen=ingest_latency.maxlen),
+        "cam_offsets": deque(maxlen=cam_offsets.maxlen),
+        "redraw_pending": False, "frame_stats": zeroed(frame_stats),
+        "backend_stats": {name: [0, 0.0, 0.0] for name in backend_stats},
+        "game_clock": gameclock.GameClock(), "clock_after": None, "clock_armed": None,
+        "game": None, "game_step": None, "game_step_due": None, "countdown": False, "serving": None,
+        "START": True, "hold": False,
+        "blob": [], "matrix": None, "transform_type": None, "corr_l_x": 0, "corr_l_y": 0, "roi": None,
+        "lut": None, "lut_rows": None, "lut_matrix": None,
+        "calib_error": None, "calib_residuals": [], "calib_time": None,
+        "game_mode": game_mode, "target_center": (canvas_width//2, canvas_height//2 - 50),
+        "temp_center": (0, 0), "running": False, "target_visible": True,
+        "board_ring": None, "board_pos": None, "render_backend": render_backend,
+        "compositor": None, "batt_state": [],
+        "item_pool": {kind: [] for kind in item_pool}, "pool_live": OrderedDict(),
+        "pool_stats": zeroed(pool_stats),
+        "tick_stats": zeroed(tick_stats), "tick_late": deque(maxlen=tick_late.maxlen),
+        "board_view": None, "attract_session": 0, "last_rank": None,
+    }
+
+def add_lane(port):
+    """
+    Adds a lane for the camera on `port` and returns its number.
+    The first call turns the current setup into lane 1; its window
+    from then on runs its callbacks in lane 1.
 
-def auto_move_target(Name):
-    # loops the functions for gamemode 2 & 3
-    global round_count, rounds, running, shots, missed_rounds
+    """
 
-    if not running:
+    global lane_set, root, clock_after
+
+    if running:
+        print("Finish the running game first.")
+        return None
+
+    if lane_set is None:
+        lane_set = lanes.LaneSet(sys.modules[__name__], LANE_STATE)
+        if root is not None:
+            stop_attract()
+            if clock_after is not None:
+                root.after_cancel(clock_after)
+                clock_after = None
+            root = lanes.LaneWindow(lane_set, lane_set.active, root)
+            bind_board_keys()
+            arm_clock()
+
+    lane = lane_set.add(new_lane_state(len(lane_set.lanes) + 1, port))
+    print(f"Lane {lane.number} added on {port}. Switch to it with 'lane {lane.number}'.")
+    return lane.number
+
+def switch_lane(number):
+    # The console's commands (monitor, calib, start, ...) act on the active lane
+    lane = lane_set.get(number) if lane_set is not None else None
+    if lane is None:
+        print("No lane", number)
         return
-
-    # Stop if all rounds (target appearances) are complete
-    if round_count >= rounds and game_mode == 3 :
-        print("All rounds complete (Hard+ mode).")
-        hide_and_move_target()
-        running = False
-        with open(protocol_path, "a") as proto_file:
-            proto_file.write("\nend")
-        ser.close()
-        game_end(canvas, Name)  # or pass current Name variable
+    lane_set.activate(lane)
+    print(f"Lane {number} ({serial_port}) active.")
+
+def close_lanes():
+    # Stops the reader threads of all other lanes (exit)
+    if lane_set is not None:
+        for lane in lane_set.lanes:
+            if lane is not lane_set.active:
+                lane_set.run(lane, stop_reader)
+
+def print_lanes():
+    # Per-lane port, mode and reader → Tk latency (should not grow with the lane count)
+    if lane_set is None:
+        print(f"One lane on {serial_port} (add one with 'lane add <port>').")
         return
-    
-    hide_and_move_target()
-    root.after(move_interval, lambda: auto_move_target(Name))
+
+    for lane in lane_set.lanes:
+        value = lambda name: lane_set.value(lane, name)
+        stats = value("ingest_stats")
+        recent = sorted(value("ingest_latency"))
+        avg = 1000 * stats["latency_sum"] / stats["events"] if stats["events"] else 0.0
+        p99 = 1000 * recent[int(0.99 * (len(recent) - 1))] if recent else 0.0
+        switch = 1e6 * lane.switch_time / lane.switches if lane.switches else 0.0
+        print(f" {'*' if lane is lane_set.active else ' '} lane {lane.number}: {value('serial_port'):<12} "
+              f"mode {value('game_mode')}, {'running' if value('running') else 'idle':<7} | "
+              f"{stats['events']} events, latency avg {avg:.2f} ms, p99 {p99:.2f} ms, "
+              f"max {1000 * stats['latency_max']:.2f} ms | switch {switch:.1f} us")
 
 
 # ------------------- USER INTERFACE -------------------
@@ -746,58 +2507,42 @@ def auto_move_target(Name):
 def show_leaderboard(canvas):
     """
     Displays the leaderboard on the monitor canvas.
-    Loads entries from leaderboard_path and filters them by the
-    current Gamemode
+    Takes the top entries of the current Gamemode from the
+    indexed leaderboard store (no re-reading / sorting)
 
     """
     # Leaderboard with the best scores from each gamemode 
     global leaderboard_size
     
-    canvas.delete("target","batt")
+    clear_items("target","batt")
+    clear_layers()
     Emblem()
-    try:
-        with open(leaderboard_path, "r") as f:
-            lines_raw = [line.strip() for line in f if "," in line]
-
-        entries = []
-        for line in lines_raw:
-            parts = [p.strip() for p in line.split(",")]
-            if len(parts) == 3:
-                name, score_str, gm_str = parts
-                try:
-                    score = int(score_str)
-                    gamemode = int(gm_str)
-                    entries.append((name, score, gamemode))
-                except ValueError:
-                    print(f"Skipping invalid line: {line}")
-            else:
-                print(f"Skipping malformed line: {line}")
 
-        filtered = [entry for entry in entries if entry[2] == game_mode or entry[2]==5]
+    # Between players: the attract screen follows the leaderboard
+    stop_attract()
+    if attract_enabled:
+        session = attract_session
+        root.after(2 * attract_pause,
+                   lambda: start_attract() if session == attract_session and not running else None)
 
-        if not filtered:
+    try:
+        top = open_scores().top(game_mode, leaderboard_size)
+
+        if not top:
             print(f"No leaderboard entries for Game Mode {game_mode}.")
-            canvas.create_text(
-                canvas_width / 2,
-                canvas_height / 2,
+            pool_item(
+                "text", (canvas_width / 2, canvas_height / 2), "target",
                 text=f"No scores yet for Game Mode {game_mode}",
                 fill="white",
-                font=("Arial", 60, "bold"),
-                tags="target"
+                font=("Arial", 60, "bold")
             )
             return
 
-        filtered.sort(key=lambda x: x[1], reverse=True)
-
-        top = filtered[:leaderboard_size]
-
-        canvas.create_text(
-            canvas_width / 2,
-            80,
+        pool_item(
+            "text", (canvas_width / 2, 80), "target",
             text=f"LEADERBOARD - MODE {game_mode}",
             fill="white",
-            font=("Arial", 50, "bold"),
-            tags="target"
+            font=("Arial", 50, "bold")
         )
 
         y = 190
@@ -813,58 +2558,229 @@ def show_leaderboard(canvas):
                 color = "white"; size = 50
 
             # Draw leaderboard entry
-            canvas.create_text(
-                canvas_width / 2,
-                y,
+            pool_item(
+                "text", (canvas_width / 2, y), "target",
                 text=f"{i}# {name}: {score}",
                 fill=color,
-                font=("Arial", size, "bold"),
-                tags="target"
+                font=("Arial", size, "bold")
             )
 
             y += size + 35
 
-    except FileNotFoundError:
-        print("Leaderboard file not found.")
-        canvas.create_text(
-            canvas_width / 2,
-            canvas_height / 2,
-            text="Leaderboard file not found.",
+    except sqlite3.Error as e:
+        print("Leaderboard store not available:", e)
+        pool_item(
+            "text", (canvas_width / 2, canvas_height / 2), "target",
+            text="Leaderboard not available.",
             fill="red",
-            font=("Arial", 50, "bold"),
-            tags="target"
+            font=("Arial", 50, "bold")
         )
     except Exception as e:
         print("Error loading leaderboard:", e)
 
+#  SCROLLING LEADERBOARD
+#
+#  Only the visible rows (+1 for scrolling) exist as canvas items. They
+#  are re-labelled as the view scrolls, and rows come page by page from
+#  SQLite (at most view_pages_cached pages are held). A page that follows
+#  a cached one continues from its last row on the index, so scrolling
+#  costs the same anywhere on the board.
+
+def open_board_view(mode, first_rank=1):
+    """
+    Shows the leaderboard of `mode` as a scrollable view starting
+    at `first_rank` (scroll with the arrow / page keys or the wheel).
+
+    """
+
+    global board_view
+
+    clear_items("target","batt")
+    clear_layers()
+    Emblem()
+    pool_item("text", (canvas_width / 2, 80), "target",
+              text=f"LEADERBOARD - MODE {mode}", fill="white", font=("Arial", 50, "bold"))
+
+    items = [canvas.create_text(canvas_width / 2, view_top, text="", fill="white",
+                                font=("Arial", 50, "bold"), tags="target")
+             for _ in range(view_rows + 1)]
+    board_view = {
+        "mode": mode,
+        "items": items,
+        "shown": [None] * len(items),   # row index each item currently displays
+        "pages": OrderedDict(),         # page number → rows (LRU, view_pages_cached)
+        "total": open_scores().size(mode),
+        "offset": 0.0,                  # px scrolled from the top
+    }
+    scroll_board((first_rank - 1) * view_row_height)
+
+
+def board_view_alive():
+    # False when the view was never opened or a screen change deleted it
+    return board_view is not None and canvas.type(board_view["items"][0]) is not None
+
+
+def board_row(index):
+    # Row `index` (0 = best) of the open view, fetched one page at a time
+    page, pos = divmod(index, view_page_size)
+    pages = board_view["pages"]
+    if page not in pages:
+        before = pages.get(page - 1)
+        if before and len(before) == view_page_size:
+            after = (before[-1][1], before[-1][3])        # (score, id) of its last row
+            pages[page] = open_scores().rows(board_view["mode"], view_page_size, after=after)
+        else:
+            pages[page] = open_scores().rows(board_view["mode"], view_page_size, page * view_page_size)
+        while len(pages) > view_pages_cached:
+            pages.popitem(last=False)
+    pages.move_to_end(page)
+    rows = pages[page]
+    return rows[pos] if pos < len(rows) else None
+
+
+def max_board_offset(rows=None):
+    total = board_view["total"] if rows is None else min(rows, board_view["total"])
+    return max(0, (total - view_rows) * view_row_height)
+
+
+def scroll_board(dy):
+    # Scrolls the view by dy px (clamped) and relabels / moves the row items
+    if not board_view_alive():
+        return
+    view = board_view
+    view["offset"] = min(max(0.0, view["offset"] + dy), max_board_offset())
+
+    first, frac = divmod(view["offset"], view_row_height)
+    first = int(first)
+    for k, item in enumerate(view["items"]):
+        index = first + k
+        y = view_top + k * view_row_height - frac
+        if view["shown"][k] != index:
+            row = board_row(index)
+            if row is None:
+                canvas.itemconfigure(item, text="")
+            else:
+                name, score = row[:2]
+                color = ["gold", "silver", "#cd7f32"][index] if index < 3 else "white"
+                canvas.itemconfigure(item, text=f"{index + 1}# {name}: {score}", fill=color)
+            view["shown"][k] = index
+        # Rows scrolled under the header are hidden
+        visible = view_top - view_row_height / 2 <= y <= view_top + (view_rows - 0.5) * view_row_height
+        canvas.itemconfigure(item, state="normal" if visible else "hidden")
+        canvas.coords(item, canvas_width / 2, y)
+    request_redraw()
+
+
+def bind_board_keys():
+    # Keyboard / wheel scrolling of the leaderboard view
+    root.bind("<Up>", lambda e: scroll_board(-view_row_height))
+    root.bind("<Down>", lambda e: scroll_board(view_row_height))
+    root.bind("<Prior>", lambda e: scroll_board(-view_rows * view_row_height))
+    root.bind("<Next>", lambda e: scroll_board(view_rows * view_row_height))
+    root.bind("<Home>", lambda e: scroll_board(-max_board_offset()) if board_view_alive() else None)
+    root.bind("<MouseWheel>", lambda e: scroll_board(-e.delta / 120 * view_row_height))
+
+
+def start_attract():
+    """
+    Attract screen between players: scrolls through the board of
+    every mode in turn (at most `attract_rows` rows each) until a
+    game starts or `attract` is switched off.
+
+    """
+
+    global attract_session
+
+    attract_session += 1
+    modes = open_scores().modes() or [game_mode]
+    attract_mode(modes, 0, attract_session)
+
+
+def attract_mode(modes, i, session):
+    # Opens the board of modes[i] and starts scrolling it after a pause
+    if session != attract_session or running or canvas is None:
+        return
+    open_board_view(modes[i % len(modes)])
+    root.after(attract_pause, lambda: attract_tick(modes, i, session, time.perf_counter()))
+
+
+def attract_tick(modes, i, session, last):
+    # One frame of auto-scroll; moves on to the next mode at the end
+    if session != attract_session or running or not board_view_alive():
+        return
+    now = time.perf_counter()
+    scroll_board(attract_speed * (now - last))
+    if board_view["offset"] >= max_board_offset(attract_rows):
+        root.after(attract_pause, lambda: attract_mode(modes, i + 1, session))
+    else:
+        root.after(frame_interval, lambda: attract_tick(modes, i, session, now))
+
+
+def stop_attract():
+    global attract_session
+    attract_session += 1
+
+
+def open_scores():
+    """
+    Opens the leaderboard store (scores_path) on first use. A new,
+    empty store imports the old text leaderboard (leaderboard_path).
+
+    """
+
+    global score_store
+
+    if score_store is None:
+        score_store = scores.ScoreStore(scores_path)
+        if score_store.empty() and os.path.isfile(leaderboard_path):
+            imported, skipped = score_store.import_csv(leaderboard_path)
+            print(f"Imported {imported} scores from {leaderboard_path} ({skipped} malformed lines skipped)")
+    return score_store
+
+def close_scores():
+    global score_store
+    if score_store is not None:
+        score_store.close()
+        score_store = None
+
 def save_score(name, score):
     """
-    Appends a new score entry to the leaderboard file.
+    Stores a new score in the leaderboard store and returns its
+    rank in the current game mode (None if it could not be saved).
 
     """
-    global game_mode
-    print("Name saved:",name)
-    with open(leaderboard_path, "a") as f:
-        f.write(f"\n{name},{score},{game_mode}")
+    global game_mode, last_rank
+    try:
+        last_rank = open_scores().add(name, score, game_mode)
+    except sqlite3.Error as e:
+        print("Could not save score:", e)
+        last_rank = None
+        return None
+    print("Name saved:",name, f"(rank #{last_rank} in mode {game_mode})")
+    return last_rank
 
 def change_path():
     """
     Opens console UI to change file paths:
-        1 = protocol_path
-        2 = coords_path
-        3 = leaderboard_path
+        1 = coords_path
+        2 = leaderboard_path
+        3 = calib_path
+        4 = scores_path
+        5 = masks_path
 
     """
 
-    global protocol_path, coords_path, leaderboard_path
+    global coords_path, leaderboard_path, calib_path, scores_path, masks_path, mask_set
 
     print("\nWhich path do you want to change?")
-    print("1 = protocol_path")
-    print("2 = coords_path")
-    print("3 = leaderboard_path")
-    choice = input("\nSelect (1/2/3): ").strip()
-
-    if choice not in {"1", "2", "3"}:
+    print("1 = coords_path")
+    print("2 = leaderboard_path")
+    print("3 = calib_path")
+    print("4 = scores_path")
+    print("5 = masks_path")
+    choice = input("\nSelect (1/2/3/4/5): ").strip()
+
+    if choice not in {"1", "2", "3", "4", "5"}:
         print("Invalid selection.")
         return
 
@@ -879,22 +2795,33 @@ def change_path():
         return
 
     if choice == "1":
-        protocol_path = new_path
-        print(f"protocol_path updated to:\n{protocol_path}")
-
-    elif choice == "2":
         coords_path = new_path
         print(f"coords_path updated to:\n{coords_path}")
 
-    elif choice == "3":
+    elif choice == "2":
+        close_scores()          # a new store imports it on next use
         leaderboard_path = new_path
         print(f"leaderboard_path updated to:\n{leaderboard_path}")
 
+    elif choice == "3":
+        calib_path = new_path
+        print(f"calib_path updated to:\n{calib_path}")
+
+    elif choice == "4":
+        close_scores()
+        scores_path = new_path
+        print(f"scores_path updated to:\n{scores_path}")
+
+    elif choice == "5":
+        masks_path = new_path
+        mask_set = None         # compiled again on next use
+        print(f"masks_path updated to:\n{masks_path}")
+
 
 def save_name():
     Name=input("\nEnter Name: ").strip().lower()
-    if Name:
-        save_score(Name, score)
+    if Name and game is not None:
+        save_score(Name, game.score)
 
 def coords():
 
@@ -907,25 +2834,30 @@ def coords():
         print("Matrix not yet computed. Run calibration first.")
     else:
         print("\nMatrix: ",matrix)
+        if calib_error is not None:
+            print(f"RMS error: {calib_error:.2f} px, per blob: "
+                  + ", ".join("-" if r is None else f"{r:.2f}" for r in calib_residuals))
 
 def Credits():
 
-    canvas.create_text(
-        target_center[0], target_center[1] - 100,
-        text="Created by:", fill="DarkGoldenrod3",
-        font=("Arial", 100, "bold"), tags="target"
-    )
-
-    canvas.create_text(
-        target_center[0], target_center[1] + 100,
-        text="J.F", fill="DarkGoldenrod3", 
-        font=("Arial", 100, "bold"), tags="target"
-    )
+    outlined_text(target_center[0], target_center[1] - 100, "Created by:", 100,
+                  fill="DarkGoldenrod3", tags="target")
+    outlined_text(target_center[0], target_center[1] + 100, "J.F", 100,
+                  fill="DarkGoldenrod3", tags="target")
     Emblem()
 
 def Emblem():
 
     edge = [canvas_width-200, canvas_height - 300]
+    if use_composite():
+        compositor.set_layer("emblem", emblem_layer(), *edge)
+        request_redraw()
+        return
+    for polygon, fill in emblem_polygons(edge):
+        canvas.create_polygon(polygon, fill=fill, tags="target")
+
+def emblem_polygons(edge):
+    # (polygon, colour) pairs of the emblem with its corner at `edge`
     t = [
         edge[0] + 12*1, edge[1] + 12*1,
         edge[0] + 12*6, edge[1] + 12*6,
@@ -936,8 +2868,6 @@ def Emblem():
         edge[0] + 12*10, edge[1] + 12*6,
         edge[0] + 12*15, edge[1] + 12*1
     ]
-    canvas.create_polygon(t, fill="DarkGoldenrod2", tags="target")
-
     II1=[
         edge[0] + 12*14, edge[1] + 12*3,
         edge[0] + 12*11, edge[1] + 12*6,
@@ -950,8 +2880,7 @@ def Emblem():
         edge[0] + 12*5, edge[1] + 12*15,
         edge[0] + 12*2, edge[1] + 12*12
     ]
-    canvas.create_polygon(II1, fill="DarkGoldenrod3", tags="target")
-    canvas.create_polygon(II2, fill="DarkGoldenrod3", tags="target")
+    return [(t, "DarkGoldenrod2"), (II1, "DarkGoldenrod3"), (II2, "DarkGoldenrod3")]
 
 def game_end(canvas, Name):
     """
@@ -966,41 +2895,27 @@ def game_end(canvas, Name):
     """
 
     global running, START, target_center, target_visible
-    global shots, shotsx, shotsy, score
-    global hold, temp_center, missed_rounds, mrc, rbs
+    global hold, temp_center
 
     running = False
     START = True
     target_visible = True
     hold = False
 
-    missed_rounds = 0
-    mrc = 0
-    rbs = 0
-
     # Store old position and move target back to center
+    # (shot markers move with the target group)
     temp_center = target_center
     target_center = (canvas_width//2, canvas_height//2 - 50)
 
-    dx = target_center[0] - temp_center[0]
-    dy = target_center[1] - temp_center[1]
-
-    # Shift all shot markers visually back to center
-    for i in range(len(shotsx)):
-        shotsx[i] += dx
-        shotsy[i] += dy
-
-    shots = 0
+    if game.rules.mode == 6:
+        hits, total, spread = game.summary()
+        print(f"Endurance: {hits} hits, {total} points, mean distance {spread:.0f} px")
 
     # Draw new center target
     show_target()
 
-    # Clear historical shots
-    shotsx.clear()
-    shotsy.clear()
-
     # Show score after delay
-    root.after(3000, lambda: show_results(canvas, Name))
+    game_timer(3000, lambda: show_results(canvas, Name), "results")
 
 def show_results(canvas,Name):
     """
@@ -1009,18 +2924,20 @@ def show_results(canvas,Name):
     After 5 seconds the leaderboard appears.
 
     """
-    canvas.delete("miss", "target","speed","batt")
-    for i in range (rounds+1):
-        canvas.delete(f"batt{i}")
-    canvas.create_text(target_center[0], target_center[1]-220,
-                       text= Name.upper(), fill="white", font=("Arial", 140, "bold"), tags="target")
-    canvas.create_text(target_center[0], target_center[1],
-                       text="YOUR SCORE IS", fill="white", font=("Arial", 140, "bold"), tags="target")
-    canvas.create_text(target_center[0], target_center[1]+220,
-                       text=score, fill="white", font=("Arial", 140, "bold"), tags="target")
-    save_score(Name, score)
+    clear_items("miss", "target","speed","batt")
+    clear_layers()
+    pool_item("text", (target_center[0], target_center[1]-220), "target",
+              text= Name.upper(), fill="white", font=("Arial", 140, "bold"))
+    pool_item("text", (target_center[0], target_center[1]), "target",
+              text="YOUR SCORE IS", fill="white", font=("Arial", 140, "bold"))
+    pool_item("text", (target_center[0], target_center[1]+220), "target",
+              text=game.score, fill="white", font=("Arial", 140, "bold"))
+    rank = save_score(Name, game.score)
+    if rank is not None:
+        pool_item("text", (target_center[0], target_center[1]+400), "target",
+                  text=f"RANK #{rank}", fill="white", font=("Arial", 80, "bold"))
     print("\nEnter command:   ")
-    root.after(5000, lambda: show_leaderboard(canvas))
+    game_timer(5000, lambda: show_leaderboard(canvas), "leaderboard")
 
 
 # ------------------- MAIN LOOP -------------------
@@ -1035,7 +2952,7 @@ def main():
         - Change game mode
         - Edit file paths
         - Display leaderboard / credits
-        - View coords, matrix, or protocol
+        - View coords or matrix
         - Quit safely
 
     The loop remains active until the user enters 'quit' or closes
@@ -1050,15 +2967,19 @@ def main():
 
     """
         
-    global root, canvas, matrix, transform_type, score, adminmode, rounds, player, length, game_mode, serial_port,first,hold
+    global root, canvas, matrix, transform_type, adminmode, rounds, player, length, game_mode, serial_port,first,hold
+    global attract_enabled, mask_name, ingest_process, record_path, replay_source
 
+    # Reuse the last calibration if nothing changed
+    load_calibration()
+
+    startup_stats.setdefault("prompt", time.perf_counter() - startup_t0)
     print("\n\nAvailable commands: \033[93mmonitor\033[0m, \033[93mstart\033[0m, \033[93mcalib\033[0m, \033[93mend\033[0m, \033[93mexit\033[0m, \033[93mscore\033[0m, \033[93mcoords\033[0m\n\nFor an explaination of these commands please enter \033[93m`help´\033[0m into the Console")
     while True:
         try:
             cmd = input("\nEnter command:\n").strip().lower()
             if cmd in {"exit", "end", "coords"}:
-                with open(protocol_path, "a") as proto_file:
-                    proto_file.write("\n" + cmd)
+                send_command(cmd)
 
             if cmd == "monitor":
                 monitor_create()
@@ -1066,7 +2987,7 @@ def main():
                     monitor_setup(canvas, canvas_width, canvas_height, radius)
 
             elif cmd == "start":
-                canvas.delete("target")
+                clear_items("target")
                 Name=None
                 if canvas is None:
                     print("Please open the monitor first (type 'monitor').")
@@ -1077,7 +2998,6 @@ def main():
                         player += 1
                     else:
                         Name=name
-                    score=0
                     round_start(rounds,cmd,Name)
 
             elif cmd == "":
@@ -1086,27 +3006,25 @@ def main():
                     automode=input("\n<y or n>\n")
                     if automode == "y":
                         first=False
-                        canvas.delete("target")
+                        clear_items("target")
                         Name=None
                         if canvas is None:
                             print("Please open the monitor first (type 'monitor').")
                         else:
                             Name=f"Player_{player}"
                             player += 1
-                            score=0
                             round_start(rounds,"start",Name)
                             hold=True
                     else:
                         pass
                 elif not hold:
-                    canvas.delete("target")
+                    clear_items("target")
                     Name=None
                     if canvas is None:
                         print("Please open the monitor first (type 'monitor').")
                     else:
                         Name=f"Player_{player}"
                         player += 1
-                        score=0
                         round_start(rounds,"start",Name)
                         hold = True
 
@@ -1117,17 +3035,20 @@ def main():
                 global serial_port
                 new_port = input("\nEnter Port Number: ").strip()
 
-                if new_port.isdigit():
-                    serial_port = f"COM{new_port}"
+                if new_port.isdigit() or new_port.startswith("/"):
+                    # COM number, or a device path (e.g. the pty of emulator.py)
+                    serial_port = f"COM{new_port}" if new_port.isdigit() else new_port
+                    stop_reader()   # reconnect on next use
                     print(f"New serial port set to {serial_port}")
                 else:
-                    print("Invalid input. Please enter a numeric COM port number")
+                    print("Invalid input. Please enter a COM port number or a device path")
 
             elif cmd == "calib":
                 
                 monitor_setup(canvas, canvas_width, canvas_height, radius)
                 calibration(cmd)
                 matrix, transform_type = correction(radius)
+                save_calibration()
                 canvas.delete("Calib")
 
             elif cmd == "score":
@@ -1136,6 +3057,22 @@ def main():
             elif cmd == "coords":
                 coords()
 
+            elif cmd == "perf":
+                print_perf()
+
+            elif cmd == "startup":
+                print_startup()
+
+            elif cmd == "stats":
+                print_stats()
+
+            elif cmd.startswith("backend"):
+                parts = cmd.split()
+                if len(parts) == 2:
+                    set_backend(parts[1])
+                else:
+                    print("Render backend:", render_backend)
+
             elif cmd.startswith("gamemode"):
                 global game_mode
                 parts = cmd.split()
@@ -1143,7 +3080,87 @@ def main():
                     game_mode = int(parts[1])
                     print("Gamemode set to:", game_mode)
                 else:
-                    print("Usage: gamemode <1 or 2>")
+                    print("Usage: gamemode <1–4, 6–8>")
+
+            elif cmd.startswith("board"):
+                parts = cmd.split()
+                if canvas is None:
+                    print("Please open the monitor first (type 'monitor').")
+                elif len(parts) > 3 or not all(p.isdigit() for p in parts[1:]):
+                    print("Usage: board [mode] [rank]")
+                else:
+                    stop_attract()
+                    open_board_view(int(parts[1]) if len(parts) > 1 else game_mode,
+                                    int(parts[2]) if len(parts) > 2 else 1)
+
+            elif cmd == "ingest":
+                ingest_process = not ingest_process
+                stop_reader()   # reconnect on next use
+                print("Camera link in", "a separate ingest process" if ingest_process else "a reader thread")
+
+            elif cmd.startswith("record"):
+                parts = cmd.split(maxsplit=1)
+                if len(parts) == 1 and record_path is not None:
+                    print("Recording stopped:", record_path)
+                    record_path = None
+                else:
+                    record_path = parts[1] if len(parts) == 2 else os.path.join(
+                        os.path.dirname(os.path.abspath(__file__)), time.strftime("session-%Y%m%d-%H%M%S.fjnrec"))
+                    replay_source = None
+                    print("Recording the camera link to", record_path)
+                stop_reader()   # reconnect on next use
+
+            elif cmd.startswith("replay"):
+                parts = cmd.split()
+                if len(parts) == 2 and parts[1] == "off":
+                    replay_source = None
+                    print("Camera link back on", serial_port)
+                elif len(parts) in (2, 3):
+                    try:
+                        speed = float(parts[2]) if len(parts) == 3 else 1.0
+                    except ValueError:
+                        speed = -1
+                    if speed < 0 or not os.path.exists(parts[1]):
+                        print("Usage: replay <file> [speed] | replay off  (speed 0 = as fast as possible)")
+                    else:
+                        replay_source = (parts[1], speed)
+                        record_path = None
+                        print("Camera link replays", parts[1])
+                else:
+                    print("Usage: replay <file> [speed] | replay off  (speed 0 = as fast as possible)")
+                stop_reader()   # reconnect on next use
+
+            elif cmd == "lanes":
+                print_lanes()
+
+            elif cmd.startswith("lane"):
+                parts = cmd.split()
+                if len(parts) == 3 and parts[1] == "add":
+                    add_lane(f"COM{parts[2]}" if parts[2].isdigit() else parts[2])
+                elif len(parts) == 2 and parts[1].isdigit():
+                    switch_lane(int(parts[1]))
+                else:
+                    print("Usage: lane add <port> | lane <number>")
+
+            elif cmd.startswith("mask"):
+                parts = cmd.split()
+                if len(parts) == 1:
+                    for name, mask in load_mask_set().items():
+                        mark = "*" if mask is current_mask() else " "
+                        print(f" {mark} {name}: {mask.w}×{mask.h} px, zones {mask.zones()}")
+                elif len(parts) == 2 and parts[1] in load_mask_set():
+                    mask_name = parts[1]
+                    print("Mask set to:", mask_name)
+                else:
+                    print("Usage: mask [name]  (see 'mask' for the loaded masks)")
+
+            elif cmd == "attract":
+                attract_enabled = not attract_enabled
+                print("Attract screen", "on" if attract_enabled else "off")
+                if not attract_enabled:
+                    stop_attract()
+                elif canvas is not None and not running:
+                    start_attract()
 
             elif cmd.startswith("rounds"):
                 if adminmode == True:
@@ -1160,8 +3177,11 @@ def main():
             
             elif cmd == "exit":
                 print("Exiting program.")
-                if root:
-                    root.destroy()
+                close_lanes()
+                stop_reader()
+                close_scores()
+                if tk_master:
+                    tk_master.destroy()     # windows of other lanes go with it
                 break
 
             elif cmd == "admin":
@@ -1179,7 +3199,8 @@ def main():
                 print("  Starts a new game round and allows to enter a player name (for a Player-name use `---´).\n")
 
                 print("\033[93mcalib\033[0m")
-                print("  Shows 6 calibration circles and begins camera calibration.\n")
+                print("  Shows 6 calibration circles and begins camera calibration.")
+                print("  The result is stored and reused at the next start while it is still valid.\n")
 
                 print("\033[93m<ENTER> (empty command)\033[0m")
                 print("  Starts the next player automatically by pressing <ENTER> after first activation.\n")
@@ -1187,23 +3208,67 @@ def main():
                 print("\033[93mcoords\033[0m")
                 print("  Shows blob coordinates, ROI, and the transformation matrix.\n")
 
+                print("\033[93mperf\033[0m")
+                print("  Shows serial ingest and frame statistics (queue depth, latency, events per frame, redraw time).\n")
+
+                print("\033[93mstats\033[0m")
+                print("  Shows live canvas items, the item pool and memory use of the program.\n")
+
+                print("\033[93mstartup\033[0m")
+                print("  Shows how long each module took to import at startup.\n")
+
+                print("\033[93mbackend <canvas|composite>\033[0m")
+                print("  Switches the renderer: Tk canvas items, or layers composited off-screen")
+                print("  (needs Pillow) and blitted once per frame. `perf` compares both.\n")
+
                 print("\033[93mport\033[0m")
-                print("  Change the COM port (e.g. enter 7 for COM7).\n")
+                print("  Change the COM port (e.g. enter 7 for COM7) or enter a device path such as")
+                print("  /dev/ttyACM0 or the pty printed by `python emulator.py` (camera emulator).\n")
 
                 print("\033[93mpath\033[0m")
                 print("  Change file paths used by the system:")
-                print("    1 = protocol_path")
-                print("    2 = coords_path")
-                print("    3 = leaderboard_path\n")
+                print("    1 = coords_path")
+                print("    2 = leaderboard_path (old text leaderboard, imported once)")
+                print("    3 = calib_path (stored calibration)")
+                print("    4 = scores_path (leaderboard store)")
+                print("    5 = masks_path (score images of mode 8)\n")
 
                 print("\033[93mscore\033[0m")
                 print("  Displays the leaderboard for the current game mode.\n")
 
-                print("\033[93mgamemode <1–4>\033[0m")
+                print("\033[93mboard [mode] [rank]\033[0m")
+                print("  Scrollable leaderboard (arrow keys, page up/down, mouse wheel), optionally from a rank.\n")
+
+                print("\033[93mingest\033[0m")
+                print("  Toggles running the camera link in a separate process (parsing, timestamps and")
+                print("  coordinate mapping are then not delayed by a busy window).\n")
+
+                print("\033[93mrecord [file]\033[0m")
+                print("  Records everything the camera sends (and every command) with timestamps; `record` again stops.\n")
+
+                print("\033[93mreplay <file> [speed] | replay off\033[0m")
+                print("  Plays a recording instead of the camera, in real time, N× faster or with speed 0 as fast")
+                print("  as possible. Commands are acked by the replay. See `python replay.py` for headless runs.\n")
+
+                print("\033[93mlane add <port> | lane <number> | lanes\033[0m")
+                print("  Runs several cameras / screens from this PC: adds a lane (camera port, own window,")
+                print("  calibration and game), switches the console to a lane, or lists the lanes with their latency.\n")
+
+                print("\033[93mmask [name]\033[0m")
+                print("  Lists the mask targets compiled from masks_path, or picks the one played in mode 8.\n")
+
+                print("\033[93mattract\033[0m")
+                print("  Toggles the attract screen: between players the leaderboards of all modes scroll by.\n")
+
+                print("\033[93mgamemode <1–4, 6–8>\033[0m")
                 print("  Sets difficulty mode:")
                 print("    1 = Easy")
                 print("    2 = Medium (hide + move)")
-                print("    3 = Hard (timed appearances)\n")
+                print("    3 = Hard (timed appearances)")
+                print("    4 = Glide (target moves smoothly, hits scored where it was when fired)")
+                print(f"    6 = Endurance ({endurance_time // 1000} s rapid fire, {endurance_shots} shots)")
+                print(f"    7 = Multi-target ({multi_count} targets at once, smaller ones score more)")
+                print("    8 = Mask (target shaped by a score image, see 'mask')\n")
 
                 print("\033[93mend\033[0m")
                 print("  Sends 'end' to the camera detection program.\n")
@@ -0,0 +1,1195 @@
+#  BENCHMARKS
+#
+#  Micro-benchmarks for host-side hot paths of Game.py.
+#  Run:  python bench.py [name ...]      (no name = run all)
+#
+#  Results can be written as JSON (--json) and checked against a stored
+#  baseline (--baseline, default bench_baseline.json): a timing that got
+#  slower / a rate that dropped by more than the tolerance fails the run.
+#  Record the baseline on the machine used at the event (--save-baseline),
+#  the display benchmarks under Xvfb:  xvfb-run python bench.py ...
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import socket
+import tempfile
+import threading
+import contextlib
+import multiprocessing
+from collections import deque
+
+import numpy as np
+
+import Game
+
+
+#  HELPERS
+
+def timeit(fn, repeat=5, number=1000):
+    """
+    Runs `fn` `number` times per repeat and returns the best
+    time per call in microseconds.
+
+    """
+
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, time.perf_counter() - t0)
+    return 1e6 * best / number
+
+
+def tk_canvas():
+    """
+    Creates a (withdrawn) Tk window with a game-sized canvas and hands
+    it to Game. Returns None when there is no display (use Xvfb).
+
+    """
+
+    try:
+        root = Game.tk.Tk()
+    except Game.tk.TclError:
+        return None
+    root.withdraw()
+    Game.root = root
+    Game.canvas = Game.tk.Canvas(root, width=Game.canvas_width, height=Game.canvas_height, bg="black")
+    Game.canvas.pack()
+    return Game.canvas
+
+
+def sample_calibration():
+    # Calibrates Game from the blob set in coords.txt (no camera needed)
+    Game.blob = Game.sort_blobs_by_position([
+        {'x': 87, 'y': 28}, {'x': 32, 'y': 29}, {'x': 139, 'y': 30},
+        {'x': 139, 'y': 98}, {'x': 34, 'y': 101}, {'x': 88, 'y': 102},
+    ])
+    Game.matrix, Game.transform_type = Game.correction(Game.radius)
+    return Game.matrix, Game.transform_type
+
+
+class BufferPort:
+    """
+    Serial-port stand-in that hands out prepared chunks of bytes,
+    one per read, and fails like an unplugged port when they run out
+    (which ends serial_reader).
+
+    """
+
+    def __init__(self, chunks):
+        self.chunks = deque(chunks)
+
+    @property
+    def in_waiting(self):
+        return len(self.chunks[0]) if self.chunks else 0
+
+    def read(self, size=1):
+        if not self.chunks:
+            raise Game.serial.SerialException("end of data")
+        return self.chunks.popleft()
+
+
+def read_all(chunks):
+    # Runs serial_reader over `chunks` until they are used up; returns (events, seconds)
+    events, stop = Game.queue.Queue(), threading.Event()
+    t0 = time.perf_counter()
+    Game.serial_reader(BufferPort(chunks), stop, events, {}, deque(maxlen=64), Game.link.FrameDecoder())
+    return events, time.perf_counter() - t0
+
+
+#  BENCHMARKS
+
+def bench_parse(shots=20000, chunk=8):
+    """
+    Shot lines off the wire: parse_line alone, and serial_reader
+    decoding `shots` text lines / binary shot frames that arrive
+    `chunk` at a time.
+
+    """
+
+    rng = random.Random(1)
+    xy = [(rng.randrange(Game.cam_width), rng.randrange(Game.cam_height)) for _ in range(shots)]
+    lines = [f"X: {x} # Y: {y}" for x, y in xy]
+    stamp = time.perf_counter()
+
+    def parse():
+        for line in lines:
+            Game.parse_line(line, stamp)
+
+    text = [b"".join(b"%s\n" % line.encode() for line in lines[i:i + chunk])
+            for i in range(0, shots, chunk)]
+    frames = [Game.link.encode_shot(i + 1, 10 * i, x, y) for i, (x, y) in enumerate(xy)]
+    binary = [b"".join(frames[i:i + chunk]) for i in range(0, shots, chunk)]
+
+    results = {"parse_line (us/line)": timeit(parse, repeat=3, number=1) / shots}
+    for label, chunks in (("text", [b"\n"] + text), ("frames", [b"\n"] + binary)):
+        best = float("inf")
+        for _ in range(3):
+            events, elapsed = read_all(chunks)
+            best = min(best, elapsed)
+        assert sum(1 for e in events.queue if e[0] == "shot") == shots
+        results[f"serial_reader {label} (us/shot)"] = 1e6 * best / shots
+    return results
+
+
+def bench_correct_coords():
+    """
+    Per-shot camera → screen transform: cv2.perspectiveTransform per
+    point (old path) against the LUT, plus the batch API for 10^4 shots.
+
+    """
+
+    matrix, transform_type = sample_calibration()
+    rng = random.Random(1)
+    pts = [(rng.randrange(Game.cam_width), rng.randrange(Game.cam_height)) for _ in range(1000)]
+    sub = [(x + 0.37, y + 0.61) for x, y in pts]
+
+    cv2 = Game.load_cv2()
+
+    def per_point_cv2():
+        for x, y in pts:
+            pt = np.array([[[x, y]]], dtype=np.float32)
+            cv2.perspectiveTransform(pt, matrix)[0][0]
+
+    def per_point_lut():
+        for x, y in pts:
+            Game.correct_coords(x, y, matrix, transform_type)
+
+    def per_point_lut_subpixel():
+        for x, y in sub:
+            Game.correct_coords(x, y, matrix, transform_type)
+
+    xs = np.random.default_rng(1).uniform(0, Game.cam_width, 10000)
+    ys = np.random.default_rng(2).uniform(0, Game.cam_height, 10000)
+
+    results = {}
+    if cv2 is not None:
+        results["cv2 per point (us/shot)"] = timeit(per_point_cv2, number=1) / len(pts)
+    results.update({
+        "LUT per point (us/shot)": timeit(per_point_lut, number=1) / len(pts),
+        "LUT bilinear (us/shot)": timeit(per_point_lut_subpixel, number=1) / len(sub),
+        "batch 10^4 (us/shot)": timeit(lambda: Game.correct_coords_batch(xs, ys), number=1) / len(xs),
+    })
+
+    # Accuracy of the LUT against the exact homography
+    ref = Game.project(matrix, xs, ys)
+    bx, by = Game.correct_coords_batch(xs, ys)
+    results["max LUT error (px)"] = float(np.max(np.hypot(bx - ref[:, 0], by - ref[:, 1])))
+    return results
+
+
+def bench_scoring(shots=20000):
+    """
+    Scoring a shot: the ring lookup, the engine's shot in a ring
+    game and in a multi-target game (grid hit test), and the whole
+    path of one shot line (parse → screen coordinates → score).
+
+    """
+
+    matrix, transform_type = sample_calibration()
+    rules = Game.game_rules().replace(mode=1, rounds=shots)
+    rng = random.Random(2)
+    cx, cy = rules.center
+    xy = [(cx + rng.gauss(0, 150), cy + rng.gauss(0, 150)) for _ in range(shots)]
+    r = [((x - cx) ** 2 + (y - cy) ** 2) ** 0.5 for x, y in xy]
+
+    def ring():
+        for d in r:
+            Game.ring_score(d)
+
+    def play(mode):
+        game = Game.engine.Engine(rules.replace(mode=mode), seed=1)
+        game.start(0.0)
+        t0 = time.perf_counter()
+        for k, (x, y) in enumerate(xy):
+            game.shot(k * 1e-3, x, y)
+        return time.perf_counter() - t0
+
+    lines = [f"X: {rng.randrange(Game.cam_width)} # Y: {rng.randrange(Game.cam_height)}" for _ in range(shots)]
+
+    def shot_path():
+        game = Game.engine.Engine(rules, seed=1)
+        game.start(0.0)
+        for k, line in enumerate(lines):
+            kind, stamp, x, y = Game.parse_line(line, k * 1e-3)
+            game.shot(stamp, *Game.correct_coords(x, y, matrix, transform_type))
+
+    return {
+        "ring_score (us/shot)": timeit(ring, repeat=3, number=1) / shots,
+        "ring_scores 10^4 (us/shot)": timeit(lambda: Game.ring_scores(r[:10000]), number=10) / 10000,
+        "engine mode 1 (us/shot)": 1e6 * min(play(1) for _ in range(3)) / shots,
+        "engine mode 7 (us/shot)": 1e6 * min(play(7) for _ in range(3)) / shots,
+        "parse + map + score (us/shot)": timeit(shot_path, repeat=3, number=1) / shots,
+    }
+
+
+def bench_calibration():
+    """
+    Calibration after the camera reported its blobs: sorting the six
+    blobs and fitting the transform (RANSAC + LUT).
+
+    """
+
+    rng = random.Random(5)
+    blobs = [{'x': 87, 'y': 28}, {'x': 32, 'y': 29}, {'x': 139, 'y': 30},
+             {'x': 139, 'y': 98}, {'x': 34, 'y': 101}, {'x': 88, 'y': 102}]
+    shuffled = [rng.sample(blobs, len(blobs)) for _ in range(100)]
+
+    def sort():
+        for b in shuffled:
+            Game.sort_blobs_by_position(b)
+
+    Game.blob = Game.sort_blobs_by_position(blobs)
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        fit = timeit(lambda: Game.correction(Game.radius), repeat=3, number=5)
+    return {
+        "sort_blobs_by_position (us)": timeit(sort, number=10) / len(shuffled),
+        "correction (ms)": fit / 1000,
+    }
+
+
+def bench_draw():
+    """
+    Drawing a game screen on both render backends: the whole first
+    frame (target + battery), draw_target on its own, batterie on its
+    own and one battery segment going out, each with its repaint.
+
+    """
+
+    canvas = tk_canvas()
+    if canvas is None:
+        return {"skipped": "no display (run under Xvfb)"}
+
+    results = {}
+    for name in ("canvas", "composite"):
+        Game.render_backend = name
+        Game.start_backend()
+        if name == "composite" and Game.compositor is None:
+            results[name] = "skipped (Pillow not installed)"
+            continue
+
+        def repaint():
+            Game.redraw_pending = True
+            Game.flush_redraw()
+
+        def first_frame():
+            Game.game_monitor(canvas)
+            repaint()
+
+        def target():
+            Game.draw_target(*Game.target_center)
+            repaint()
+
+        def battery():
+            Game.clear_items("batt")
+            Game.batterie(canvas)
+            repaint()
+
+        def segment():
+            Game.battery_segment(random.randint(1, Game.rounds))
+            repaint()
+
+        first_frame()
+        results[f"{name} game screen (us)"] = timeit(first_frame, number=20)
+        results[f"{name} draw_target (us)"] = timeit(target, number=50)
+        results[f"{name} batterie (us)"] = timeit(battery, number=50)
+        results[f"{name} battery segment (us)"] = timeit(segment, number=50)
+
+    Game.render_backend = "canvas"
+    Game.start_backend()
+    Game.root.destroy()
+    return results
+
+
+def fill_scores(path, entries, seed=6):
+    # Score database with `entries` random results spread over the modes
+    rng = random.Random(seed)
+    store = Game.scores.ScoreStore(path)
+    rows = [(f"player_{i}", rng.randint(0, 1000), rng.randint(1, 8), 0.0) for i in range(entries)]
+    with store.db:
+        store.db.executemany("INSERT INTO scores (name, score, mode, time) VALUES (?, ?, ?, ?)", rows)
+    store.close()
+
+
+def bench_leaderboard(sizes=(10**3, 10**4, 10**5, 10**6)):
+    """
+    The results screen against the size of the score store: opening
+    it (index build), saving a score with its rank plus the top of
+    the board, a page deep in the board and, with a display,
+    show_leaderboard itself.
+
+    """
+
+    canvas = tk_canvas()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            label = f"10^{len(str(n)) - 1}"
+            path = os.path.join(tmp, f"scores-{n}.db")
+            fill_scores(path, n)
+
+            t0 = time.perf_counter()
+            store = Game.scores.ScoreStore(path)
+            results[f"{label}: open (ms)"] = 1000 * (time.perf_counter() - t0)
+
+            def results_screen():
+                store.add("bench", random.randint(0, 1000), Game.game_mode)
+                store.top(Game.game_mode, Game.leaderboard_size)
+
+            size = store.size(Game.game_mode)
+            results[f"{label}: save + top (us)"] = timeit(results_screen, repeat=3, number=20)
+            results[f"{label}: page middle (us)"] = timeit(
+                lambda: store.page(Game.game_mode, size // 2, Game.view_page_size), number=100)
+            store.close()
+
+            if canvas is not None:
+                Game.close_scores()
+                Game.scores_path = path
+                with contextlib.redirect_stdout(open(os.devnull, "w")):
+                    results[f"{label}: show_leaderboard (us)"] = timeit(
+                        lambda: (Game.show_leaderboard(canvas), Game.root.update_idletasks()), number=20)
+                Game.close_scores()
+
+    if canvas is None:
+        results["show_leaderboard"] = "skipped (no display, run under Xvfb)"
+    else:
+        Game.root.destroy()
+    return results
+
+
+def legacy_draw_target(canvas, x, y, hits):
+    # The delete-and-recreate draw_target the game used before the retained target group
+    canvas.delete("target")
+    label = dict(font=("Arial", 50, "bold"), tags="target")
+    for i in range(Game.target_rings):
+        radius1 = (Game.target_rings - i) * Game.ring_step
+        canvas.create_oval(x - radius1, y - radius1, x + radius1, y + radius1,
+                           fill="black", outline="cyan", width=3, tags="target")
+        if i != Game.target_rings - 1:
+            radius2 = (Game.target_rings - (i + 1)) * Game.ring_step
+            for sign in (1, -1):
+                ly = y + sign * (radius2 + (radius1 - radius2) / 2)
+                for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
+                    canvas.create_text(x + dx, ly + dy, text=Game.points[i], fill="cyan", **label)
+                canvas.create_text(x, ly, text=Game.points[i], fill="black", **label)
+    for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
+        canvas.create_text(x + dx, y + dy, text="100", fill="cyan", **label)
+    canvas.create_text(x, y, text="100", fill="black", **label)
+    for hx, hy in hits:
+        canvas.create_oval(hx - 10, hy - 10, hx + 10, hy + 10,
+                           fill="chartreuse2", outline="chartreuse2", tags="target")
+
+
+def bench_target_cycle():
+    """
+    One hide → move → show cycle of modes 2/3 with 6 hit markers on
+    the target, repaint included: old delete-and-redraw against the
+    retained target group.
+
+    """
+
+    canvas = tk_canvas()
+    if canvas is None:
+        return {"skipped": "no display (run under Xvfb)"}
+
+    x, y = Game.target_center
+    hits = [(x + 30 * k, y - 20 * k) for k in range(6)]
+    spots = [(x - 200, y + 100), (x, y)]
+
+    def legacy():
+        for sx, sy in spots:
+            canvas.delete("target")                                  # hide_target
+            Game.root.update_idletasks()
+            dx, dy = sx - hits[0][0], sy - hits[0][1]
+            legacy_draw_target(canvas, sx, sy, [(hx + dx, hy + dy) for hx, hy in hits])
+            Game.root.update_idletasks()
+
+    def retained():
+        for sx, sy in spots:
+            canvas.itemconfigure("board", state="hidden")             # hide_target
+            Game.root.update_idletasks()
+            Game.draw_target(sx, sy)                                  # move + show
+            Game.root.update_idletasks()
+
+    legacy_draw_target(canvas, x, y, hits)
+    results = {"legacy cycle (us)": timeit(legacy, number=50) / len(spots)}
+    canvas.delete("all")
+
+    Game.target_visible = True
+    Game.draw_target(x, y)
+    for hx, hy in hits:
+        canvas.create_oval(hx - 10, hy - 10, hx + 10, hy + 10,
+                           fill="chartreuse2", outline="chartreuse2", tags=("target", "board"))
+    results["retained cycle (us)"] = timeit(retained, number=50) / len(spots)
+    results["items created per cycle (legacy)"] = float(len(canvas.find_withtag("board")))
+    results["items created per cycle (retained)"] = 0.0
+
+    Game.root.destroy()
+    return results
+
+
+def bench_labels():
+    """
+    Building the target (rings + outlined labels) and repainting it:
+    Tk text items against cached Pillow sprites.
+
+    """
+
+    canvas = tk_canvas()
+    if canvas is None:
+        return {"skipped": "no display (run under Xvfb)"}
+
+    x, y = Game.target_center
+    results = {}
+
+    for label, sprites in (("text items", False), ("sprites", True)):
+        Game.use_sprites = sprites
+
+        def build():
+            canvas.delete("all")
+            Game.build_board(x, y)
+            Game.root.update_idletasks()
+
+        build()     # warm the sprite cache
+        results[f"build + repaint, {label} (us)"] = timeit(build, number=20)
+        results[f"canvas items, {label}"] = float(len(canvas.find_all()))
+
+    Game.root.destroy()
+    return results
+
+
+def bench_backends():
+    """
+    The same scripted frames (hide → move → show → hit, 6 markers)
+    on both render backends: average / worst repaint per frame as
+    counted by Game's frame-time instrumentation.
+
+    """
+
+    canvas = tk_canvas()
+    if canvas is None:
+        return {"skipped": "no display (run under Xvfb)"}
+
+    results = {}
+    for name in ("canvas", "composite"):
+        Game.render_backend = name
+        Game.start_backend()
+        if name == "composite" and Game.compositor is None:
+            results[name] = "skipped (Pillow not installed)"
+            continue
+
+        random.seed(1)
+        Game.target_visible = True
+        Game.game_monitor(canvas)
+        Game.backend_stats[name] = [0, 0.0, 0.0]
+
+        def repaint():
+            Game.redraw_pending = True
+            Game.flush_redraw()
+
+        def frame():
+            Game.hide_target()
+            repaint()
+            Game.move_target(random.randint(300, Game.canvas_width - 300),
+                             random.randint(300, Game.canvas_height - 400))
+            Game.show_target()
+            repaint()
+            x, y = Game.target_center
+            Game.hit_marker(x + 40, y - 25, True)
+            Game.battery_segment(random.randint(1, Game.rounds))
+            repaint()
+
+        for _ in range(6):
+            frame()
+        results[f"{name} cycle (us)"] = timeit(frame, number=20)
+        count, total, worst = Game.backend_stats[name]
+        results[f"{name} repaint avg (ms)"] = 1000 * total / count
+        results[f"{name} repaint max (ms)"] = 1000 * worst
+
+    Game.render_backend = "canvas"
+    Game.start_backend()
+    Game.root.destroy()
+    return results
+
+
+def bench_soak(games=300):
+    """
+    Plays `games` scripted games (target, 6 shots, results, leaderboard)
+    back to back and compares live canvas items, RSS and repaint time
+    of the first and the last games.
+
+    """
+
+    canvas = tk_canvas()
+    if canvas is None:
+        return {"skipped": "no display (run under Xvfb)"}
+
+    Game.reset_pool()
+    Game.leaderboard_path = os.path.join(tempfile.mkdtemp(), "leaderboard.txt")
+    rng = random.Random(1)
+
+    def play(n):
+        t0 = time.perf_counter()
+        Game.new_game()
+        Game.game_monitor(canvas)
+        x, y = Game.target_center
+        for k in range(Game.rounds):
+            Game.show_game(Game.game.shot(time.perf_counter(), x + rng.uniform(-450, 450),
+                                          y + rng.uniform(-450, 450)), f"player_{n}")
+            Game.redraw_pending = True
+            Game.flush_redraw()
+        Game.show_results(canvas, f"player_{n}")
+        Game.show_leaderboard(canvas)
+        Game.root.update_idletasks()
+        return time.perf_counter() - t0
+
+    results = {}
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        for n in range(games):
+            elapsed = play(n)
+            if n == 9:
+                results["items after 10 games"] = float(len(canvas.find_all()))
+                results["RSS after 10 games (MiB)"] = (Game.process_rss() or 0) / 2**20
+                results["game 10 (ms)"] = 1000 * elapsed
+    results[f"items after {games} games"] = float(len(canvas.find_all()))
+    results[f"RSS after {games} games (MiB)"] = (Game.process_rss() or 0) / 2**20
+    results[f"game {games} (ms)"] = 1000 * elapsed
+    results["pool items created"] = float(Game.pool_stats["created"])
+
+    Game.root.destroy()
+    return results
+
+
+def bench_clock(periods=40, interval=0.030, hide=0.015, load=0.006):
+    """
+    Hard-mode timing pattern (hide every `interval`, show `hide`
+    later), scaled down, with up to `load` s of busy work in every
+    callback: chained "schedule from now" timers (old root.after
+    chain) against timers anchored on the game clock's grid.
+
+    """
+
+    rng = random.Random(1)
+
+    def busy():
+        end = time.perf_counter() + rng.uniform(0, load)
+        while time.perf_counter() < end:
+            pass
+
+    def run(anchored):
+        clock = Game.gameclock.GameClock()
+        fired = []
+
+        def show():
+            busy()
+
+        def move():
+            fired.append(time.perf_counter())
+            busy()
+            clock.schedule(hide, show, "show", anchor=clock.due if anchored else None)
+            if not anchored and len(fired) < periods:
+                clock.schedule(interval, move, "move")
+
+        t0 = time.perf_counter()
+        if anchored:
+            tid = clock.schedule(0, move, "move", anchor=t0, interval=interval)
+        else:
+            clock.schedule(0, move, "move", anchor=t0)
+        while len(fired) < periods:
+            due = clock.next_due()
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            clock.run_due()
+        if anchored:
+            clock.cancel(tid)
+        return fired[-1] - (t0 + (periods - 1) * interval), clock.latency["move"]
+
+    results = {}
+    for label, anchored in (("chained", False), ("game clock", True)):
+        drift, stats = run(anchored)
+        results[f"{label}: drift after {periods} (ms)"] = 1000 * drift
+        results[f"{label}: move late max (ms)"] = 1000 * stats["max"]
+    return results
+
+
+def bench_targets(counts=(10, 100, 300, 1000), shots=20000):
+    """
+    Mode 7 hit testing: grid index vs. testing every target, per
+    shot, with `counts` targets of the multi_kinds spread over the
+    screen (shots aimed at random targets, some misses).
+
+    """
+
+    rng = random.Random(3)
+    results = {}
+    for n in counts:
+        field = Game.targets.TargetField(Game.canvas_width, Game.canvas_height, Game.multi_cell)
+        for _ in range(n):
+            ring, pts = rng.choice(Game.multi_kinds)
+            radius = ring * len(pts)
+            field.add(rng.uniform(radius, Game.canvas_width - radius),
+                      rng.uniform(radius, Game.canvas_height - radius), ring, pts)
+        aims = list(field.targets.values())
+        xy = []
+        for _ in range(shots):
+            t = rng.choice(aims)
+            xy.append((t.x + rng.gauss(0, t.radius), t.y + rng.gauss(0, t.radius)))
+
+        assert all(field.hit(x, y) == field.hit_scan(x, y) for x, y in xy[:500])
+        field.stats.update(shots=0, tests=0)
+        grid = timeit(lambda: [field.hit(x, y) for x, y in xy], repeat=3, number=1) / shots
+        scan = timeit(lambda: [field.hit_scan(x, y) for x, y in xy[:2000]], repeat=3, number=1) / 2000
+        results[f"{n} targets: grid (us/shot)"] = grid
+        results[f"{n} targets: scan (us/shot)"] = scan
+        results[f"{n} targets: tests/shot"] = field.stats["tests"] / field.stats["shots"]
+    return results
+
+
+class FrameTimer:
+    """
+    Tk stand-in for the one serve_lanes callback: `after` keeps the
+    callback, `frame` runs it (one display frame).
+
+    """
+
+    def __init__(self):
+        self.pending = None
+
+    def after(self, ms, fn):
+        self.pending = fn
+        return "frame"
+
+    def frame(self):
+        fn, self.pending = self.pending, None
+        if fn is not None:
+            fn()
+
+
+def bench_lanes(counts=(1, 2, 4, 8, 16), frames=3000, rate=4):
+    """
+    Lane multiplexing without a display: each lane runs a game loop
+    (read_serial) and its camera fires `rate` shots per second, each
+    at a random time during a frame, independent of the other lanes.
+    Every frame runs the one serve_lanes callback. Reports per lane
+    count the cost of one lane per frame, a switch, the share of the
+    frame interval used by all lanes, the queued → applied latency of
+    the shots (mostly the wait for the next frame) and the part the
+    lanes add, frame start → applied ("wait").
+
+    Idle lanes are not swapped in and the lanes with shots go oldest
+    shot first, so a shot waits only for the older shots of its frame:
+    the latency stays flat with the lane count, the wait grows by
+    microseconds (more lanes, more shots in the same frame).
+
+    """
+
+    def start():
+        # A lane whose reader is up (and sends nothing itself) running a game loop
+        sample_calibration()
+        Game.reader_thread = threading.Thread(target=quiet.wait, daemon=True)
+        Game.reader_thread.start()
+        Game.read_serial(Game.rounds, "bench", Game.game_session)
+
+    def stop():
+        Game.serving = Game.reader_thread = None
+
+    rng = random.Random(4)
+    chance = rate * Game.frame_interval / 1000
+    timer, saved = FrameTimer(), Game.tk_master
+    quiet = threading.Event()
+    Game.tk_master = timer
+    results = {}
+    try:
+        for n in counts:
+            lanes = Game.lanes.LaneSet(Game, Game.LANE_STATE)
+            for _ in range(n - 1):
+                lanes.add(Game.new_lane_state(len(lanes.lanes) + 1, "bench"))
+            Game.lane_set = lanes
+            with contextlib.redirect_stdout(open(os.devnull, "w")):
+                lanes.each(lanes.lanes, start)
+
+            latency, behind, frame_start = [], [], 0.0
+            handle_event = Game.handle_event
+
+            def timed(event, rounds, Name):
+                handle_event(event, rounds, Name)
+                now = time.perf_counter()
+                latency.append(now - event[1])
+                behind.append(now - frame_start)
+
+            for lane in lanes.lanes:
+                lane.switches, lane.switch_time = 0, 0.0
+            spent = 0.0
+            Game.handle_event = timed
+            try:
+                for _ in range(frames):
+                    now = time.perf_counter()
+                    for lane in lanes.lanes:
+                        if rng.random() < chance:
+                            # Came off the wire while the last frame was waiting
+                            stamp = now - rng.uniform(0, Game.frame_interval / 1000)
+                            lanes.value(lane, "events").put(("shot", stamp, rng.randint(0, 159), rng.randint(0, 119), stamp))
+                    frame_start = time.perf_counter()
+                    timer.frame()
+                    spent += time.perf_counter() - frame_start
+            finally:
+                Game.handle_event = handle_event
+                lanes.each(lanes.lanes, stop)
+                Game.lane_set = Game.lanes_after = timer.pending = None
+
+            latency.sort()
+            behind.sort()
+            switches = sum(lane.switches for lane in lanes.lanes)
+            results[f"{n} lanes: per lane (us/frame)"] = 1e6 * spent / frames / n
+            results[f"{n} lanes: switch (us)"] = 1e6 * sum(l.switch_time for l in lanes.lanes) / max(1, switches)
+            results[f"{n} lanes: frame used (%)"] = 100 * spent / frames / (Game.frame_interval / 1000)
+            results[f"{n} lanes: latency p50 (ms)"] = 1e3 * latency[len(latency) // 2]
+            results[f"{n} lanes: latency max (ms)"] = 1e3 * latency[-1]
+            results[f"{n} lanes: wait p50 (us)"] = 1e6 * behind[len(behind) // 2]
+            results[f"{n} lanes: wait max (us)"] = 1e6 * behind[-1]
+    finally:
+        quiet.set()
+        Game.tk_master = saved
+    return results
+
+
+def feed_shots(ready, sent, rate):
+    # Camera stand-in (own process): serves shot lines over TCP at `rate`/s, logs send times
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    ready.put(server.getsockname()[1])
+    conn, _ = server.accept()
+    conn.sendall(b"\n")                 # first line only syncs the decoder
+    t0 = time.perf_counter()
+    for k in range(len(sent)):
+        wait = t0 + k / rate - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        sent[k] = time.perf_counter()
+        conn.sendall(b"X:%d # Y:%d\n" % (k % 160, k // 160))
+    time.sleep(0.5)
+    conn.close()
+
+
+def bench_ingest(shots=1000, rate=500, stall_every=0.25):
+    """
+    Shot timestamping while the UI process stalls: every
+    `stall_every` s the consumer runs one long call that holds the
+    GIL (like a slow repaint or a GC pause). Compares the reader
+    thread in the UI process with the ingest process; reports how
+    late each shot was stamped after it was sent.
+
+    """
+
+    stall_data = [random.random() for _ in range(400_000)]
+    results = {}
+    for label in ("thread", "process"):
+        ready = multiprocessing.Queue()
+        sent = multiprocessing.Array("d", shots, lock=False)
+        feeder = multiprocessing.Process(target=feed_shots, args=(ready, sent, rate), daemon=True)
+        feeder.start()
+        url = f"socket://127.0.0.1:{ready.get()}"
+
+        if label == "thread":
+            port = Game.serial.serial_for_url(url, timeout=0.1)
+            events, stop = Game.queue.Queue(), threading.Event()
+            reader = threading.Thread(target=Game.serial_reader, daemon=True, args=(
+                port, stop, events, {}, deque(maxlen=64), Game.link.FrameDecoder()))
+            reader.start()
+
+            def poll():
+                out = []
+                while not events.empty():
+                    out.append(events.get_nowait())
+                return out
+        else:
+            proc = Game.timed_import("ingest").IngestProcess(url, 9600, {}, 4096)
+            poll = proc.poll
+
+        late, stall = [], 0.0
+        next_stall = time.perf_counter() + stall_every
+        while len(late) < shots and feeder.is_alive():
+            for kind, stamp, x, y, *_ in (e for e in poll() if e[0] == "shot"):
+                late.append(stamp - sent[int(x) + 160 * int(y)])
+            if time.perf_counter() >= next_stall:
+                t0 = time.perf_counter()
+                sorted(stall_data)          # one C call, GIL held throughout
+                stall = max(stall, time.perf_counter() - t0)
+                next_stall = time.perf_counter() + stall_every
+            time.sleep(0.001)
+
+        if label == "thread":
+            stop.set()
+            reader.join(timeout=1)
+            port.close()
+        else:
+            proc.stop()
+        feeder.join(timeout=2)
+
+        late.sort()
+        results[f"{label}: stall (ms)"] = 1000 * stall
+        results[f"{label}: late p50 (ms)"] = 1000 * late[len(late) // 2]
+        results[f"{label}: late p99 (ms)"] = 1000 * late[int(0.99 * (len(late) - 1))]
+        results[f"{label}: late max (ms)"] = 1000 * late[-1]
+    return results
+
+
+def bench_replay(shots=20000, chunk=8):
+    """
+    Host throughput on a recorded session: a synthetic recording of
+    `shots` shot frames (`chunk` per read) is replayed as fast as
+    possible through serial_reader and every shot is mapped to the
+    screen, like a game would.
+
+    """
+
+    replay = Game.timed_import("replay")
+    matrix, transform_type = sample_calibration()
+    rng = random.Random(1)
+    frames = [Game.link.encode_shot(i, 10 * i, rng.randrange(160), rng.randrange(120)) for i in range(shots)]
+    records = [(0.0, replay.RX, b"\n")]
+    records += [(0.01 * (i + 1), replay.RX, b"".join(frames[i:i + chunk])) for i in range(0, shots, chunk)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.fjnrec")
+        replay.write_recording(path, records)
+        port = replay.ReplayPort(path, speed=0, follow_commands=False)
+        events, stop = Game.queue.Queue(), threading.Event()
+        reader = threading.Thread(target=Game.serial_reader, daemon=True, args=(
+            port, stop, events, {}, deque(maxlen=64), Game.link.FrameDecoder()))
+
+        mapped = 0
+        t0 = time.perf_counter()
+        reader.start()
+        while reader.is_alive() or not events.empty():
+            try:
+                kind, stamp, *data = events.get(timeout=0.1)
+            except Game.queue.Empty:
+                continue
+            if kind == "shot":
+                Game.correct_coords(data[0], data[1], matrix, transform_type)
+                mapped += 1
+        elapsed = time.perf_counter() - t0
+
+    return {
+        "shots mapped": mapped,
+        "recorded span (s)": records[-1][0],
+        "replay time (s)": elapsed,
+        "shots per second": mapped / elapsed,
+        "speed-up vs real time": records[-1][0] / elapsed,
+    }
+
+
+def run_camera(fd, argv, duration, stats):
+    # Emulated camera in its own process (bench_emulator)
+    emulator = Game.timed_import("emulator")
+    cam = emulator.Camera(fd, emulator.parse_args(argv))
+    cam.run(duration)
+    stats.put(cam.stats)
+
+
+def bench_emulator(rates=(100, 300, 1000, 3000, 10000), duration=2.0):
+    """
+    Where the host saturates: the emulated camera sends shots at each
+    rate over a pty; serial_reader parses them and the consumer maps
+    every shot to the screen. Reports shots received per second and
+    how long they waited in the event queue.
+
+    """
+
+    emulator = Game.timed_import("emulator")
+    sample_calibration()
+    results = {}
+    for rate in rates:
+        master, slave, path = emulator.open_pty()
+        stats = multiprocessing.Queue()
+        cam = multiprocessing.Process(target=run_camera, daemon=True, args=(
+            master, ["--rate", str(rate), "--dist", "uniform", "--seed", "1"], duration + 0.5, stats))
+        cam.start()
+
+        port = Game.serial.Serial(path, 921600, timeout=0.1)
+        events, stop = Game.queue.Queue(), threading.Event()
+        reader = threading.Thread(target=Game.serial_reader, daemon=True, args=(
+            port, stop, events, {}, deque(maxlen=64), Game.link.FrameDecoder()))
+        reader.start()
+        port.write(Game.link.encode_command(1, "start"))
+
+        received, lag = 0, []
+        end = time.perf_counter() + duration
+        while time.perf_counter() < end:
+            try:
+                kind, stamp, *data = events.get(timeout=0.1)
+            except Game.queue.Empty:
+                continue
+            if kind == "shot":
+                Game.correct_coords(data[0], data[1], Game.matrix, Game.transform_type)
+                received += 1
+                lag.append(time.perf_counter() - stamp)
+
+        sent = stats.get(timeout=duration + 5)
+        cam.join(timeout=1)
+        stop.set()
+        reader.join(timeout=1)
+        port.close()
+        os.close(master)
+        os.close(slave)
+
+        lag.sort()
+        results[f"{rate}/s: received /s"] = received / duration
+        results[f"{rate}/s: camera late (ms)"] = 1000 * sent["max_late"]
+        results[f"{rate}/s: lag p99 (ms)"] = 1000 * lag[int(0.99 * (len(lag) - 1))] if lag else float("nan")
+    return results
+
+def play_engine(rules, mode, seed):
+    # One seeded game: shots every 0.2-1.5 s, aimed at the (a) target with some spread
+    game = Game.engine.Engine(rules.replace(mode=mode), seed=seed)
+    rng = random.Random(seed)
+    game.start(0.0)
+    t = 0.0
+    while not game.over and t < 120:
+        t += rng.uniform(0.2, 1.5)
+        x, y = game.center
+        if game.field is not None and len(game.field):
+            target = rng.choice(list(game.field.targets.values()))
+            x, y = target.x, target.y
+        game.shot(t, x + rng.gauss(0, 80), y + rng.gauss(0, 80))
+        if mode in (1, 2, 8) and game.missed + game.shots >= game.shot_limit():
+            game.end(t)                     # these modes end on the operator's word
+    return game
+
+
+def bench_engine(modes=(1, 2, 3, 4, 6, 7), seconds=0.5):
+    """
+    The headless game engine on virtual time: seeded games per mode
+    (no window, no camera). Checks that a seed replays the same game
+    and reports games per second.
+
+    """
+
+    rules = Game.game_rules()
+    results = {}
+    for mode in modes:
+        assert play_engine(rules, mode, 1).snapshot() == play_engine(rules, mode, 1).snapshot()
+        games, t0 = 0, time.perf_counter()
+        while time.perf_counter() - t0 < seconds:
+            play_engine(rules, mode, games)
+            games += 1
+        results[f"mode {mode} (games/s)"] = games / (time.perf_counter() - t0)
+    return results
+
+
+
+
+BENCHMARKS = {
+    "parse": bench_parse,
+    "correct_coords": bench_correct_coords,
+    "scoring": bench_scoring,
+    "calibration": bench_calibration,
+    "draw": bench_draw,
+    "leaderboard": bench_leaderboard,
+    "target_cycle": bench_target_cycle,
+    "labels": bench_labels,
+    "backends": bench_backends,
+    "soak": bench_soak,
+    "clock": bench_clock,
+    "targets": bench_targets,
+    "lanes": bench_lanes,
+    "ingest": bench_ingest,
+    "replay": bench_replay,
+    "emulator": bench_emulator,
+    "engine": bench_engine,
+}
+
+
+#  BASELINES
+#
+#  Only the primary result of each hot path is gated (GATED); reference
+#  variants (per-point cv2, linear scan, ...) and bench inputs (the
+#  ingest stall, counts) are reported but never fail a run. With a
+#  baseline each benchmark runs `repeat` times and its median is
+#  compared, and a change within the noise floor of its unit never
+#  counts, so µs-scale timings do not fail on scheduler noise.
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+TOLERANCE = 0.5         # relative change allowed before a result counts as a regression
+BASELINE_REPEAT = 5     # runs per benchmark (median) when checking / saving a baseline
+
+GATED = {
+    "parse": (r"^serial_reader ",),
+    "correct_coords": (r"^LUT ", r"^batch ", r"^max LUT error"),
+    "scoring": (r"^engine mode ", r"^parse \+ map \+ score"),
+    "calibration": (r"^correction ",),
+    "draw": (r" game screen ", r" draw_target ", r" battery segment "),
+    "leaderboard": (r": open ", r": save \+ top ", r": show_leaderboard "),
+    "targets": (r": grid ",),
+    "engine": (r"games/s",),
+    "replay": (r"^shots per second$",),
+}
+
+UNIT = re.compile(r"\((us|ms|s|MiB|px)[/ )]")               # smaller is better
+NOISE_FLOOR = {"us": 2.0, "ms": 1.0, "s": 0.01, "MiB": 5.0, "px": 0.01}
+HIGHER_IS_BETTER = re.compile(r"(/s\)|/s$| per second)")    # rates
+
+
+def gated(name, key):
+    return any(re.search(pattern, key) for pattern in GATED.get(name, ()))
+
+
+def direction(key):
+    # -1: smaller is better, +1: larger is better, 0: not compared
+    if UNIT.search(key):
+        return -1
+    if HIGHER_IS_BETTER.search(key):
+        return 1
+    return 0
+
+
+def compare(results, baseline, tolerance):
+    """
+    Checks the gated `results` against the `baseline` results of the
+    same benchmarks. Returns [(benchmark, key, baseline, now, change),
+    ...] of the results that got worse by more than `tolerance` (0.5 =
+    50 % slower / lower rate) and by more than the noise floor of their
+    unit. Results missing on either side, or skipped, are not compared.
+
+    """
+
+    regressions = []
+    for name, values in results.items():
+        for key, now in values.items():
+            base = baseline.get(name, {}).get(key)
+            sign = direction(key)
+            if (not sign or not gated(name, key) or isinstance(now, str)
+                    or not isinstance(base, (int, float)) or base <= 0):
+                continue
+            change = (now - base) / base
+            unit = UNIT.search(key)
+            if unit and abs(now - base) <= NOISE_FLOOR[unit.group(1)]:
+                continue
+            if (sign < 0 and change > tolerance) or (sign > 0 and -change > tolerance / (1 + tolerance)):
+                regressions.append((name, key, base, now, change))
+    return regressions
+
+
+def median_of(runs):
+    # Median of every numeric result over several runs of one benchmark
+    merged = dict(runs[0])
+    for key, value in runs[0].items():
+        if not isinstance(value, str):
+            merged[key] = float(np.median([run[key] for run in runs if key in run]))
+    return merged
+
+
+def report(results):
+    # Results of a run as written by --json / --save-baseline (4 significant digits)
+    return {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "results": {name: {key: value if isinstance(value, str) else float(f"{value:.4g}")
+                           for key, value in values.items()}
+                    for name, values in results.items()},
+    }
+
+
+def write_json(path, data):
+    if path == "-":
+        json.dump(data, sys.stdout, indent=2)
+        print()
+        return
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmarks of the host-side hot paths of Game.py")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--json", metavar="FILE", help="write the results as JSON ('-' = stdout)")
+    parser.add_argument("--baseline", metavar="FILE", nargs="?", const=BASELINE_PATH,
+                        help=f"fail on regressions against FILE (default {os.path.basename(BASELINE_PATH)})")
+    parser.add_argument("--save-baseline", metavar="FILE", nargs="?", const=BASELINE_PATH,
+                        help="store the results as the new baseline (merged into an existing file)")
+    parser.add_argument("--repeat", type=int,
+                        help=f"run every benchmark N times and report the medians "
+                             f"(default 1, {BASELINE_REPEAT} with a baseline)")
+    parser.add_argument("--tolerance", type=float,
+                        help=f"allowed relative change (default: the baseline's, else {TOLERANCE})")
+    return parser.parse_args(argv)
+
+
+#  MAIN
+
+def main(argv):
+    args = parse_args(argv)
+    quiet = args.json == "-"            # stdout is for the JSON
+    out = sys.stderr if quiet else sys.stdout
+
+    repeat = args.repeat or (BASELINE_REPEAT if args.baseline or args.save_baseline else 1)
+    results = {}
+    for name in args.names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            print("Unknown benchmark:", name, file=out)
+            continue
+        print(f"\n{name}", file=out)
+        with contextlib.redirect_stdout(out):
+            results[name] = median_of([BENCHMARKS[name]() for _ in range(max(1, repeat))])
+        for key, value in results[name].items():
+            if isinstance(value, str):
+                print(f"  {key:<28} {value}", file=out)
+            else:
+                print(f"  {key:<28} {value:10.3f}", file=out)
+
+    if args.json:
+        write_json(args.json, report(results))
+
+    if args.save_baseline:
+        stored = {"tolerance": TOLERANCE, "results": {}, "skipped": {}}
+        if os.path.isfile(args.save_baseline):
+            with open(args.save_baseline) as f:
+                stored.update(json.load(f))
+        current = report(results)
+        stored.update({k: v for k, v in current.items() if k != "results"})
+        # Only the gated, measured values; skipped ones keep their old baseline
+        for name, values in current["results"].items():
+            measured = {key: value for key, value in values.items()
+                        if gated(name, key) and not isinstance(value, str)}
+            if measured:
+                stored["results"][name] = measured
+            # Parts that could not run here (no display, ...) are noted as such
+            stored["skipped"] = {k: v for k, v in stored["skipped"].items() if k.split(":")[0] != name}
+            for key, value in values.items():
+                if isinstance(value, str) and name in GATED:
+                    stored["skipped"][name if key == "skipped" else f"{name}: {key}"] = value
+        write_json(args.save_baseline, stored)
+        print(f"\nBaseline saved to {args.save_baseline}", file=out)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        tolerance = args.tolerance if args.tolerance is not None else baseline.get("tolerance", TOLERANCE)
+        regressions = compare(results, baseline["results"], tolerance)
+        print(f"\nAgainst {args.baseline} ({baseline.get('machine', '?')}, "
+              f"tolerance {100 * tolerance:.0f} %, median of {repeat}):", file=out)
+        for key, why in baseline.get("skipped", {}).items():
+            if key.split(":")[0] in results:
+                print(f"  no baseline for {key} ({why})", file=out)
+        for name, key, base, now, change in regressions:
+            print(f"  REGRESSION {name}: {key}  {base:.3f} → {now:.3f} ({100 * change:+.0f} %)", file=out)
+        if regressions:
+            return 1
+        print("  no regressions", file=out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
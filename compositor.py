@@ -0,0 +1,221 @@
+#  COMPOSITOR — layered off-screen render backend for Game.py
+#
+#  Static layers (target, battery, emblem) are rendered once into RGBA
+#  buffers. Dynamic markers (hits / misses) are stamped on top, and each
+#  frame only the dirty rectangle is recomposed in a NumPy frame buffer
+#  and pushed into the window as one photo-image blit.
+
+import time
+from collections import deque
+
+import numpy as np
+
+
+class Layer:
+    """
+    One cached RGBA image placed at (x, y) (top-left) on the screen.
+    Markers attached to a layer move and hide together with it.
+
+    """
+
+    def __init__(self, rgba, x, y, z):
+        rgba = np.asarray(rgba, dtype=np.uint8)
+        alpha = rgba[:, :, 3:4].astype(np.uint16)
+        self.premul = rgba[:, :, :3] * alpha + 127    # colour × alpha (+ rounding)
+        self.inv = 255 - alpha                        # weight of what lies below
+        self.h, self.w = rgba.shape[:2]
+        self.x, self.y = x, y
+        self.z = z
+        self.visible = True
+        self.markers = deque()  # (dx, dy, radius, rgb) relative to (x, y)
+
+    def rect(self):
+        return (self.x, self.y, self.x + self.w, self.y + self.h)
+
+
+class Compositor:
+    """
+    Owns a full-screen PhotoImage on `canvas` (tag "frame", kept below
+    every other item) and the frame buffer behind it.
+
+    """
+
+    def __init__(self, canvas, width, height, background=(0, 0, 0), max_markers=1024):
+        import tkinter as tk
+
+        self.canvas = canvas
+        self.width, self.height = width, height
+        self.background = np.array(background, dtype=np.uint8)
+        self.frame = np.empty((height, width, 3), dtype=np.uint8)
+        self.frame[:] = self.background
+        self.photo = tk.PhotoImage(master=canvas, width=width, height=height)
+        self.item = canvas.create_image(0, 0, anchor="nw", image=self.photo, tags="frame")
+        canvas.tag_lower("frame")
+
+        self.layers = {}
+        self.markers = deque()  # screen-space markers (x, y, radius, rgb)
+        self.max_markers = max_markers  # per list; the oldest marker goes first
+        self.dirty = None       # union of dirty rects (x0, y0, x1, y1)
+        self.stamps = {}        # radius → boolean disk mask
+        self.stats = {"frames": 0, "compose": 0.0, "blit": 0.0, "max": 0.0, "pixels": 0}
+
+        self.invalidate()
+
+    #  LAYERS
+
+    def set_layer(self, name, rgba, x, y, z=0):
+        # Adds or replaces a cached layer (rgba: H×W×4 array or PIL image)
+        old = self.layers.get(name)
+        layer = Layer(rgba, int(x), int(y), z)
+        if old is not None:
+            layer.visible = old.visible
+            layer.markers = old.markers
+            self.invalidate(old.rect())
+        self.layers[name] = layer
+        self.invalidate(layer.rect())
+
+    def has_layer(self, name):
+        return name in self.layers
+
+    def move_layer(self, name, x, y):
+        layer = self.layers[name]
+        if (layer.x, layer.y) == (int(x), int(y)):
+            return
+        self.invalidate(layer.rect())
+        layer.x, layer.y = int(x), int(y)
+        self.invalidate(layer.rect())
+
+    def show_layer(self, name, visible=True):
+        layer = self.layers.get(name)
+        if layer is None or layer.visible == visible:
+            return
+        layer.visible = visible
+        self.invalidate(layer.rect())
+
+    def remove_layer(self, name):
+        layer = self.layers.pop(name, None)
+        if layer is not None:
+            self.invalidate(layer.rect())
+
+    def clear(self):
+        # Empties the whole scene (screen change)
+        self.layers.clear()
+        self.markers.clear()
+        self.invalidate()
+
+    #  MARKERS
+
+    def add_marker(self, x, y, radius, rgb, layer=None):
+        # Filled circle; attached to `layer` (moves / hides with it) or to the screen
+        x, y = int(round(x)), int(round(y))
+        if layer is not None and layer in self.layers:
+            owner = self.layers[layer]
+            self._push(owner.markers, (x - owner.x, y - owner.y, radius, rgb), owner.x, owner.y)
+        else:
+            self._push(self.markers, (x, y, radius, rgb))
+        self.invalidate((x - radius, y - radius, x + radius + 1, y + radius + 1))
+
+    def _push(self, markers, marker, ox=0, oy=0):
+        # Appends a marker; at the cap the oldest one is dropped, so a
+        # frame never stamps more than max_markers per list
+        if len(markers) >= self.max_markers:
+            dx, dy, r, _ = markers.popleft()
+            self.invalidate((ox + dx - r, oy + dy - r, ox + dx + r + 1, oy + dy + r + 1))
+        markers.append(marker)
+
+    def clear_markers(self):
+        self.markers.clear()
+        for layer in self.layers.values():
+            layer.markers.clear()
+        self.invalidate()
+
+    #  FRAME
+
+    def invalidate(self, rect=None):
+        # Marks a screen rectangle (default: everything) for recomposition
+        if rect is None:
+            rect = (0, 0, self.width, self.height)
+        x0, y0, x1, y1 = rect
+        x0, y0 = max(0, int(x0)), max(0, int(y0))
+        x1, y1 = min(self.width, int(x1)), min(self.height, int(y1))
+        if x0 >= x1 or y0 >= y1:
+            return
+        if self.dirty is None:
+            self.dirty = (x0, y0, x1, y1)
+        else:
+            d = self.dirty
+            self.dirty = (min(d[0], x0), min(d[1], y0), max(d[2], x1), max(d[3], y1))
+
+    def render(self):
+        """
+        Recomposes the dirty rectangle and blits it into the window.
+        Returns the frame time in seconds (0 when nothing changed).
+
+        """
+
+        if self.dirty is None:
+            return 0.0
+        t0 = time.perf_counter()
+        x0, y0, x1, y1 = self.dirty
+        self.dirty = None
+
+        out = self.frame[y0:y1, x0:x1]
+        out[:] = self.background
+
+        for layer in sorted(self.layers.values(), key=lambda l: l.z):
+            if not layer.visible:
+                continue
+            self._blend(out, (x0, y0, x1, y1), layer)
+            for dx, dy, r, rgb in layer.markers:
+                self._stamp(out, (x0, y0, x1, y1), layer.x + dx, layer.y + dy, r, rgb)
+
+        for x, y, r, rgb in self.markers:
+            self._stamp(out, (x0, y0, x1, y1), x, y, r, rgb)
+
+        t1 = time.perf_counter()
+        self._blit(x0, y0, out)
+        t2 = time.perf_counter()
+
+        s = self.stats
+        s["frames"] += 1
+        s["compose"] += t1 - t0
+        s["blit"] += t2 - t1
+        s["max"] = max(s["max"], t2 - t0)
+        s["pixels"] += (x1 - x0) * (y1 - y0)
+        return t2 - t0
+
+    def _blend(self, out, rect, layer):
+        # Alpha-blends the part of `layer` inside `rect` into `out`
+        x0, y0, x1, y1 = rect
+        lx0, ly0 = max(x0, layer.x), max(y0, layer.y)
+        lx1, ly1 = min(x1, layer.x + layer.w), min(y1, layer.y + layer.h)
+        if lx0 >= lx1 or ly0 >= ly1:
+            return
+        src = (slice(ly0 - layer.y, ly1 - layer.y), slice(lx0 - layer.x, lx1 - layer.x))
+        dst = out[ly0 - y0:ly1 - y0, lx0 - x0:lx1 - x0]
+        dst[:] = (layer.premul[src] + dst * layer.inv[src]) // 255
+
+    def _stamp(self, out, rect, x, y, r, rgb):
+        # Draws a filled circle (radius r) centred on (x, y) into `out`
+        x0, y0, x1, y1 = rect
+        cx0, cy0 = max(x0, x - r), max(y0, y - r)
+        cx1, cy1 = min(x1, x + r + 1), min(y1, y + r + 1)
+        if cx0 >= cx1 or cy0 >= cy1:
+            return
+        disk = self.stamps.get(r)
+        if disk is None:
+            yy, xx = np.mgrid[-r:r + 1, -r:r + 1]
+            disk = self.stamps[r] = xx * xx + yy * yy <= r * r
+        mask = disk[cy0 - (y - r):cy1 - (y - r), cx0 - (x - r):cx1 - (x - r)]
+        out[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0][mask] = rgb
+
+    def _blit(self, x, y, pixels):
+        # One photo "put" of the recomposed region (binary PPM)
+        h, w = pixels.shape[:2]
+        data = b"P6 %d %d 255\n" % (w, h) + np.ascontiguousarray(pixels).tobytes()
+        self.canvas.tk.call(self.photo.name, "put", data, "-format", "ppm", "-to", x, y)
+
+    def destroy(self):
+        self.canvas.delete(self.item)
+        self.layers.clear()
+        self.markers.clear()
@@ -1,5 +1,6 @@
-from pyb import LED, Pin
+from pyb import LED, Pin, USB_VCP
 import sensor, time
+import link
 
 led = LED(1)  # red LED
 led.on()
@@ -9,6 +10,17 @@ roi = None
 thresholdred = [(30, 100, 15, 127, -20, 40)]
 first = True
 
+# Wire format: binary shot frames (see link.py) or legacy text lines
+binary = True
+usb = USB_VCP()
+seq = 0
+
+# Command link; reuse main.py's decoder when started from there
+try:
+    decoder
+except NameError:
+    decoder = link.FrameDecoder()
+
 # Camera setup
 sensor.reset()
 sensor.set_pixformat(sensor.RGB565)
@@ -31,30 +43,39 @@ except OSError:
 
 if roi is None:
     raise ValueError("ROI not loaded correctly")
+if binary:
+    print(link.hello_line())
 print("differencing")
 while True:
     clock.tick()
     img = sensor.snapshot()
+    shot_ms = time.ticks_ms()       # exposure time of this frame, sent with its shots
 
     if first:
         first = False
         sound_pin.high()
         for b in img.find_blobs(thresholdred, roi=roi, pixels_threshold=15, area_threshold=15):
             if b.roundness() > 0.5:
-                print(f"\nX: {b.cx()} # Y: {b.cy()}")
+                if binary:
+                    seq += 1
+                    usb.write(link.encode_shot(seq, shot_ms, b.cx(), b.cy(),
+                                               b.pixels(), b.roundness()))
+                else:
+                    print(f"\nX: {b.cx()} # Y: {b.cy()}")
                 time.sleep(0.5)
     else:
         first = True
         sound_pin.low()
 
-    try:
-        with open("protocol.txt", "r") as f:
-            lines = f.readlines()
-            if lines and lines[-1].strip().lower() == "end":
-                print("End command detected. Exiting loop.")
-                break
-    except OSError:
-        pass
-    except Exception:
-        print("Error reading protocol.txt")
-        pass
\ No newline at end of file
+    # Commands from the host (non-blocking, no file I/O)
+    stop = False
+    for req_id, cmd in link.poll_commands(usb, decoder):
+        cmd = cmd.strip().lower()
+        if cmd == "end":
+            usb.write(link.encode_ack(req_id, link.ACK_OK))
+            stop = True
+        else:
+            usb.write(link.encode_ack(req_id, link.ACK_BUSY))
+    if stop:
+        print("End command detected. Exiting loop.")
+        break
@@ -0,0 +1,296 @@
+#  EMULATOR — stand-in OpenMV camera on a pseudo-terminal (Linux / macOS)
+#
+#  Opens a pty and answers on it like main.py / detc.py / calib.py on
+#  the camera: command frames are acked, "start" prints the hello line
+#  and "differencing" and then sends shots, "calib" prints the averaged
+#  blobs, the ROI and "File written.", "end" stops detection. Game.py
+#  connects to the printed device path like to the real camera
+#  (`port /dev/pts/N`), so the whole host side runs without hardware.
+#
+#  Shots: rate, spatial distribution (uniform over the ROI or normal
+#  around an aim point), timing jitter and a share of malformed lines /
+#  corrupted frames are configurable. Blobs and ROI come from
+#  coords.txt, like the last calibration stored on the camera.
+#
+#  Run:  python emulator.py [--rate 200] [--dist normal] [--malformed 0.01] ...
+
+import os
+import sys
+import time
+import tty
+import errno
+import random
+import select
+import argparse
+
+import link
+
+COMMANDS = {"start", "calib", "end", "exit", "coords", "test", "led_off"}   # as in main.py
+CALIB_TIME = 5.0            # s calib.py collects blobs before it answers
+CAM_WIDTH, CAM_HEIGHT = 160, 120    # QQVGA detection frame
+
+
+def open_pty():
+    """
+    Returns (master fd, slave fd, slave path) of a new raw pty. The
+    slave stays open here so the master survives the host closing it.
+
+    """
+
+    master, slave = os.openpty()
+    tty.setraw(slave)                   # no echo / line editing of binary frames
+    os.set_blocking(master, False)
+    return master, slave, os.ttyname(slave)
+
+
+def read_coords(path):
+    # (roi, [(x, y), ...]) from a coords.txt written by calib.py
+    roi, blobs = None, []
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("ROI"):
+                roi = tuple(int(v) for v in line.split(":")[1].strip().strip("()").split(","))
+            elif line.startswith("Blob"):
+                x, y = line.split(":")[1].split(",")
+                blobs.append((int(x.split("=")[1]), int(y.split("=")[1])))
+    return roi, blobs
+
+
+class Camera:
+    """
+    The emulated camera on the master side `fd` of a pty. run() is
+    main.py's loop; detection and calibration run inside it like the
+    scripts main.py executes.
+
+    """
+
+    def __init__(self, fd, options):
+        self.fd = fd
+        self.opt = options
+        self.rng = random.Random(options.seed)
+        self.roi, self.blobs = read_coords(options.coords)
+        self.decoder = link.FrameDecoder()
+        self.t0 = time.perf_counter()
+        self.script = None              # None (main loop), "detect" or "calib"
+        self.script_start = 0.0
+        self.next_shot = 0.0
+        self.seq = 0
+        self.running = True
+        self.stats = {"commands": 0, "shots": 0, "malformed": 0, "lines": 0,
+                      "overruns": 0, "max_late": 0.0}
+
+    #  WIRE
+
+    def send(self, data):
+        # The host not reading fills the pty: counted, then dropped
+        try:
+            os.write(self.fd, data)
+        except BlockingIOError:
+            self.stats["overruns"] += 1
+        except OSError as e:
+            if e.errno != errno.EIO:    # EIO: nobody has the port open
+                raise
+
+    def print(self, text=""):
+        self.stats["lines"] += 1
+        self.send(text.encode() + b"\n")
+
+    def ticks_ms(self):
+        return int((time.perf_counter() - self.t0) * 1000) & 0xFFFFFFFF
+
+    def commands(self):
+        # Command frames waiting on the pty, like link.poll_commands
+        try:
+            data = os.read(self.fd, 4096)
+        except (BlockingIOError, OSError):
+            return []
+        self.decoder.feed(data)
+        return [link.decode_command(p) for kind, p in self.decoder.parse() if kind == link.FRAME_CMD]
+
+    #  MAIN LOOP (main.py)
+
+    def run(self, duration=None):
+        end = None if duration is None else time.perf_counter() + duration
+        while self.running and (end is None or time.perf_counter() < end):
+            for req_id, cmd in self.commands():
+                self.stats["commands"] += 1
+                self.command(req_id, cmd.strip().lower())
+
+            if self.script == "detect":
+                self.detect()
+            elif self.script == "calib" and time.perf_counter() - self.script_start >= CALIB_TIME / self.opt.speedup:
+                self.finish_calib()
+
+            # Sleep until the next shot is due or a command arrives
+            wait = 0.02
+            if self.script == "detect":
+                wait = max(0.0, min(wait, self.next_shot - time.perf_counter()))
+            select.select([self.fd], [], [], wait)
+
+    def command(self, req_id, cmd):
+        if not cmd:
+            return
+        if self.script == "detect":
+            # detc.py only takes "end"
+            if cmd == "end":
+                self.send(link.encode_ack(req_id, link.ACK_OK))
+                self.print("End command detected. Exiting loop.")
+                self.script = None
+            else:
+                self.send(link.encode_ack(req_id, link.ACK_BUSY))
+            return
+        if self.script == "calib":
+            return                      # calib.py does not poll commands
+
+        self.send(link.encode_ack(req_id, link.ACK_OK if cmd in COMMANDS else link.ACK_UNKNOWN))
+        if cmd == "start":
+            self.start_detect()
+        elif cmd == "calib":
+            self.print("Starting calibration phase for 5 seconds...")
+            self.script, self.script_start = "calib", time.perf_counter()
+        elif cmd == "end":
+            self.print("End command received.")
+        elif cmd == "exit":
+            self.print("Exiting main loop.")
+            self.running = False
+        elif cmd == "coords":
+            with open(self.opt.coords, "r") as f:
+                for line in f:
+                    self.print(line.strip())
+        elif cmd == "test":
+            self.print("Now active.")
+        elif cmd == "led_off":
+            self.print("LED is now inactive.")
+        else:
+            self.print(f"Unknown command: {cmd}")
+
+    #  DETECTION (detc.py)
+
+    def start_detect(self):
+        if self.roi is None:
+            self.print("Error running detc.py : ROI not loaded correctly")
+            return
+        if self.opt.binary:
+            self.print(link.hello_line())
+        self.print("differencing")
+        self.script = "detect"
+        self.next_shot = time.perf_counter() + self.interval()
+
+    def interval(self):
+        # Time to the next shot: regular at `rate`, or Poisson arrivals
+        if self.opt.poisson:
+            return self.rng.expovariate(self.opt.rate)
+        return max(0.0, 1 / self.opt.rate + self.rng.gauss(0.0, self.opt.jitter / 1000))
+
+    def aim(self):
+        # Camera pixel of the next shot
+        x0, y0, w, h = self.roi
+        if self.opt.dist == "uniform":
+            x, y = self.rng.uniform(x0, x0 + w), self.rng.uniform(y0, y0 + h)
+        else:
+            cx, cy = self.opt.aim or (x0 + w / 2, y0 + h / 2)
+            x, y = self.rng.gauss(cx, self.opt.spread), self.rng.gauss(cy, self.opt.spread)
+        return min(max(int(x), 0), CAM_WIDTH - 1), min(max(int(y), 0), CAM_HEIGHT - 1)
+
+    def detect(self):
+        # Sends every shot that is due (several when the loop fell behind)
+        now = time.perf_counter()
+        self.stats["max_late"] = max(self.stats["max_late"], now - self.next_shot)
+        while self.next_shot <= now:
+            self.next_shot += self.interval()
+            x, y = self.aim()
+            self.stats["shots"] += 1
+            if self.rng.random() < self.opt.malformed:
+                self.stats["malformed"] += 1
+                self.send(self.malformed(x, y))
+            elif self.opt.binary:
+                self.seq += 1
+                self.send(link.encode_shot(self.seq, self.ticks_ms(), x, y,
+                                           self.rng.randint(15, 60), self.rng.uniform(0.5, 1.0)))
+            else:
+                self.print(f"\nX: {x} # Y: {y}")
+
+    def malformed(self, x, y):
+        """
+        One broken shot in the current wire format: text lines the
+        parser has to reject, or frames that fail their CRC / go
+        missing (the host sees a sequence gap).
+
+        """
+
+        if self.opt.binary:
+            self.seq += 1
+            frame = bytearray(link.encode_shot(self.seq, self.ticks_ms(), x, y))
+            if self.rng.random() < 0.5:
+                return b""              # lost on the wire
+            frame[self.rng.randrange(5, len(frame) - 2)] ^= 0xFF
+            return bytes(frame)
+        return self.rng.choice([
+            f"X: {x} # Y:\n",
+            f"X: # Y: {y}\n",
+            f"X: {x}a # Y: {y}\n",
+            f"X: {x}\n",                # cut off mid-line
+        ]).encode()
+
+    #  CALIBRATION (calib.py)
+
+    def finish_calib(self):
+        self.script = None
+        if not self.blobs:
+            self.print("No valid blobs detected during calibration")
+            self.print("Error running calib.py : No valid blobs detected during calibration.")
+            return
+        j = self.opt.blob_jitter
+        points = [(x + round(self.rng.gauss(0, j)), y + round(self.rng.gauss(0, j))) if j else (x, y)
+                  for x, y in self.blobs]
+        self.print("\nAveraged Blob Coordinates:")
+        for i, (x, y) in enumerate(points):
+            self.print(f"Blob {i+1}: X={x}, Y={y}")
+        xs, ys = [x for x, _ in points], [y for _, y in points]
+        self.print(f"ROI: {(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))}\n")
+        self.print("File written.")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Emulated OpenMV laser camera on a pseudo-terminal")
+    parser.add_argument("--rate", type=float, default=2.0, help="shots per second while detecting")
+    parser.add_argument("--poisson", action="store_true", help="random (exponential) gaps between shots")
+    parser.add_argument("--jitter", type=float, default=0.0, help="sd of the gap between shots (ms)")
+    parser.add_argument("--dist", choices=("normal", "uniform"), default="normal",
+                        help="normal around --aim, or uniform over the ROI")
+    parser.add_argument("--aim", type=float, nargs=2, metavar=("X", "Y"), help="camera px (default: ROI centre)")
+    parser.add_argument("--spread", type=float, default=10.0, help="aim sd in camera px")
+    parser.add_argument("--malformed", type=float, default=0.0, help="share of broken shot lines / frames")
+    parser.add_argument("--text", dest="binary", action="store_false", help="legacy 'X: # Y:' lines, no frames")
+    parser.add_argument("--blob-jitter", type=float, default=0.0, help="sd of the calibration blobs (camera px)")
+    parser.add_argument("--speedup", type=float, default=1.0, help="calibration runs this much faster")
+    parser.add_argument("--coords", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "coords.txt"))
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--duration", type=float, help="stop after this many seconds")
+    return parser.parse_args(argv)
+
+
+#  MAIN
+
+def main(argv):
+    options = parse_args(argv)
+    master, slave, path = open_pty()
+    print(f"Camera on {path}  (in Game.py: port {path})")
+    cam = Camera(master, options)
+    t0 = time.perf_counter()
+    try:
+        cam.run(options.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(master)
+        os.close(slave)
+    elapsed = time.perf_counter() - t0
+    s = cam.stats
+    print(f"\n{s['shots']:,} shots ({s['malformed']:,} malformed), {s['lines']:,} lines, "
+          f"{s['commands']:,} commands in {elapsed:.1f} s")
+    print(f"overruns {s['overruns']:,}, max late {1000 * s['max_late']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
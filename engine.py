@@ -0,0 +1,513 @@
+#  ENGINE — the game rules, without a window
+#
+#  An Engine plays one game of any mode: scoring, round counting,
+#  missed appearances, hiding / moving the target, the glide path,
+#  endurance ammo and the multi-target field. It never looks at a
+#  clock or a screen: time only moves when the caller passes it in
+#  (start / shot / advance, in seconds), and positions are drawn from
+#  its own random.Random. The same rules, seed and input events always
+#  give the same game, at whatever speed they are fed.
+#
+#  Every call returns the events it caused (and hands them to the
+#  subscribers); Game.py draws them, simulations and benchmarks just
+#  read the state afterwards.
+#
+#      ("start", mode)               game started
+#      ("show", x, y)                target shown at (x, y)
+#      ("hide",)                     target hidden
+#      ("move", x, y)                target (with its hit markers) moved to (x, y)
+#      ("hit", x, y, pts, marker)    shot scored; marker = (dx, dy) on the target
+#                                    group, None = no marker on it
+#      ("miss", x, y)                shot missed (marker at x, y)
+#      ("mark", x, y)                marker at x, y for a hit without a target group (mode 7)
+#      ("ammo", fired, left)         shot number `fired` used up; `left` shots remain
+#      ("missed", n)                 mode 3: an appearance passed without a shot (segment n)
+#      ("spawn", target)             mode 7: targets.Target put up
+#      ("remove", target)            mode 7: target shot or expired
+#      ("end", score)                game over
+
+import math
+import bisect
+import random
+from collections import deque
+
+import numpy as np
+
+import gameclock
+import targets
+
+
+def ring_score(r, ring_step, points):
+    # Points for a shot at distance r from the centre (0 outside the target)
+    if r >= ring_step * len(points):
+        return 0
+    ring = max(1, math.ceil(r / ring_step))     # 1 = centre ring
+    return points[len(points) - ring]
+
+
+def ring_scores(r, ring_step, points):
+    # ring_score for an array of distances (simulate.py)
+    r = np.asarray(r, dtype=float)
+    rings = len(points)
+    ring = np.maximum(1, np.ceil(r / ring_step)).astype(int)
+    table = np.asarray(points)[np.clip(rings - ring, 0, rings - 1)]
+    return np.where(r < ring_step * rings, table, 0)
+
+
+def spline_point(points, u):
+    # Catmull-Rom point at u (0..1) between points[1] and points[2]
+    (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points
+    u2, u3 = u * u, u * u * u
+    def spline(p0, p1, p2, p3):
+        return 0.5 * (2 * p1 + (p2 - p0) * u + (2 * p0 - 5 * p1 + 4 * p2 - p3) * u2
+                      + (3 * p1 - p0 - 3 * p2 + p3) * u3)
+    return spline(x0, x1, x2, x3), spline(y0, y1, y2, y3)
+
+
+class Rules:
+    """
+    Settings of one game (Game.py builds them from its configuration,
+    see game_rules). Times are in ms like there; `mask` is the
+    masks.Mask scored in mode 8.
+
+    """
+
+    __slots__ = (
+        "mode", "rounds", "ring_step", "points", "width", "height", "center", "battery_height",
+        "hide_grace", "hard_hide_time", "hard_move_interval",
+        "medium_hide_range", "medium_show_range", "medium_show_extra",
+        "tick_rate", "glide_speed", "glide_duration", "endurance_time", "endurance_shots",
+        "multi_count", "multi_time", "multi_lifetime", "multi_kinds", "multi_cell", "mask",
+    )
+
+    def __init__(self, **settings):
+        missing = set(self.__slots__) - set(settings)
+        unknown = set(settings) - set(self.__slots__)
+        if missing or unknown:
+            raise TypeError(f"rules: missing {sorted(missing)}, unknown {sorted(unknown)}")
+        for name, value in settings.items():
+            setattr(self, name, value)
+
+    def replace(self, **changes):
+        # Copy with some settings changed
+        settings = {name: getattr(self, name) for name in self.__slots__}
+        settings.update(changes)
+        return Rules(**settings)
+
+
+class Glide:
+    # Mode 4 path: Catmull-Rom segment points[1] → points[2] with its arc-length table
+    __slots__ = ("points", "table", "s", "next", "dt")
+
+    def __init__(self, points, start, dt):
+        self.points = points
+        self.table = None
+        self.s = 0.0                # px travelled on the current segment
+        self.next = start + dt      # time of the next fixed step
+        self.dt = dt
+
+
+class Engine:
+    """
+    One game under `rules`. Call start() when the camera starts
+    detecting, shot() per detected shot (screen coordinates) and
+    advance() whenever time passes; next_due() tells when the engine
+    next has something to do by itself.
+
+    """
+
+    __slots__ = (
+        "rules", "rng", "now", "clock", "listeners", "out",
+        "running", "over", "score", "shots", "buffer", "fired", "round_count", "missed", "grey",
+        "visible", "last_hide", "center", "free", "hide_time", "move_interval", "move_timer",
+        "glide", "trail", "steps", "timers_run", "field", "expiry",
+    )
+
+    def __init__(self, rules, seed=None, now=0.0):
+        self.rules = rules
+        self.rng = random.Random(seed)
+        self.now = now
+        self.clock = gameclock.GameClock(now=lambda: self.now)
+        self.listeners = []
+        self.out = []               # Events of the current call
+
+        self.running = False        # Started and not over
+        self.over = False
+        self.score = 0
+        self.shots = 0              # Hits (= rows used in buffer)
+        self.buffer = np.zeros((1024, 3))   # Per hit: x, y relative to the target centre, points
+        self.fired = 0              # Shots taken (battery segments used)
+        self.round_count = 0        # Mode 3: appearances (other modes: shots)
+        self.missed = 0             # Missed shots + appearances without a shot
+        self.grey = 0               # Next battery segment to grey out (mode 3)
+
+        self.visible = True
+        self.last_hide = -math.inf  # When the target was last hidden
+        self.center = rules.center
+        self.free = True            # Mode 3: no shot yet at this appearance
+        self.hide_time = rules.hard_hide_time
+        self.move_interval = rules.hard_move_interval
+        self.move_timer = None
+
+        self.glide = None
+        self.trail = deque(maxlen=240)  # (time, x, y) of recent glide positions
+        self.steps = 0              # Glide steps taken by the last advance
+        self.timers_run = []        # (name, due) of the timers run by the last advance
+        self.field = None           # targets.TargetField (mode 7)
+        self.expiry = {}            # target id → clock id of its expiry
+
+    #  INPUT
+
+    def subscribe(self, fn):
+        # fn(event) is called for every event, in order
+        self.listeners.append(fn)
+
+    def start(self, t):
+        # The camera started detecting at time t
+        self._advance(t)
+        r = self.rules
+        self.running = True
+        self._emit("start", r.mode)
+
+        if r.mode == 3:
+            self.hide_time, self.move_interval = r.hard_hide_time, r.hard_move_interval
+        elif r.mode == 2:
+            self.hide_time = self.rng.randint(*r.medium_hide_range)
+            self.move_interval = self.hide_time + self.rng.randint(*r.medium_show_range) + r.medium_show_extra
+
+        if r.mode in (2, 3):
+            self.move_timer = self._timer(0, self._auto_move, "move", self.move_interval)
+        elif r.mode == 4:
+            self._start_glide()
+        elif r.mode == 6:
+            self._timer(r.endurance_time, self._finish, "endurance")
+        elif r.mode == 7:
+            self._start_multi()
+
+        self._advance(t)            # timers due right away
+        return self._flush()
+
+    def shot(self, t, x, y, shot_at=None):
+        """
+        A shot at screen (x, y), detected at time t. `shot_at` is when
+        it was fired (camera clock mapped to ours); visibility and the
+        glide position are judged at that moment.
+
+        """
+
+        self._advance(t)
+        r = self.rules
+        when = t if shot_at is None else shot_at
+
+        # Mode 3 uses "free" to prevent double-scoring
+        if not self.free or r.mode != 3:
+            self.round_count += 1
+
+        if self.over or self.missed + self.shots >= self.shot_limit() + 1:
+            return self._flush()
+
+        if r.mode == 7 and self.field is not None:
+            self._multi_hit(x, y)
+        else:
+            center = self._glide_at(when) if self.glide is not None else self.center
+            self._hit(x, y, center, when)
+        self.free = False
+        self._emit("ammo", self.fired, self.shots_left())
+
+        if r.mode in (4, 6, 7) and self.running and self.missed + self.shots >= self.shot_limit():
+            self._finish()
+        return self._flush()
+
+    def advance(self, t):
+        # Lets time pass until t: timers and the glide path run in order
+        self._advance(t)
+        return self._flush()
+
+    def end(self, t):
+        # Ends the game at time t (the caller's decision, e.g. modes 1, 2, 8)
+        self._advance(t)
+        self._finish()
+        return self._flush()
+
+    #  STATE
+
+    def next_due(self):
+        # Time at which the engine has something to do (None = nothing scheduled)
+        due = self.clock.next_due()
+        if self.glide is not None and (due is None or self.glide.next < due):
+            return self.glide.next
+        return due
+
+    def shot_limit(self):
+        # Shots per game: one per battery segment, or the endurance ammo
+        return self.rules.endurance_shots if self.rules.mode == 6 else self.rules.rounds
+
+    def shots_left(self):
+        if self.rules.mode == 6:
+            return max(0, self.rules.endurance_shots - self.shots - self.missed)
+        return self.rules.rounds - self.fired
+
+    def positions(self, center=None):
+        # Screen coordinates of all hits with the target at `center` (default: where it is now)
+        return self.buffer[:self.shots, :2] + (center or self.center)
+
+    def summary(self):
+        # (hits, total points, mean distance from the centre) of the stored hits
+        hits = self.buffer[:self.shots]
+        if not self.shots:
+            return 0, 0, 0.0
+        return self.shots, int(hits[:, 2].sum()), float(np.hypot(hits[:, 0], hits[:, 1]).mean())
+
+    def snapshot(self):
+        # The state a view or a test needs, as plain values
+        return {
+            "mode": self.rules.mode, "running": self.running, "over": self.over,
+            "score": self.score, "shots": self.shots, "fired": self.fired, "missed": self.missed,
+            "rounds": self.round_count, "visible": self.visible, "center": self.center,
+            "targets": len(self.field) if self.field is not None else 0,
+        }
+
+    #  INTERNALS
+
+    def _emit(self, *event):
+        self.out.append(event)
+
+    def _flush(self):
+        events, self.out = self.out, []
+        for fn in self.listeners:
+            for event in events:
+                fn(event)
+        return events
+
+    def _timer(self, delay_ms, fn, name, interval_ms=None):
+        return self.clock.schedule(delay_ms / 1000, fn, name, group="game",
+                                   interval=None if interval_ms is None else interval_ms / 1000)
+
+    def _advance(self, t):
+        # Runs every timer due up to t at its own due time (nothing is skipped)
+        self.steps = 0
+        self.timers_run = []
+        while True:
+            due = self.clock.next_due()
+            if due is None or due > t:
+                break
+            self._glide_to(due)
+            self.now = due
+            self.clock.run_due()
+            self.timers_run += self.clock.ran
+        self._glide_to(t)
+        if t > self.now:
+            self.now = t
+
+    def _finish(self):
+        # All shots taken, time up or appearances done
+        if self.over:
+            return
+        self.over = True
+        self.running = False
+        self.glide = None
+        self.clock.cancel_group("game")
+        if self.field is not None:
+            for t in list(self.field.targets.values()):
+                self.field.remove(t.id)
+                self._emit("remove", t)
+            self.expiry.clear()
+        self._emit("end", self.score)
+
+    def _random_position(self):
+        # Random centre that keeps the whole target on screen
+        r = self.rules
+        margin = r.ring_step * len(r.points)
+        return (self.rng.randint(60 + margin, r.width - 60 - margin),
+                self.rng.randint(60 + margin, r.height - 140 - margin))
+
+    #  HITS
+
+    def _hit(self, x, y, center, when):
+        # Scores a shot against the target centred on `center`
+        r = self.rules
+        cx, cy = center
+        if r.mask is not None:
+            pts = r.mask.score(x - cx, y - cy)
+            outside = pts == 0
+        else:
+            d = math.hypot(x - cx, y - cy)
+            pts = ring_score(d, r.ring_step, r.points)
+            outside = d >= r.ring_step * len(r.points)
+        self.fired += 1
+
+        # Miss: off the target, or the target was hidden (after a short grace)
+        if outside or (not self.visible and when - self.last_hide > r.hide_grace):
+            self.missed += 1
+            self._emit("miss", x, y)
+            return
+
+        self.score += pts
+        self._record(x - cx, y - cy, pts)
+        # The marker sits on the spot it hit; none if the target was just hidden
+        marker = None if when - self.last_hide < r.hide_grace else (x - cx, y - cy)
+        self._emit("hit", x, y, pts, marker)
+
+    def _record(self, dx, dy, pts):
+        if self.shots == len(self.buffer):
+            self.buffer = np.concatenate((self.buffer, np.zeros_like(self.buffer)))
+        self.buffer[self.shots] = dx, dy, pts
+        self.shots += 1
+
+    #  APPEARANCES (modes 2 & 3)
+
+    def _auto_move(self):
+        # One hide / move step, every move_interval
+        if not self.running:
+            self.clock.cancel(self.move_timer)
+            return
+        if self.round_count >= self.rules.rounds and self.rules.mode == 3:
+            self.clock.cancel(self.move_timer)
+            self._hide()
+            self._finish()
+            return
+        self._hide()
+        self._timer(self.hide_time, self._move_and_show, "show")
+
+    def _hide(self):
+        self.visible = False
+        self.last_hide = self.now
+        if self.rules.mode == 3 and self.running:
+            self.round_count += 1
+            self._timer(200, self._check_missed, "check_missed")
+        self._emit("hide")
+
+    def _check_missed(self):
+        # Mode 3: the appearance that just ended got no shot
+        if self.shots < self.round_count and self.shots + self.missed < self.round_count:
+            self.missed += 1
+            if self.missed <= self.rules.rounds:
+                self._emit("missed", self.grey)
+                self.grey += 1
+
+    def _move_and_show(self):
+        if self.round_count <= self.rules.rounds:
+            self.center = self._random_position()
+            self._emit("move", *self.center)
+        self.visible = True
+        self.free = True
+        self._emit("show", *self.center)
+
+    #  GLIDING TARGET (mode 4)
+    #
+    #  The path advances in fixed 1/tick_rate steps, so it is the same
+    #  however often the caller advances. The position after each
+    #  advance is kept briefly, and shots are scored against the
+    #  position at the moment they were fired.
+
+    def _start_glide(self):
+        r = self.rules
+        start = self.center
+        self.glide = Glide([start, start, self._random_position(), self._random_position()],
+                           self.now, 1 / r.tick_rate)
+        self._glide_segment()
+        self.trail.clear()
+        self.trail.append((self.now, *start))
+        self._timer(r.glide_duration, self._finish, "glide")
+
+    def _glide_segment(self, samples=32):
+        # Arc-length table of the current segment, so the target moves at constant speed
+        pts = self.glide.points
+        table = [0.0]
+        prev = spline_point(pts, 0.0)
+        for k in range(1, samples + 1):
+            cur = spline_point(pts, k / samples)
+            table.append(table[-1] + math.dist(prev, cur))
+            prev = cur
+        self.glide.table = table
+
+    def _glide_to(self, t):
+        # Steps the path up to t and moves the target to where it is then
+        g = self.glide
+        if g is None or g.next > t:
+            return
+        speed = self.rules.glide_speed
+        while g.next <= t:
+            g.s += speed * g.dt
+            while g.s >= g.table[-1]:
+                g.s -= g.table[-1]
+                g.points.pop(0)
+                g.points.append(self._random_position())
+                self._glide_segment()
+            g.next += g.dt
+            self.steps += 1
+        self.center = self._glide_position()
+        self.trail.append((g.next - g.dt, *self.center))
+        self._emit("move", *self.center)
+
+    def _glide_position(self):
+        # Point of the path at the travelled distance
+        g = self.glide
+        table = g.table
+        k = max(1, bisect.bisect_left(table, g.s))
+        span = table[k] - table[k - 1]
+        f = (g.s - table[k - 1]) / span if span else 0.0
+        return spline_point(g.points, (k - 1 + f) / (len(table) - 1))
+
+    def _glide_at(self, t):
+        # Target centre at time t (linear between the kept positions)
+        trail = self.trail
+        if not trail:
+            return self.center
+        if t >= trail[-1][0]:
+            return trail[-1][1:]
+        later = trail[-1]
+        for entry in reversed(trail):
+            if entry[0] <= t:
+                t0, x0, y0 = entry
+                t1, x1, y1 = later
+                f = (t - t0) / (t1 - t0) if t1 > t0 else 0.0
+                return x0 + (x1 - x0) * f, y0 + (y1 - y0) * f
+            later = entry
+        return trail[0][1:]
+
+    #  MULTIPLE TARGETS (mode 7)
+
+    def _start_multi(self):
+        r = self.rules
+        self.field = targets.TargetField(r.width, r.height, r.multi_cell)
+        self.expiry.clear()
+        for _ in range(r.multi_count):
+            self._spawn()
+        self._timer(r.multi_time, self._finish, "multi")
+
+    def _spawn(self):
+        # Puts up one random target at a random spot (kept off the battery row)
+        r = self.rules
+        ring, pts = self.rng.choice(r.multi_kinds)
+        radius = ring * len(pts)
+        x = self.rng.randint(60 + radius, r.width - 60 - radius)
+        y = self.rng.randint(60 + radius, r.height - 140 - r.battery_height - radius)
+        t = self.field.add(x, y, ring, pts)
+        self._emit("spawn", t)
+        self.expiry[t.id] = self._timer(self.rng.randint(*r.multi_lifetime),
+                                        lambda: self._replace(t.id), "expire")
+
+    def _replace(self, tid):
+        # Takes a target down (shot or expired) and puts up a new one
+        t = self.field.remove(tid) if self.field is not None else None
+        if t is None:
+            return
+        self.clock.cancel(self.expiry.pop(tid, None))
+        self._emit("remove", t)
+        if self.running:
+            self._spawn()
+
+    def _multi_hit(self, x, y):
+        # The grid index finds the target under the shot
+        self.fired += 1
+        t, pts = self.field.hit(x, y)
+        if t is None:
+            self.missed += 1
+            self._emit("miss", x, y)
+            return
+        self.score += pts
+        self._record(x - t.x, y - t.y, pts)
+        self._emit("mark", x, y)
+        self._emit("hit", x, y, pts, None)
+        self._replace(t.id)
@@ -0,0 +1,143 @@
+#  GAME CLOCK — one monotonic scheduler for all game timers
+#
+#  Timers are kept in a heap ordered by their due time on
+#  time.perf_counter(). The owner drives the clock from a single
+#  callback (Game.py: one pending root.after, re-armed for the earliest
+#  timer). Periodic timers and timers scheduled relative to another
+#  timer's due time (`anchor`) stay on their grid, so a late callback
+#  does not push everything after it back. Every run records how late
+#  it was, per timer name.
+
+import heapq
+import itertools
+import math
+import time
+
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)    # ms upper bounds, last bucket is open ended
+
+
+class GameClock:
+    """
+    Heap of timers [due, interval, fn, name, group] keyed by id.
+    Cancelled timers are dropped from the heap lazily.
+
+    """
+
+    def __init__(self, now=time.perf_counter):
+        self.now = now
+        self.heap = []          # (due, id)
+        self.timers = {}        # id → [due, interval, fn, name, group]
+        self.ids = itertools.count(1)
+        self.due = None         # Due time of the timer currently running
+        self.ran = []           # (name, due) of the timers the last run_due ran
+        self.latency = {}       # name → {"count", "sum", "max", "buckets", "skipped"}
+
+    #  SCHEDULING
+
+    def schedule(self, delay, fn, name="timer", group=None, anchor=None, interval=None):
+        """
+        Runs `fn` `delay` seconds after `anchor` (default: now), then
+        every `interval` seconds if given. Returns the timer id.
+
+        """
+
+        due = (self.now() if anchor is None else anchor) + delay
+        tid = next(self.ids)
+        self.timers[tid] = [due, interval, fn, name, group]
+        heapq.heappush(self.heap, (due, tid))
+        return tid
+
+    def cancel(self, tid):
+        self.timers.pop(tid, None)
+
+    def cancel_group(self, group):
+        # Cancels every timer of `group` (e.g. all timers of one game)
+        for tid in [t for t, timer in self.timers.items() if timer[4] == group]:
+            del self.timers[tid]
+
+    def next_due(self):
+        # Due time of the earliest live timer (None when idle)
+        heap = self.heap
+        while heap and (heap[0][1] not in self.timers or self.timers[heap[0][1]][0] != heap[0][0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    #  RUNNING
+
+    def run_due(self):
+        """
+        Runs every timer that is due and returns how many ran.
+        Periodic timers are re-queued on their original grid; periods
+        that were missed completely are skipped (and counted).
+
+        """
+
+        now = self.now()
+        ran = 0
+        self.ran = []
+        while True:
+            due = self.next_due()
+            if due is None or due > now:
+                return ran
+            _, tid = heapq.heappop(self.heap)
+            timer = self.timers[tid]
+            _, interval, fn, name, _ = timer
+
+            skipped = 0
+            if interval is None:
+                del self.timers[tid]
+            else:
+                nxt = due + interval
+                if nxt <= now:
+                    skipped = math.ceil((now - nxt) / interval + 1e-9)
+                    nxt += skipped * interval
+                timer[0] = nxt
+                heapq.heappush(self.heap, (nxt, tid))
+
+            self.record(name, now - due, skipped)
+            self.ran.append((name, due))
+            self.due = due
+            try:
+                fn()
+            except Exception as e:
+                print(f"Timer '{name}' failed: {e}")
+            finally:
+                self.due = None
+            ran += 1
+
+    #  STATISTICS
+
+    def record(self, name, late, skipped=0):
+        stats = self.latency.get(name)
+        if stats is None:
+            stats = self.latency[name] = {"count": 0, "sum": 0.0, "max": 0.0,
+                                          "buckets": [0] * (len(LATENCY_BUCKETS) + 1), "skipped": 0}
+        stats["count"] += 1
+        stats["sum"] += late
+        stats["max"] = max(stats["max"], late)
+        stats["skipped"] += skipped
+        ms = late * 1000
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if ms < bound:
+                stats["buckets"][i] += 1
+                break
+        else:
+            stats["buckets"][-1] += 1
+
+    def report(self):
+        """
+        Returns one text line per timer name: runs, average / worst
+        lateness and the lateness histogram.
+
+        """
+
+        labels = [f"<{b}" for b in LATENCY_BUCKETS] + [f">={LATENCY_BUCKETS[-1]}"]
+        lines = []
+        for name, s in sorted(self.latency.items()):
+            hist = " ".join(f"{label}:{n}" for label, n in zip(labels, s["buckets"]) if n)
+            line = (f"{name:<12}: {s['count']} runs, late avg {1000 * s['sum'] / s['count']:.2f} ms, "
+                    f"max {1000 * s['max']:.2f} ms | {hist}")
+            if s["skipped"]:
+                line += f" | {s['skipped']} period(s) skipped"
+            lines.append(line)
+        return lines
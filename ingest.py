@@ -0,0 +1,284 @@
+#  INGEST — camera link in a separate process
+#
+#  The ingest process owns the serial port. It runs the same reader as
+#  Game.py (link decoding, parse_line, timestamps) and maps every shot
+#  to screen coordinates. Then it publishes fixed-size records into a
+#  shared-memory ring buffer. The UI process reads the ring without
+#  locks, so a slow repaint or a GC pause in the UI never delays when a
+#  hit is stamped.
+#
+#  Ring: a header (records written, slots) followed by `slots` records.
+#  The writer clears a record's sequence number, writes the payload,
+#  then stores the sequence number and bumps the write count. A reader
+#  accepts a record only if its sequence number is the expected one
+#  both before and after reading the payload; otherwise the writer has
+#  lapped it and the record counts as dropped.
+
+import struct
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+
+HEADER = struct.Struct("<QQ")           # records written, slots
+SEQ = struct.Struct("<Q")               # 1-based record number, 0 = being written
+PAYLOAD = struct.Struct("<B7xdddd96s")  # kind, stamp, a, b, c, text
+RECORD = SEQ.size + PAYLOAD.size
+
+KINDS = ("start", "shot", "hit", "text", "error")
+KIND_IDS = {kind: i for i, kind in enumerate(KINDS)}
+
+
+class Ring:
+    """
+    Single-producer / single-consumer ring of event records in shared
+    memory. Created by the UI (name=None), attached to by name in the
+    ingest process.
+
+    """
+
+    def __init__(self, name=None, slots=4096):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=HEADER.size + slots * RECORD)
+            HEADER.pack_into(self.shm.buf, 0, 0, slots)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.written, self.slots = HEADER.unpack_from(self.shm.buf, 0)
+        self.read = self.written        # Consumer cursor
+        self.dropped = 0                # Records the consumer lost to overruns
+
+    #  WRITER (ingest process)
+
+    def put(self, kind, stamp, a=0.0, b=0.0, c=0.0, text=""):
+        buf = self.shm.buf
+        n = self.written
+        off = HEADER.size + (n % self.slots) * RECORD
+        SEQ.pack_into(buf, off, 0)
+        PAYLOAD.pack_into(buf, off + SEQ.size, KIND_IDS[kind], stamp, a, b, c,
+                          text.encode("utf-8", "replace")[:96])
+        SEQ.pack_into(buf, off, n + 1)
+        self.written = n + 1
+        HEADER.pack_into(buf, 0, n + 1, self.slots)
+
+    #  READER (UI process)
+
+    def get(self):
+        """
+        Returns the records written since the last call as event
+        tuples in Game.py's format: (kind, stamp, *data).
+
+        """
+
+        buf = self.shm.buf
+        written = HEADER.unpack_from(buf, 0)[0]
+        if written - self.read > self.slots:
+            self.dropped += written - self.read - self.slots
+            self.read = written - self.slots
+
+        out = []
+        while self.read < written:
+            off = HEADER.size + (self.read % self.slots) * RECORD
+            expected = self.read + 1
+            self.read = expected
+            if SEQ.unpack_from(buf, off)[0] != expected:
+                self.dropped += 1
+                continue
+            kind, stamp, a, b, c, text = PAYLOAD.unpack_from(buf, off + SEQ.size)
+            if SEQ.unpack_from(buf, off)[0] != expected:
+                self.dropped += 1
+                continue
+            kind = KINDS[kind]
+            if kind in ("shot", "hit"):
+                out.append((kind, stamp, a, b, c))
+            elif kind == "start":
+                out.append((kind, stamp))
+            else:
+                out.append((kind, stamp, text.rstrip(b"\0").decode("utf-8", "replace")))
+        return out
+
+    def unread(self):
+        return HEADER.unpack_from(self.shm.buf, 0)[0] - self.read
+
+    def close(self, unlink=False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+#  INGEST PROCESS
+
+class RingWriter:
+    """
+    Stands in for the reader's event queue in the ingest process:
+    maps shots to screen coordinates ("hit") once a matrix is known
+    and writes every event into the ring.
+
+    """
+
+    def __init__(self, ring, game):
+        self.ring = ring
+        self.game = game
+        self.matrix = None
+        self.transform_type = None
+
+    def set_matrix(self, matrix, transform_type):
+        # New calibration: the LUT is built here too, else correct_coords
+        # falls back to projecting every shot on its own
+        self.matrix, self.transform_type = matrix, transform_type
+        if matrix is not None:
+            self.game.build_lut(matrix)
+
+    def put(self, event):
+        kind, stamp, *data = event
+        if kind == "shot":
+            x, y = data[:2]
+            shot_at = data[2] if len(data) > 2 else stamp
+            if self.matrix is not None:
+                x, y = self.game.correct_coords(x, y, self.matrix, self.transform_type)
+                kind = "hit"
+            self.ring.put(kind, stamp, float(x), float(y), shot_at)
+        elif kind == "start":
+            self.ring.put(kind, stamp)
+        else:
+            self.ring.put(kind, stamp, text=data[0])
+
+
+class AckRelay:
+    """
+    Ack table of the reader in the ingest process: each ack is sent
+    to the UI, which holds the real waiters.
+
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def get(self, req_id):
+        waiter = [None, None]
+        waiter[0] = AckSender(self.conn, req_id, waiter)
+        return waiter
+
+
+class AckSender:
+    def __init__(self, conn, req_id, waiter):
+        self.conn, self.req_id, self.waiter = conn, req_id, waiter
+
+    def set(self):
+        self.conn.send(("ack", self.req_id, self.waiter[1]))
+
+
+def run(ring_name, port_name, baud, conn, matrix=None, transform_type=None):
+    """
+    Body of the ingest process: opens the port, runs Game.serial_reader
+    on it in a thread and handles the UI's messages on `conn`:
+    ("write", bytes), ("matrix", matrix, transform_type), ("stop",).
+
+    """
+
+    import time
+    from collections import deque
+
+    import serial
+    import Game
+
+    ring = Ring(ring_name)
+    writer = RingWriter(ring, Game)
+    writer.set_matrix(matrix, transform_type)
+
+    try:
+        port = serial.serial_for_url(port_name, baud, timeout=0.1)
+    except (serial.SerialException, ValueError) as e:
+        ring.put("error", time.perf_counter(), text=f"Serial error: {e}")
+        ring.close()
+        return
+
+    stop = threading.Event()
+    reader = threading.Thread(
+        target=Game.serial_reader,
+        args=(port, stop, writer, AckRelay(conn), deque(maxlen=64), Game.link.FrameDecoder()),
+        name="serial-reader", daemon=True
+    )
+    reader.start()
+
+    try:
+        while reader.is_alive():
+            if not conn.poll(0.1):
+                continue
+            msg = conn.recv()
+            if msg[0] == "write":
+                port.write(msg[1])
+            elif msg[0] == "matrix":
+                writer.set_matrix(msg[1], msg[2])
+            elif msg[0] == "stop":
+                break
+    except (EOFError, OSError, serial.SerialException):
+        pass                    # UI went away / port failed: shut down
+    finally:
+        stop.set()
+        reader.join(timeout=1)
+        port.close()
+        ring.close()
+
+
+class IngestProcess:
+    """
+    UI-side handle of one ingest process: owns the ring, forwards
+    commands and matrices, and sets the UI's ack waiters (`acks`, the
+    pending_acks table) from a small listener thread.
+
+    """
+
+    def __init__(self, port, baud, acks, slots=4096, matrix=None, transform_type=None):
+        self.ring = Ring(slots=slots)
+        self.acks = acks
+        self.matrix = matrix
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=run, args=(self.ring.name, port, baud, child, matrix, transform_type),
+            name="ingest", daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.listener = threading.Thread(target=self._listen, name="ingest-acks", daemon=True)
+        self.listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                _, req_id, status = self.conn.recv()
+            except (EOFError, OSError):
+                return
+            waiter = self.acks.get(req_id)
+            if waiter:
+                waiter[1] = status
+                waiter[0].set()
+
+    def alive(self):
+        return self.process.is_alive()
+
+    def poll(self):
+        # New events from the ring
+        return self.ring.get()
+
+    def send(self, data):
+        # Bytes for the camera (the ingest process owns the port)
+        self.conn.send(("write", data))
+
+    def set_matrix(self, matrix, transform_type):
+        # From now on shots arrive as screen coordinates ("hit")
+        self.matrix = matrix
+        try:
+            self.conn.send(("matrix", matrix, transform_type))
+        except (OSError, ValueError):
+            pass                # process ended; its error is in the ring
+
+    def stop(self):
+        try:
+            self.conn.send(("stop",))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        self.ring.close(unlink=True)
@@ -0,0 +1,142 @@
+#  LANES — several cameras / screens driven from one host process
+#
+#  Game.py keeps the game it runs in module globals. A lane owns its own
+#  copy of the per-lane globals (serial link, calibration, window, game
+#  state, statistics). Before a lane's code runs, the LaneSet swaps its
+#  values into the module, and it swaps them back out afterwards. All
+#  lanes share the one Tk event loop: every window is wrapped so that
+#  its callbacks (after / after_idle / bind) run with their own lane
+#  swapped in. A switch costs the same however many lanes exist; work
+#  for several lanes goes through `each`, which swaps only the lanes it
+#  is given, straight from one to the next.
+
+import time
+import operator
+
+
+class Lane:
+    """
+    One camera + screen: `state` holds the lane's values of the
+    per-lane globals (in LaneSet.names order) while another lane is
+    active.
+
+    """
+
+    def __init__(self, number, state):
+        self.number = number
+        self.state = state
+        self.switches = 0       # Times this lane was swapped in
+        self.switch_time = 0.0  # Time spent swapping it in / out (s)
+
+
+class LaneWindow:
+    """
+    A lane's Tk window (Tk or Toplevel). Behaves like the window;
+    callbacks registered through it run in the lane.
+
+    """
+
+    def __init__(self, lanes, lane, window):
+        self.lanes = lanes
+        self.lane = lane
+        self.window = window
+
+    def after(self, ms, fn=None, *args):
+        if fn is None:
+            return self.window.after(ms)
+        return self.window.after(ms, self.lanes.bind(self.lane, fn), *args)
+
+    def after_idle(self, fn, *args):
+        return self.window.after_idle(self.lanes.bind(self.lane, fn), *args)
+
+    def bind(self, sequence=None, fn=None, add=None):
+        if fn is None:
+            return self.window.bind(sequence)
+        return self.window.bind(sequence, self.lanes.bind(self.lane, fn), add)
+
+    def __getattr__(self, name):
+        return getattr(self.window, name)
+
+
+class LaneSet:
+    """
+    The lanes of `module` that share the globals listed in `names`.
+    Exactly one lane is active (its values live in the module) at a
+    time; the console works on the active lane.
+
+    """
+
+    def __init__(self, module, names):
+        self.module = module
+        self.names = tuple(names)
+        missing = set(self.names) - set(module.__dict__)
+        if missing:
+            raise ValueError(f"{module.__name__} lacks per-lane globals {sorted(missing)}")
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.grab = operator.itemgetter(*self.names)
+        self.lanes = []
+        # The module's current state becomes lane 1
+        first = Lane(1, None)   # its values live in the module
+        self.lanes.append(first)
+        self.active = first
+
+    def add(self, state):
+        # New lane with `state` (name → value for every name in `names`)
+        missing = set(self.names) - set(state)
+        if missing:
+            raise ValueError(f"lane state lacks {sorted(missing)}")
+        lane = Lane(len(self.lanes) + 1, tuple(state[name] for name in self.names))
+        self.lanes.append(lane)
+        return lane
+
+    def get(self, number):
+        if 1 <= number <= len(self.lanes):
+            return self.lanes[number - 1]
+        return None
+
+    def activate(self, lane):
+        # Swaps the active lane out of the module and `lane` in
+        if lane is self.active:
+            return
+        t0 = time.perf_counter()
+        g = self.module.__dict__
+        old = self.active
+        old.state = self.grab(g)
+        g.update(zip(self.names, lane.state))
+        lane.state = None       # lives in the module now
+        self.active = lane
+        lane.switches += 1
+        elapsed = time.perf_counter() - t0
+        old.switch_time += elapsed / 2
+        lane.switch_time += elapsed / 2
+
+    def run(self, lane, fn, *args):
+        # Calls fn(*args) in `lane`, then returns to the lane that was active
+        previous = self.active
+        self.activate(lane)
+        try:
+            return fn(*args)
+        finally:
+            self.activate(previous)
+
+    def each(self, lanes, fn):
+        # Calls fn() in each of `lanes` in turn (one switch per lane), then returns to the active lane
+        previous = self.active
+        try:
+            for lane in lanes:
+                self.activate(lane)
+                fn()
+        finally:
+            self.activate(previous)
+
+    def bind(self, lane, fn):
+        # `fn` wrapped to run in `lane` (Tk callbacks)
+        def in_lane(*args):
+            return self.run(lane, fn, *args)
+        return in_lane
+
+    def value(self, lane, name):
+        # A lane's value of one per-lane global, without switching to it
+        if lane is self.active:
+            return self.module.__dict__[name]
+        return lane.state[self.index[name]]
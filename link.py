@@ -0,0 +1,263 @@
+#  LINK — binary wire format shared by camera and host
+#
+#  Used by detc.py / main.py on the OpenMV camera (MicroPython) and by
+#  Game.py on the PC (CPython), so only features both support are used.
+#  Shots travel camera → host, commands host → camera and acks back,
+#  all over the same USB VCP link.
+#
+#  Frame layout (little endian):
+#
+#      0xAA 0x55 | version | type | length | payload (length bytes) | crc16
+#
+#  The CRC (CRC-16/CCITT-FALSE) covers version..payload. Text lines may be
+#  interleaved with frames: 0xAA never occurs in ASCII text, so the decoder
+#  hands every newline-terminated run of ASCII back as a text line.
+
+import struct
+
+#  PROTOCOL CONSTANTS
+
+PROTO_VERSION = 1
+MAGIC = b"\xaa\x55"
+HEADER_SIZE = 5             # magic(2) + version + type + length
+CRC_SIZE = 2
+MAX_LINE = 4096             # Longest text line kept while waiting for "\n"
+
+FRAME_TEXT = 0x00           # Not on the wire: decoder tag for text lines
+FRAME_SHOT = 0x01           # Camera → host: detected laser hit
+FRAME_CMD = 0x02            # Host → camera: command (request id + text)
+FRAME_ACK = 0x03            # Camera → host: acknowledgement (request id + status)
+
+# Ack status codes
+ACK_OK = 0
+ACK_UNKNOWN = 1             # Command not known to the camera
+ACK_BUSY = 2                # Command not accepted in the current script
+ACK_NAMES = {ACK_OK: "ok", ACK_UNKNOWN: "unknown command", ACK_BUSY: "busy"}
+
+# Shot payload: seq, camera timestamp (ms), x, y, blob pixels, roundness*255
+SHOT_FMT = "<HIHHHB"
+SHOT_SIZE = struct.calcsize(SHOT_FMT)
+
+# Announced by the camera (as text) when it speaks the binary protocol.
+# Both ends keep their configured baud rate (the camera talks over USB).
+HELLO = "PROTO"             # e.g. "PROTO 1"
+
+
+#  CRC
+
+try:
+    from binascii import crc_hqx        # CPython: implemented in C
+
+    def crc16(data):
+        return crc_hqx(data, 0xFFFF)
+
+except ImportError:                     # MicroPython: table driven
+    _table = []
+    for _i in range(256):
+        _c = _i << 8
+        for _ in range(8):
+            _c = ((_c << 1) ^ 0x1021) if _c & 0x8000 else (_c << 1)
+        _table.append(_c & 0xFFFF)
+
+    def crc16(data):
+        crc = 0xFFFF
+        for b in data:
+            crc = ((crc << 8) & 0xFFFF) ^ _table[(crc >> 8) ^ b]
+        return crc
+
+
+#  ENCODING
+
+def encode_frame(ftype, payload):
+    """
+    Wraps `payload` (bytes, at most 255) into one frame.
+
+    """
+
+    body = bytes([PROTO_VERSION, ftype, len(payload)]) + payload
+    return MAGIC + body + struct.pack("<H", crc16(body))
+
+
+def encode_shot(seq, stamp_ms, x, y, pixels=0, roundness=0.0):
+    payload = struct.pack(
+        SHOT_FMT,
+        seq & 0xFFFF, stamp_ms & 0xFFFFFFFF,
+        x, y, min(pixels, 0xFFFF), int(roundness * 255) & 0xFF
+    )
+    return encode_frame(FRAME_SHOT, payload)
+
+
+def encode_command(req_id, cmd):
+    return encode_frame(FRAME_CMD, struct.pack("<H", req_id & 0xFFFF) + cmd.encode())
+
+
+def encode_ack(req_id, status=ACK_OK):
+    return encode_frame(FRAME_ACK, struct.pack("<HB", req_id & 0xFFFF, status))
+
+
+def hello_line():
+    return "%s %d" % (HELLO, PROTO_VERSION)
+
+
+def parse_hello(text):
+    """
+    Returns the protocol version of a hello line, None for anything
+    else. Older camera scripts append "BAUD <n>"; it is ignored.
+
+    """
+
+    parts = text.split()
+    if len(parts) not in (2, 4) or parts[0] != HELLO:
+        return None
+    try:
+        return int(parts[1])
+    except ValueError:
+        return None
+
+
+#  DECODING
+
+def decode_shot(payload):
+    # (seq, stamp_ms, x, y, pixels, roundness 0..1)
+    seq, stamp_ms, x, y, pixels, rnd = struct.unpack_from(SHOT_FMT, payload)
+    return seq, stamp_ms, x, y, pixels, rnd / 255
+
+
+def decode_command(payload):
+    # (req_id, command text)
+    req_id = struct.unpack_from("<H", payload)[0]
+    return req_id, bytes(payload[2:]).decode()
+
+
+def decode_ack(payload):
+    # (req_id, status)
+    return struct.unpack_from("<HB", payload)
+
+
+def poll_commands(vcp, decoder):
+    """
+    Camera side: returns the [(req_id, command), ...] waiting on `vcp`
+    (a pyb.USB_VCP) without blocking. Cheap enough to call every frame.
+
+    """
+
+    if vcp.any():
+        data = vcp.read()
+        if data:
+            decoder.feed(data)
+
+    cmds = []
+    for ftype, payload in decoder.parse():
+        if ftype == FRAME_CMD:
+            cmds.append(decode_command(payload))
+    return cmds
+
+
+def _find(buf, byte, start):
+    # bytearray.find is not available on every MicroPython port
+    try:
+        return buf.find(byte, start)
+    except AttributeError:
+        for i in range(start, len(buf)):
+            if buf[i] == byte[0]:
+                return i
+        return -1
+
+
+class FrameDecoder:
+    """
+    Incremental decoder for a byte stream mixing frames and text lines.
+
+    feed() appends raw bytes; parse() yields (FRAME_TEXT, line) for text
+    and (type, payload) for valid frames. Payloads are memoryviews into
+    the receive buffer (no copy) and are only valid until the next feed().
+    Corrupted frames are skipped and counted; the decoder resynchronises
+    on the next magic.
+
+    """
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.frames = 0         # Valid frames decoded
+        self.crc_errors = 0     # Frames rejected by CRC
+        self.bad_version = 0    # Frames from an unknown protocol version
+        self.dropped = 0        # Shots missing according to the sequence number
+        self.last_seq = None
+
+    def feed(self, data):
+        self.buf.extend(data)
+
+    def parse(self):
+        buf = self.buf
+        view = memoryview(buf)
+        n = len(buf)
+        pos = 0
+
+        while pos < n:
+            if buf[pos] == MAGIC[0]:
+                # Frame (or garbage starting with 0xAA)
+                if n - pos < 2:
+                    break
+                if buf[pos + 1] != MAGIC[1]:
+                    pos += 1
+                    continue
+                if n - pos < HEADER_SIZE:
+                    break
+                end = pos + HEADER_SIZE + buf[pos + 4] + CRC_SIZE
+                if end > n:
+                    break
+
+                crc = buf[end - 2] | (buf[end - 1] << 8)
+                if crc16(view[pos + 2:end - 2]) != crc:
+                    # Drop the damaged bytes up to the next frame or line
+                    self.crc_errors += 1
+                    nxt = [i for i in (_find(buf, MAGIC[:1], pos + 1),
+                                       _find(buf, b"\n", pos + 1)) if i != -1]
+                    pos = min(nxt) if nxt else n
+                    continue
+
+                if buf[pos + 2] != PROTO_VERSION:
+                    self.bad_version += 1
+                else:
+                    self.frames += 1
+                    yield buf[pos + 3], view[pos + HEADER_SIZE:end - 2]
+                pos = end
+
+            else:
+                # Text line, ends at newline or where a frame begins
+                nl = _find(buf, b"\n", pos)
+                mg = _find(buf, MAGIC[:1], pos)
+                if mg != -1 and (nl == -1 or mg < nl):
+                    stop = mg
+                elif nl != -1:
+                    stop = nl + 1
+                else:
+                    break
+                line = bytes(view[pos:stop]).strip()
+                if line:
+                    yield FRAME_TEXT, line
+                pos = stop
+
+        # A "line" this long is line noise, not camera output
+        if n - pos > MAX_LINE and buf[pos] != MAGIC[0]:
+            pos = n
+
+        # Keep only the unparsed tail (at most one partial frame/line)
+        if hasattr(view, "release"):
+            view.release()
+        if pos:
+            self.buf = buf[pos:]
+
+    def check_seq(self, seq):
+        """
+        Tracks shot sequence numbers; returns how many shots went
+        missing since the previous frame (0 when none).
+
+        """
+
+        missing = 0
+        if self.last_seq is not None:
+            missing = (seq - self.last_seq - 1) & 0xFFFF
+            self.dropped += missing
+        self.last_seq = seq
+        return missing
@@ -1,10 +1,15 @@
 import pyb
 from machine import LED
-proto_path = "protocol.txt"
+import link
 coords_path = "coords.txt"
-with open(proto_path, "a") as proto_file:
-    proto_file.write("\ntest" )
-last_line_count=0
+
+# Commands arrive as frames on the USB VCP link (see link.py)
+usb = pyb.USB_VCP()
+usb.setinterrupt(-1)    # frames may contain 0x03, which would act as Ctrl-C
+decoder = link.FrameDecoder()
+commands = {"start", "calib", "end", "exit", "coords", "test", "led_off"}
+running = True
+
 leds = LED("LED_BLUE")
 leds.on()
 
@@ -16,64 +21,59 @@ def run_script(filename):
     except Exception as e:
         print("Error running", filename, ":", e)
 
-while True:
+while running:
     try:
-        # Read file
-        with open(proto_path, "r") as f:
-            lines = f.readlines()
-            line_count = len(lines)
-
-        if lines:
-            final_cmd = lines[-1].strip().lower()
-        else:
-            final_cmd = ""
-
-        # Only act when a new line is added
-        if line_count > last_line_count:
-            if final_cmd:
-                try:
-                    if final_cmd == "start":
-                        run_script("detc.py")
-
-                    elif final_cmd == "calib":
-                        run_script("calib.py")
-
-                    elif final_cmd == "end":
-                        print("End command received.")
-
-                    elif final_cmd == "exit":
-                        print("Exiting main loop.")
-                        break
-
-                    elif final_cmd == "coords":
-                        try:
-                            with open(coords_path, "r") as file:
-                                coord_lines = file.readlines()
-                                if not coord_lines:
-                                    print("coords.txt is empty.")
-                                else:
-                                    for line in coord_lines:
-                                        print(line.strip())
-                        except OSError as e:
-                            print("coords.txt not found:", e)
-
-                    elif final_cmd == "test":
-                        pass
-                        print("Now active.")
-
-                    elif final_cmd == "led_off":
-                        print("LED is now inactive.")
-
-                    else:
-                        print("Unknown command:", final_cmd)
-
-                except Exception as cmd_error:
-                    print("Error while executing command:", final_cmd,",",cmd_error)
-
-            # update line counter
-            last_line_count = line_count
+        # Read pending commands (no file I/O, returns immediately)
+        for req_id, final_cmd in link.poll_commands(usb, decoder):
+            final_cmd = final_cmd.strip().lower()
+            if not final_cmd:
+                continue
+
+            # Acknowledge before acting: scripts below may run for a while
+            status = link.ACK_OK if final_cmd in commands else link.ACK_UNKNOWN
+            usb.write(link.encode_ack(req_id, status))
+
+            try:
+                if final_cmd == "start":
+                    run_script("detc.py")
+
+                elif final_cmd == "calib":
+                    run_script("calib.py")
+
+                elif final_cmd == "end":
+                    print("End command received.")
+
+                elif final_cmd == "exit":
+                    print("Exiting main loop.")
+                    running = False
+                    break
+
+                elif final_cmd == "coords":
+                    try:
+                        with open(coords_path, "r") as file:
+                            coord_lines = file.readlines()
+                            if not coord_lines:
+                                print("coords.txt is empty.")
+                            else:
+                                for line in coord_lines:
+                                    print(line.strip())
+                    except OSError as e:
+                        print("coords.txt not found:", e)
+
+                elif final_cmd == "test":
+                    pass
+                    print("Now active.")
+
+                elif final_cmd == "led_off":
+                    print("LED is now inactive.")
+
+                else:
+                    print("Unknown command:", final_cmd)
+
+            except Exception as cmd_error:
+                print("Error while executing command:", final_cmd,",",cmd_error)
 
     except Exception as loop_error:
         print("Error in main loop:",loop_error)
 
-    pyb.delay(200)  # wait before checking again
+    pyb.delay(20)  # wait before checking again
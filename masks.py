@@ -0,0 +1,142 @@
+#  MASKS — shaped targets from score images
+#
+#  A mask is an image in which every pixel encodes the score zone it
+#  belongs to (grayscale value, 0 or transparent = outside the target).
+#  By default the value is the score itself; a sidecar <name>.json with
+#  {"points": {"<value>": points, ...}} maps values to other scores.
+#  At load time each mask is compiled into a uint8 score raster, so a
+#  shot is scored with one array lookup at its offset from the centre.
+#
+#  Run `python masks.py <directory>` to check the masks in a directory.
+
+import os
+import sys
+import json
+import math
+
+import numpy as np
+from PIL import Image
+
+MASK_TYPES = (".png", ".bmp", ".gif")
+
+
+class Mask:
+    """
+    Compiled mask: `raster` holds the points of every pixel (uint8,
+    0 = miss), (cx, cy) is the pixel that sits on the target centre.
+
+    """
+
+    def __init__(self, name, raster):
+        self.name = name
+        self.raster = raster
+        self.h, self.w = raster.shape
+        self.cx, self.cy = self.w // 2, self.h // 2
+
+    def score(self, dx, dy):
+        # Points of a shot (dx, dy) px away from the target centre
+        col, row = math.floor(dx) + self.cx, math.floor(dy) + self.cy
+        if 0 <= row < self.h and 0 <= col < self.w:
+            return int(self.raster[row, col])
+        return 0
+
+    def scores(self, dx, dy):
+        # Vectorised score for arrays of offsets
+        col = np.floor(dx).astype(int) + self.cx
+        row = np.floor(dy).astype(int) + self.cy
+        inside = (row >= 0) & (row < self.h) & (col >= 0) & (col < self.w)
+        out = np.zeros(np.shape(col), dtype=np.uint8)
+        out[inside] = self.raster[row[inside], col[inside]]
+        return out
+
+    def zones(self):
+        # Distinct scores of the mask, best first
+        return sorted((int(v) for v in np.unique(self.raster) if v), reverse=True)
+
+    def image(self, fill=(0, 0, 0), edge=(0, 255, 255)):
+        """
+        RGBA picture of the mask in the look of the ring target:
+        `fill` inside, `edge` on every zone border, transparent outside.
+
+        """
+
+        r = self.raster
+        p = np.pad(r, 1)            # zeros around: the image edge is a border too
+        border = ((p[1:-1, 1:-1] != p[:-2, 1:-1]) | (p[1:-1, 1:-1] != p[2:, 1:-1]) |
+                  (p[1:-1, 1:-1] != p[1:-1, :-2]) | (p[1:-1, 1:-1] != p[1:-1, 2:]))
+        # 3 px wide edges like the rings' outline
+        b = np.pad(border, 1)
+        wide = border | b[:-2, 1:-1] | b[2:, 1:-1] | b[1:-1, :-2] | b[1:-1, 2:]
+        wide &= r > 0
+
+        rgba = np.zeros(r.shape + (4,), dtype=np.uint8)
+        rgba[r > 0] = fill + (255,)
+        rgba[wide] = edge + (255,)
+        return rgba
+
+
+def compile_mask(name, img, points=None):
+    """
+    Compiles a Pillow image into a Mask. `points` maps pixel values
+    (0–255) to scores; values without an entry score their own value.
+
+    """
+
+    values = np.asarray(img.convert("L"), dtype=np.uint8)
+    if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+        values = np.where(np.asarray(img.convert("RGBA"))[:, :, 3] == 0, 0, values).astype(np.uint8)
+
+    table = np.arange(256, dtype=np.int64)
+    table[0] = 0
+    for value, pts in (points or {}).items():
+        if not 0 <= int(value) <= 255:
+            raise ValueError(f"{name}: pixel values must be 0–255, got {value}")
+        if not 0 <= int(pts) <= 255:
+            raise ValueError(f"{name}: points must be 0–255, got {pts}")
+        table[int(value)] = int(pts)
+    return Mask(name, table.astype(np.uint8)[values])
+
+
+def ring_mask(ring_step, points):
+    # The classic concentric target (points: outer → inner) as a mask
+    radius = ring_step * len(points)
+    yy, xx = np.mgrid[-radius:radius, -radius:radius] + 0.5
+    r = np.hypot(xx, yy)
+    ring = np.maximum(1, np.ceil(r / ring_step)).astype(int)
+    table = np.asarray(points)[np.clip(len(points) - ring, 0, len(points) - 1)]
+    return Mask("rings", np.where(r < radius, table, 0).astype(np.uint8))
+
+
+def load_masks(directory):
+    """
+    Compiles every mask image in `directory`. Returns {name: Mask};
+    unreadable files are reported and skipped.
+
+    """
+
+    masks = {}
+    for file in sorted(os.listdir(directory)):
+        name, ext = os.path.splitext(file)
+        if ext.lower() not in MASK_TYPES:
+            continue
+        try:
+            points = None
+            sidecar = os.path.join(directory, name + ".json")
+            if os.path.exists(sidecar):
+                with open(sidecar, "r") as f:
+                    points = json.load(f).get("points")
+            with Image.open(os.path.join(directory, file)) as img:
+                masks[name] = compile_mask(name, img, points)
+        except (OSError, ValueError) as e:
+            print(f"Mask {file} skipped: {e}")
+    return masks
+
+
+#  MAIN
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python masks.py <directory>")
+    else:
+        for name, mask in load_masks(sys.argv[1]).items():
+            print(f"{name}: {mask.w}×{mask.h} px, zones {mask.zones()}")
@@ -0,0 +1,291 @@
+#  REPLAY — record a camera session and play it back without the camera
+#
+#  RecordingPort wraps the open serial port and logs every chunk of
+#  bytes read from the camera (rx) and written to it (tx), stamped with
+#  the monotonic clock. ReplayPort is a serial-port stand-in that feeds
+#  a recording back through Game.serial_reader, so link decoding,
+#  parse_line, calibration and the game see exactly the bytes the
+#  camera sent: at real time, N× faster or as fast as possible.
+#
+#  File layout:
+#
+#      b"FJNREC1\n" | JSON line {"port", "baud", "recorded"} |
+#      records: t_us (u64) | direction (u8, 0 = rx, 1 = tx) | length (u32) | bytes
+#
+#  During replay the commands the game sends are acked at once, and a
+#  recorded command holds the playback until the game sends its own (so
+#  the camera's answer to "start" never arrives before the game asked).
+#
+#  Run:  python replay.py <file> [--speed N]      (headless throughput run)
+
+import sys
+import time
+import json
+import queue
+import struct
+import argparse
+import threading
+from collections import deque
+
+import serial
+
+import link
+
+MAGIC = b"FJNREC1\n"
+RECORD = struct.Struct("<QBI")      # t_us, direction, length
+RX, TX = 0, 1
+MERGE_US = 500                      # rx bytes this close together share one record
+
+
+def read_recording(path):
+    """
+    Returns (meta, [(t, direction, data), ...]) of a recording,
+    t in seconds from its start.
+
+    """
+
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session recording")
+        meta = json.loads(f.readline())
+        records = []
+        while True:
+            head = f.read(RECORD.size)
+            if len(head) < RECORD.size:
+                break
+            t_us, direction, length = RECORD.unpack(head)
+            data = f.read(length)
+            if len(data) < length:
+                break               # cut off while recording
+            records.append((t_us / 1e6, direction, data))
+    return meta, records
+
+
+def write_recording(path, records, port="synthetic", baud=9600):
+    # Writes [(t, direction, data), ...] as a recording (bench.py, tests by hand)
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(json.dumps({"port": port, "baud": baud, "recorded": time.time()}).encode() + b"\n")
+        for t, direction, data in records:
+            f.write(RECORD.pack(int(t * 1e6), direction, len(data)) + data)
+
+
+#  RECORDING
+
+class RecordingPort:
+    """
+    Wraps an open serial port: behaves like it and appends every
+    chunk read from / written to it to the recording at `path`.
+    The reader thread reads while the console writes, so the file is
+    written under a lock.
+
+    """
+
+    def __init__(self, port, path):
+        self.port = port
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.file.write(json.dumps({"port": port.port, "baud": port.baudrate,
+                                    "recorded": time.time()}).encode() + b"\n")
+        self.t0 = time.perf_counter()
+        self.rx = bytearray()       # Received bytes not yet written ...
+        self.rx_us = 0              # ... and when the first of them arrived
+        self.chunks = 0
+        self.bytes = 0
+
+    def _write(self, t_us, direction, data):
+        self.file.write(RECORD.pack(t_us, direction, len(data)) + data)
+        self.chunks += 1
+        self.bytes += len(data)
+
+    def _flush(self):
+        if self.rx:
+            self._write(self.rx_us, RX, self.rx)
+            self.rx.clear()
+
+    def read(self, size=1):
+        data = self.port.read(size)
+        if data:
+            with self.lock:
+                t_us = int((time.perf_counter() - self.t0) * 1e6)
+                # Reads a byte at a time are merged into one record per MERGE_US
+                if t_us - self.rx_us > MERGE_US:
+                    self._flush()
+                if not self.rx:
+                    self.rx_us = t_us
+                self.rx += data
+        return data
+
+    def write(self, data):
+        with self.lock:
+            if not self.file.closed:
+                self._flush()
+                self._write(int((time.perf_counter() - self.t0) * 1e6), TX, bytes(data))
+        return self.port.write(data)
+
+    @property
+    def baudrate(self):
+        return self.port.baudrate
+
+    def close(self):
+        self.port.close()
+        with self.lock:
+            if not self.file.closed:
+                self._flush()
+                self.file.close()
+
+    def __getattr__(self, name):
+        return getattr(self.port, name)
+
+
+#  REPLAY
+
+class ReplayPort:
+    """
+    Serial-port stand-in playing a recording: read() hands out the
+    recorded rx bytes once they are due. `speed` 1 = real time,
+    N = N× faster, 0 = as fast as the reader takes them. With
+    `follow_commands` a recorded tx chunk waits for the game to write
+    a command first (set it False when nothing sends commands).
+
+    """
+
+    def __init__(self, path, speed=1.0, timeout=0.1, follow_commands=True):
+        self.path = path
+        self.meta, records = read_recording(path)
+        self.records = deque(r for r in records if follow_commands or r[1] == RX)
+        self.speed = speed
+        self.timeout = timeout
+        self.port = path
+        self.baudrate = self.meta.get("baud", 9600)
+        self.is_open = True
+        self.buffer = bytearray()           # Due bytes not yet read
+        self.acks = queue.Queue()           # Acks for the commands the game sent
+        self.writes = 0                     # Commands written by the game
+        self.waited = 0                     # Recorded commands already matched
+        self.decoder = link.FrameDecoder()
+        self.start = time.perf_counter()
+        self.base = 0.0                     # Recording time at `start`
+        self.stats = {"chunks": 0, "bytes": 0, "commands": 0}
+
+    def _due(self, t):
+        # Host time at which recording time `t` is played
+        return self.start + (t - self.base) / self.speed
+
+    def _advance(self):
+        """
+        Moves every record that is due into `buffer`. Returns the
+        seconds until the next one is due (0 = something to read now,
+        None = blocked on a command or at the end).
+
+        """
+
+        while not self.acks.empty():
+            self.buffer += self.acks.get_nowait()
+
+        while self.records:
+            t, direction, data = self.records[0]
+            if direction == TX:
+                if self.waited >= self.writes:
+                    return 0 if self.buffer else None
+                # The game sent its command: play on from here
+                self.waited += 1
+                self.records.popleft()
+                self.start, self.base = time.perf_counter(), t
+                continue
+            if self.speed:
+                wait = self._due(t) - time.perf_counter()
+                if wait > 0:
+                    return 0 if self.buffer else wait
+            self.buffer += data
+            self.records.popleft()
+            self.stats["chunks"] += 1
+            self.stats["bytes"] += len(data)
+            if not self.speed:
+                break               # one recorded chunk per read, like the wire
+        return 0 if self.buffer else None
+
+    @property
+    def in_waiting(self):
+        self._advance()
+        return len(self.buffer)
+
+    def read(self, size=1):
+        if not self.is_open:
+            raise serial.SerialException("replay port closed")
+        deadline = time.perf_counter() + self.timeout
+        while True:
+            wait = self._advance()
+            if wait == 0:
+                data = bytes(self.buffer[:size])
+                del self.buffer[:size]
+                return data
+            if wait is None and not self.records and self.acks.empty():
+                raise serial.SerialException("replay finished")
+            left = deadline - time.perf_counter()
+            if left <= 0:
+                return b""
+            time.sleep(min(left, wait if wait is not None else 0.005))
+
+    def write(self, data):
+        # Acks every command frame at once, like the camera would
+        self.decoder.feed(data)
+        for kind, payload in self.decoder.parse():
+            if kind == link.FRAME_CMD:
+                req_id, _ = link.decode_command(payload)
+                self.acks.put(link.encode_ack(req_id))
+                self.writes += 1
+                self.stats["commands"] += 1
+        return len(data)
+
+    def close(self):
+        self.is_open = False
+
+
+#  MAIN
+
+def main(argv):
+    """
+    Headless run: plays a recording through Game.serial_reader and
+    maps its shots with the stored calibration. Prints the event
+    throughput, i.e. how fast the host side parses a session.
+
+    """
+
+    parser = argparse.ArgumentParser(description="Replay a recorded camera session without the game window")
+    parser.add_argument("file")
+    parser.add_argument("--speed", type=float, default=0.0, help="1 = real time, 0 = as fast as possible")
+    args = parser.parse_args(argv)
+
+    import Game
+    Game.load_calibration()
+
+    port = ReplayPort(args.file, args.speed, follow_commands=False)
+    events, stop = queue.Queue(), threading.Event()
+    reader = threading.Thread(target=Game.serial_reader, daemon=True, args=(
+        port, stop, events, {}, deque(maxlen=64), link.FrameDecoder()))
+
+    counts = {}
+    t0 = time.perf_counter()
+    reader.start()
+    while reader.is_alive() or not events.empty():
+        try:
+            kind, stamp, *data = events.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        counts[kind] = counts.get(kind, 0) + 1
+        if kind == "shot" and Game.matrix is not None:
+            Game.correct_coords(data[0], data[1], Game.matrix, Game.transform_type)
+    elapsed = time.perf_counter() - t0
+
+    total = sum(counts.values())
+    print(f"{args.file}: {port.stats['bytes']:,} bytes in {port.stats['chunks']:,} chunks")
+    print(f"{total:,} events in {elapsed:.3f} s ({total / elapsed:,.0f} events/s)")
+    for kind, n in sorted(counts.items()):
+        print(f"  {kind:<6} {n:,}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,229 @@
+#  SCORES — indexed leaderboard store
+#
+#  Scores live in an SQLite database (WAL mode, so several lanes /
+#  processes can write to it at once). Nothing of the table is kept in
+#  memory: the top-K and pages of the board are queries along the
+#  (mode, score DESC, id) index. Triggers keep a count per (mode, score)
+#  in score_counts, so "rank of a score", the board size and the first
+#  score of a page far down the board are sums over the distinct scores
+#  (bounded by the score range, not by the number of rows); such a page
+#  then steps only over the ties of that score. Rows written by other
+#  writers show up in the next query.
+#
+#  Run `python scores.py import <leaderboard.txt> <leaderboard.db>` to
+#  convert the old "name,score,mode" text file once.
+
+import sys
+import time
+import sqlite3
+
+FILLER_MODE = 5             # Placeholder rows of this mode show in every mode
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id    INTEGER PRIMARY KEY,
+    name  TEXT    NOT NULL,
+    score INTEGER NOT NULL,
+    mode  INTEGER NOT NULL,
+    time  REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_mode_score ON scores (mode, score DESC, id);
+CREATE TABLE IF NOT EXISTS score_counts (
+    mode  INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    n     INTEGER NOT NULL,
+    PRIMARY KEY (mode, score)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS scores_counted AFTER INSERT ON scores BEGIN
+    INSERT INTO score_counts VALUES (NEW.mode, NEW.score, 1)
+        ON CONFLICT (mode, score) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS scores_uncounted AFTER DELETE ON scores BEGIN
+    UPDATE score_counts SET n = n - 1 WHERE mode = OLD.mode AND score = OLD.score;
+END;
+"""
+# Database from before the count table: count its rows once
+COUNT_ROWS = """
+INSERT INTO score_counts SELECT mode, score, COUNT(*) FROM scores
+    WHERE NOT EXISTS (SELECT 1 FROM score_counts) GROUP BY mode, score;
+"""
+
+
+def parse_csv_line(line):
+    """
+    Returns (name, score, mode) for one "name,score,mode" line of the
+    old leaderboard file, None for blank / malformed lines.
+
+    """
+
+    parts = [p.strip() for p in line.split(",")]
+    if len(parts) != 3:
+        return None
+    try:
+        return parts[0], int(parts[1]), int(parts[2])
+    except ValueError:
+        return None
+
+
+class ScoreStore:
+    """
+    One connection to the score database. The board of a mode is its
+    own rows merged with the filler rows, best first, earlier entry
+    first on ties: one SELECT per shown mode along the index, merged
+    by SQLite (UNION ALL ... ORDER BY), so no query sorts.
+
+    """
+
+    def __init__(self, path, timeout=5.0):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=timeout)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        if self.db.execute("SELECT NOT EXISTS (SELECT 1 FROM score_counts)").fetchone()[0]:
+            self.db.executescript(f"BEGIN IMMEDIATE; {COUNT_ROWS} COMMIT;")
+
+    def add(self, name, score, mode):
+        """
+        Stores one result and returns its rank in `mode` (1 = best).
+
+        """
+
+        with self.db:
+            self.db.execute("INSERT INTO scores (name, score, mode, time) VALUES (?, ?, ?, ?)",
+                            (name, int(score), int(mode), time.time()))
+        return self.rank(score, mode)
+
+    def _shown(self, mode):
+        # Modes shown on the board of `mode`: its own rows plus the filler rows
+        return (mode,) if mode == FILLER_MODE else (mode, FILLER_MODE)
+
+    def _board(self, columns, mode, where="", args=(), tail="", tail_args=()):
+        # Rows of the board of `mode` in board order; `where` / `args` apply to each mode
+        shown = self._shown(mode)
+        sql = " UNION ALL ".join(f"SELECT {columns} FROM scores WHERE mode = ?{where}" for _ in shown)
+        params = [p for m in shown for p in (m, *args)] + list(tail_args)
+        return self.db.execute(f"{sql} ORDER BY score DESC, id {tail}", params)
+
+    def top(self, mode, k):
+        """
+        Returns the best `k` entries for `mode` as [(name, score, mode), ...].
+
+        """
+
+        return self.page(mode, 0, k)
+
+    def page(self, mode, offset, count):
+        """
+        Returns entries offset .. offset+count-1 (0 = best) of the board
+        shown for `mode` as [(name, score, mode), ...].
+
+        """
+
+        return [row[:3] for row in self.rows(mode, count, offset)]
+
+    def rows(self, mode, count, offset=0, after=None):
+        """
+        Returns `count` entries of the board shown for `mode` as
+        [(name, score, mode, id), ...]: those right after the entry
+        `after` = (score, id) when given (a page continues from the
+        last row of the one before it), else from `offset` on. The
+        score at `offset` is found from the count table; only the ties
+        of that score before `offset` are stepped over on the index.
+
+        """
+
+        where, args = "", ()
+        if after is not None:
+            # After (score, id) in board order, as a range on the index
+            where, args = " AND score <= ? AND (score < ? OR id > ?)", (after[0], after[0], after[1])
+        elif offset > 0:
+            first = self._seek(mode, offset)
+            if first is None:
+                return []
+            where, args = " AND score <= ? AND (score < ? OR id >= ?)", (first[0], first[0], first[1])
+        return self._board("name, score, mode, id", mode, where, args, "LIMIT ?", (count,)).fetchall()
+
+    def _counted(self, mode, where="", args=()):
+        # Number of entries shown for `mode` (with a score matching `where`), from the count table
+        shown = self._shown(mode)
+        return self.db.execute(
+            f"SELECT COALESCE(SUM(n), 0) FROM score_counts WHERE mode IN ({', '.join('?' * len(shown))}){where}",
+            (*shown, *args)).fetchone()[0]
+
+    def _seek(self, mode, offset):
+        # (score, id) of entry `offset` on the board of `mode`, None past its end
+        shown = self._shown(mode)
+        found = self.db.execute(f"""
+            SELECT score, ? - above FROM (
+                SELECT score, SUM(SUM(n)) OVER (ORDER BY score DESC) - SUM(n) AS above
+                FROM score_counts WHERE mode IN ({', '.join('?' * len(shown))}) GROUP BY score)
+            WHERE above <= ? ORDER BY score LIMIT 1""", (offset, *shown, offset)).fetchone()
+        if found is None:
+            return None
+        score, ties = found
+        return self._board("score, id", mode, " AND score = ?", (score,), "LIMIT 1 OFFSET ?", (ties,)).fetchone()
+
+    def size(self, mode):
+        # Number of entries on the board shown for `mode`
+        return self._counted(mode)
+
+    def modes(self):
+        # Game modes with scores of their own (filler rows excluded), one index probe per mode
+        rows = self.db.execute("""
+            WITH RECURSIVE m(mode) AS (
+                SELECT MIN(mode) FROM scores
+                UNION ALL
+                SELECT (SELECT MIN(mode) FROM scores WHERE mode > m.mode) FROM m WHERE m.mode IS NOT NULL
+            )
+            SELECT mode FROM m WHERE mode IS NOT NULL""")
+        return [m for m, in rows if m != FILLER_MODE]
+
+    def rank(self, score, mode):
+        # 1 + number of entries shown for `mode` with a higher score
+        return 1 + self._counted(mode, " AND score > ?", (int(score),))
+
+    def count(self, mode=None):
+        if mode is None:
+            return self.db.execute("SELECT COALESCE(SUM(n), 0) FROM score_counts").fetchone()[0]
+        return self.db.execute("SELECT COALESCE(SUM(n), 0) FROM score_counts WHERE mode = ?", (mode,)).fetchone()[0]
+
+    def empty(self):
+        return self.db.execute("SELECT NOT EXISTS (SELECT 1 FROM scores)").fetchone()[0] == 1
+
+    def import_csv(self, path):
+        """
+        Appends every valid line of an old leaderboard text file in one
+        transaction. Returns (imported, skipped).
+
+        """
+
+        now = time.time()
+        rows, skipped = [], 0
+        with open(path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = parse_csv_line(line)
+                if entry is None:
+                    skipped += 1
+                else:
+                    rows.append(entry + (now,))
+        with self.db:
+            self.db.executemany("INSERT INTO scores (name, score, mode, time) VALUES (?, ?, ?, ?)", rows)
+        return len(rows), skipped
+
+    def close(self):
+        self.db.close()
+
+
+#  MAIN
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "import":
+        store = ScoreStore(sys.argv[3])
+        imported, skipped = store.import_csv(sys.argv[2])
+        print(f"Imported {imported} scores ({skipped} malformed lines skipped) into {sys.argv[3]}")
+        store.close()
+    else:
+        print("Usage: python scores.py import <leaderboard.txt> <leaderboard.db>")
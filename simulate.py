@@ -0,0 +1,187 @@
+#  SIMULATE — offline difficulty tuning
+#
+#  Plays millions of games per mode with a simple shooter model and
+#  prints the score distribution of each mode. Scoring (ring_scores,
+#  the vectorised engine.ring_score) with Game.py's settings comes from
+#  the game, and how long a target stays up is measured on engine games
+#  run on virtual time, so a change there is simulated as it is played.
+#
+#  Shooter model:
+#      aim         2-D normal error around the target centre (--spread px)
+#      reaction    log-normal time until a shown target is shot
+#                  (--reaction / --reaction-sd ms, modes 2 and 3)
+#      tracking    timing error on a gliding target (--tracking-sd ms,
+#                  mode 4), adds glide_speed × error along its path
+#
+#  Run:  python simulate.py [--games N] [--modes 1 2 3 4] [--workers N] ...
+
+import os
+import sys
+import time
+import argparse
+import concurrent.futures
+
+import numpy as np
+
+import Game
+import engine
+
+CHUNK = 200_000             # Games per vectorised batch (bounds memory)
+WINDOW_GAMES = 1000         # Engine games per batch that sample the appearance windows
+
+# Game globals that can be overridden from the command line
+TUNABLES = ("rounds", "ring_step", "points", "hard_hide_time", "hard_move_interval", "glide_speed")
+
+
+#  SHOOTER MODEL
+
+def lognormal(rng, mean, sd, size):
+    # Log-normal samples with the given mean / standard deviation
+    sigma2 = np.log1p((sd / mean) ** 2)
+    return rng.lognormal(np.log(mean) - sigma2 / 2, np.sqrt(sigma2), size)
+
+
+def shot_scores(rng, games, shooter, offset=None):
+    # Points of `games` × rounds aimed shots (offset: extra aim error, px)
+    shape = (games, Game.rounds)
+    dx = rng.normal(0.0, shooter["spread"], shape)
+    dy = rng.normal(0.0, shooter["spread"], shape)
+    if offset is not None:
+        dx += offset[0]
+        dy += offset[1]
+    return Game.ring_scores(np.hypot(dx, dy))
+
+
+def shown_time(rules, seed):
+    # Show → hide of the first appearance of an engine game, run on virtual time (s)
+    game = engine.Engine(rules, seed=seed)
+    game.start(0.0)
+    shown = None
+    while not game.over:
+        t = game.next_due()
+        for kind, *_ in game.advance(t):
+            if kind == "show":
+                shown = t
+            elif kind == "hide" and shown is not None:
+                return t - shown
+    raise ValueError(f"mode {rules.mode}: no appearance")
+
+
+def visible_windows(rng, mode, games):
+    # Time (s) a target stays shootable per appearance, per game (the engine
+    # draws a game's timing once): engine samples plus the hide grace
+    rules = Game.game_rules().replace(mode=mode)
+    seeds = rng.integers(0, 2 ** 32, WINDOW_GAMES)
+    spans = np.array([shown_time(rules, int(seed)) for seed in seeds])
+    return rng.choice(spans, (games, 1)) + rules.hide_grace
+
+
+def simulate_chunk(mode, games, seed, shooter, tunables):
+    """
+    Simulates `games` games of `mode` and returns the histogram of
+    their total scores (index = score) and the number of hits.
+
+    """
+
+    for name, value in tunables.items():
+        setattr(Game, name, value)
+    rng = np.random.default_rng(seed)
+
+    if mode in (2, 3):
+        # Shot after a reaction time; too late = the target is gone (miss)
+        reaction = lognormal(rng, shooter["reaction"] / 1000, shooter["reaction_sd"] / 1000,
+                             (games, Game.rounds))
+        pts = np.where(reaction < visible_windows(rng, mode, games), shot_scores(rng, games, shooter), 0)
+    elif mode == 4:
+        # Timing error on a target moving at glide_speed in a random direction
+        lag = rng.normal(0.0, shooter["tracking_sd"] / 1000, (games, Game.rounds))
+        heading = rng.uniform(0.0, 2 * np.pi, (games, Game.rounds))
+        drift = Game.glide_speed * lag
+        pts = shot_scores(rng, games, shooter, (drift * np.cos(heading), drift * np.sin(heading)))
+    else:
+        pts = shot_scores(rng, games, shooter)
+
+    totals = pts.sum(axis=1)
+    top = Game.rounds * max(Game.points)
+    return np.bincount(totals, minlength=top + 1), int(np.count_nonzero(pts))
+
+
+#  RUNNER
+
+def simulate(mode, games, shooter, tunables, workers=1, seed=0):
+    # Histogram of total scores over `games` games, split into CHUNK batches
+    seeds = np.random.SeedSequence([seed, mode]).spawn(-(-games // CHUNK))
+    sizes = [min(CHUNK, games - i * CHUNK) for i in range(len(seeds))]
+    jobs = [(mode, n, s, shooter, tunables) for n, s in zip(sizes, seeds)]
+
+    if workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(simulate_chunk, *zip(*jobs)))
+    else:
+        parts = [simulate_chunk(*job) for job in jobs]
+
+    hist = sum(p[0] for p in parts)
+    hits = sum(p[1] for p in parts)
+    return hist, hits
+
+
+def percentile(hist, q):
+    # Score at quantile q of a score histogram
+    cum = np.cumsum(hist)
+    return int(np.searchsorted(cum, q * cum[-1]))
+
+
+def report(mode, hist, hits, games, seconds):
+    scores = np.arange(len(hist))
+    mean = (scores * hist).sum() / games
+    sd = np.sqrt(((scores - mean) ** 2 * hist).sum() / games)
+
+    print(f"\nMode {mode}: {games:,} games in {seconds:.2f} s")
+    print(f"  mean {mean:.1f}, sd {sd:.1f}, hit rate {hits / (games * Game.rounds):.1%}")
+    print("  p10 {} | p50 {} | p90 {} | p99 {} | max {}".format(
+        *(percentile(hist, q) for q in (0.1, 0.5, 0.9, 0.99)), int(scores[hist > 0].max())))
+
+    # Histogram in 10 equal score bands
+    top = len(hist) - 1
+    width = max(1, top // 10)
+    for lo in range(0, top + 1, width):
+        share = hist[lo:lo + width].sum() / games
+        print(f"  {lo:>4}-{min(top, lo + width - 1):<4} {share:6.1%} {'#' * round(share * 60)}")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Monte Carlo score distributions per game mode")
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--modes", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument("--workers", type=int, default=1, help="processes (0 = one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spread", type=float, default=110.0, help="aim error sd (px)")
+    parser.add_argument("--reaction", type=float, default=900.0, help="mean reaction time (ms)")
+    parser.add_argument("--reaction-sd", type=float, default=300.0)
+    parser.add_argument("--tracking-sd", type=float, default=250.0, help="timing error on a moving target (ms)")
+    parser.add_argument("--rounds", type=int)
+    parser.add_argument("--ring-step", type=int)
+    parser.add_argument("--points", type=int, nargs=Game.target_rings)
+    parser.add_argument("--hard-hide-time", type=int)
+    parser.add_argument("--hard-move-interval", type=int)
+    parser.add_argument("--glide-speed", type=float)
+    args = parser.parse_args(argv)
+
+    shooter = {"spread": args.spread, "reaction": args.reaction,
+               "reaction_sd": args.reaction_sd, "tracking_sd": args.tracking_sd}
+    tunables = {name: getattr(args, name) for name in TUNABLES if getattr(args, name) is not None}
+    workers = args.workers or os.cpu_count()
+
+    for name, value in tunables.items():
+        setattr(Game, name, value)
+    print("Shooter:", ", ".join(f"{k} {v:g}" for k, v in shooter.items()))
+    print(f"Rules: rounds {Game.rounds}, ring_step {Game.ring_step}, points {Game.points}")
+
+    for mode in args.modes:
+        t0 = time.perf_counter()
+        hist, hits = simulate(mode, args.games, shooter, tunables, workers, args.seed)
+        report(mode, hist, hits, args.games, time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
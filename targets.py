@@ -0,0 +1,115 @@
+#  TARGETS — many simultaneous targets with a grid hit index
+#
+#  Every target has its own ring width, point table and lifetime. The
+#  field divides the screen into square cells and lists each target in
+#  every cell its outer ring overlaps. A shot then only tests the few
+#  targets listed in its own cell, however many are on screen.
+
+import math
+import itertools
+
+import engine
+
+
+class Target:
+    """
+    Round target centred on (x, y) with rings `ring_step` px wide.
+    points[0] is the outer ring, points[-1] the bullseye.
+
+    """
+
+    def __init__(self, tid, x, y, ring_step, points):
+        self.id = tid
+        self.x, self.y = x, y
+        self.ring_step = ring_step
+        self.points = tuple(points)
+        self.radius = ring_step * len(self.points)
+
+    def score(self, x, y):
+        # Points for a shot at (x, y), None when it misses this target
+        r = math.hypot(x - self.x, y - self.y)
+        if r >= self.radius:
+            return None
+        return engine.ring_score(r, self.ring_step, self.points)
+
+
+class TargetField:
+    """
+    The targets on screen plus the uniform grid over the screen
+    (cell index → ids of the targets overlapping that cell, oldest
+    first, i.e. in drawing order).
+
+    """
+
+    def __init__(self, width, height, cell=100):
+        self.cell = cell
+        self.cols = math.ceil(width / cell)
+        self.rows = math.ceil(height / cell)
+        self.cells = [[] for _ in range(self.cols * self.rows)]
+        self.targets = {}       # id → Target
+        self.ids = itertools.count(1)
+        self.stats = {"shots": 0, "tests": 0}
+
+    def __len__(self):
+        return len(self.targets)
+
+    def _cells(self, t):
+        # Indices of the cells overlapped by the bounding box of `t`
+        c = self.cell
+        col0 = max(0, int((t.x - t.radius) // c))
+        col1 = min(self.cols - 1, int((t.x + t.radius) // c))
+        row0 = max(0, int((t.y - t.radius) // c))
+        row1 = min(self.rows - 1, int((t.y + t.radius) // c))
+        return [row * self.cols + col for row in range(row0, row1 + 1) for col in range(col0, col1 + 1)]
+
+    #  TARGETS
+
+    def add(self, x, y, ring_step, points):
+        # Puts up a new target (drawn above the older ones) and returns it
+        t = Target(next(self.ids), x, y, ring_step, points)
+        self.targets[t.id] = t
+        for i in self._cells(t):
+            self.cells[i].append(t.id)
+        return t
+
+    def remove(self, tid):
+        # Takes a target down; returns it (None when it is already gone)
+        t = self.targets.pop(tid, None)
+        if t is not None:
+            for i in self._cells(t):
+                self.cells[i].remove(tid)
+        return t
+
+    def clear(self):
+        self.targets.clear()
+        for ids in self.cells:
+            ids.clear()
+
+    #  HIT TESTING
+
+    def hit(self, x, y):
+        """
+        Returns (target, points) for the topmost target under (x, y),
+        (None, 0) when the shot hits none of them.
+
+        """
+
+        self.stats["shots"] += 1
+        col, row = int(x // self.cell), int(y // self.cell)
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return None, 0
+        for tid in reversed(self.cells[row * self.cols + col]):
+            self.stats["tests"] += 1
+            t = self.targets[tid]
+            pts = t.score(x, y)
+            if pts is not None:
+                return t, pts
+        return None, 0
+
+    def hit_scan(self, x, y):
+        # Reference: the same result by testing every target (bench.py)
+        for t in reversed(list(self.targets.values())):
+            pts = t.score(x, y)
+            if pts is not None:
+                return t, pts
+        return None, 0